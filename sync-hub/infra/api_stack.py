@@ -1,9 +1,11 @@
 from aws_cdk import (
     Stack, Duration, CfnOutput,
     aws_lambda as _lambda,
+    aws_lambda_event_sources as lambda_event_sources,
     aws_apigatewayv2 as apigw,
     aws_iam as iam,
     aws_logs as logs,
+    aws_secretsmanager as secretsmanager,
     aws_ssm as ssm
 )
 from constructs import Construct
@@ -20,6 +22,16 @@ class ApiStack(Stack):
             description="AWS Lambda Powertools"
         )
 
+        # Signing key for opaque pagination tokens
+        page_token_secret = secretsmanager.Secret(
+            self, "PageTokenSecret",
+            description="HMAC key for Sync Hub pagination tokens",
+            generate_secret_string=secretsmanager.SecretStringGenerator(
+                exclude_punctuation=True,
+                password_length=48
+            )
+        )
+
         # Common Lambda environment
         common_env = {
             "POWERTOOLS_SERVICE_NAME": "sync-hub",
@@ -31,7 +43,28 @@ class ApiStack(Stack):
             "GROUPS_TABLE": data_stack.groups_table.table_name,
             "GROUP_MEMBERS_TABLE": data_stack.group_members_table.table_name,
             "SESSIONS_TABLE": data_stack.sessions_table.table_name,
-            "BACKUP_BUCKET": data_stack.backup_bucket.bucket_name
+            "BACKUP_BUCKET": data_stack.backup_bucket.bucket_name,
+            "PAGE_TOKEN_SECRET_ARN": page_token_secret.secret_arn,
+            "DEFAULT_PAGE_SIZE": "50",
+            "MAX_PAGE_SIZE": "200",
+            "SETTINGS_HISTORY_RETENTION": "50",
+            "BATCH_WORKERS": "8",
+            "TOMBSTONE_TTL_DAYS": "30",
+            "SESSION_TTL_DAYS": "30",
+            "FEEDBACK_MAX_EMOJI_KINDS": "64",
+            "DEVICE_STATUS_MAX_WAIT": "20",
+            "SYNC_CONSISTENCY_WINDOW": "5",
+            "COMPRESSION_MIN_BYTES": "1024",
+            "COMPRESSION_LEVEL": "5",
+            "SETTINGS_CACHE_MAX_ENTRIES": "1000",
+            "SETTINGS_CACHE_TTL_SECONDS": "60",
+            "SETTINGS_CACHE_STAMP_REFRESH_SECONDS": "1",
+            "MEMBERSHIP_CACHE_SECONDS": "30",
+            "EXPORT_PART_SIZE_MB": "8",
+            "RESTORE_WORKERS": "16",
+            "RESTORE_CHECKPOINT_LINES": "10000",
+            "SEARCH_CACHE_MAX_TENANTS": "16",
+            "SEARCH_REFRESH_SECONDS": "1"
         }
 
         # Lambda execution role
@@ -49,6 +82,9 @@ class ApiStack(Stack):
                      data_stack.groups_table, data_stack.group_members_table, data_stack.sessions_table]:
             table.grant_read_write_data(lambda_role)
 
+        # The signing key is read at cold start, never passed in the environment
+        page_token_secret.grant_read(lambda_role)
+
         # Grant S3 permissions
         data_stack.backup_bucket.grant_read_write(lambda_role)
 
@@ -67,6 +103,86 @@ class ApiStack(Stack):
             log_retention=logs.RetentionDays.ONE_MONTH
         )
 
+        # Background jobs (cascades that outlive an API request)
+        jobs_function = _lambda.Function(
+            self, "JobsFunction",
+            runtime=_lambda.Runtime.PYTHON_3_12,
+            handler="jobs.handler",
+            code=_lambda.Code.from_asset("services/api"),
+            environment=common_env,
+            role=lambda_role,
+            timeout=Duration.minutes(15),
+            memory_size=1024,
+            layers=[powertools_layer],
+            tracing=_lambda.Tracing.ACTIVE,
+            log_retention=logs.RetentionDays.ONE_MONTH
+        )
+        api_function.add_environment("JOBS_FUNCTION", jobs_function.function_name)
+
+        # Settings stream consumer: history, public feed, counters and cache stamps
+        stream_function = _lambda.Function(
+            self, "SettingsStreamFunction",
+            runtime=_lambda.Runtime.PYTHON_3_12,
+            handler="stream.handler",
+            code=_lambda.Code.from_asset("services/api"),
+            environment=common_env,
+            role=lambda_role,
+            timeout=Duration.seconds(60),
+            memory_size=256,
+            layers=[powertools_layer],
+            tracing=_lambda.Tracing.ACTIVE,
+            log_retention=logs.RetentionDays.ONE_MONTH
+        )
+        stream_function.add_event_source(
+            lambda_event_sources.DynamoEventSource(
+                data_stack.settings_table,
+                starting_position=_lambda.StartingPosition.LATEST,
+                batch_size=100,
+                max_batching_window=Duration.seconds(1),
+                bisect_batch_on_error=True,
+                retry_attempts=5,
+                report_batch_item_failures=True
+            )
+        )
+
+        # Bookmarks stream consumer: search documents
+        bookmarks_stream_function = _lambda.Function(
+            self, "BookmarksStreamFunction",
+            runtime=_lambda.Runtime.PYTHON_3_12,
+            handler="stream.bookmarks_handler",
+            code=_lambda.Code.from_asset("services/api"),
+            environment=common_env,
+            role=lambda_role,
+            timeout=Duration.seconds(60),
+            memory_size=256,
+            layers=[powertools_layer],
+            tracing=_lambda.Tracing.ACTIVE,
+            log_retention=logs.RetentionDays.ONE_MONTH
+        )
+        bookmarks_stream_function.add_event_source(
+            lambda_event_sources.DynamoEventSource(
+                data_stack.bookmarks_table,
+                starting_position=_lambda.StartingPosition.LATEST,
+                batch_size=100,
+                max_batching_window=Duration.seconds(1),
+                bisect_batch_on_error=True,
+                retry_attempts=5,
+                report_batch_item_failures=True
+            )
+        )
+
+        # Kept out of the role's default policy, which both functions depend on
+        iam.Policy(
+            self, "JobsInvokePolicy",
+            roles=[lambda_role],
+            statements=[
+                iam.PolicyStatement(
+                    actions=["lambda:InvokeFunction"],
+                    resources=[jobs_function.function_arn]
+                )
+            ]
+        )
+
         # HTTP API
         self.api = apigw.HttpApi(
             self, "HttpApi",
@@ -74,7 +190,8 @@ class ApiStack(Stack):
             cors_preflight=apigw.CorsPreflightOptions(
                 allow_origins=["*"],
                 allow_methods=[apigw.CorsHttpMethod.ANY],
-                allow_headers=["*"]
+                allow_headers=["*"],
+                expose_headers=["ETag"]
             )
         )
 
@@ -114,19 +231,27 @@ class ApiStack(Stack):
             # Auth
             ("POST", "/auth/device/start", jwt_authorizer.ref),
             ("POST", "/auth/device/confirm", jwt_authorizer.ref),
+            ("GET", "/auth/device/{id}/status", jwt_authorizer.ref),
             # Settings
             ("GET", "/settings", jwt_authorizer.ref),
             ("POST", "/settings", jwt_authorizer.ref),
+            ("POST", "/settings:batch", jwt_authorizer.ref),
+            ("POST", "/settings:batchGet", jwt_authorizer.ref),
             ("GET", "/settings/{id}", jwt_authorizer.ref),
             ("PUT", "/settings/{id}", jwt_authorizer.ref),
             ("DELETE", "/settings/{id}", jwt_authorizer.ref),
             ("GET", "/settings/{id}/history", jwt_authorizer.ref),
             ("POST", "/settings/{id}/rollback", jwt_authorizer.ref),
             ("GET", "/settings/public", None),
+            ("GET", "/settings/stats", jwt_authorizer.ref),
+            ("GET", "/settings/effective", jwt_authorizer.ref),
             ("PUT", "/settings/{id}/visibility", jwt_authorizer.ref),
             # Bookmarks
             ("GET", "/bookmarks", jwt_authorizer.ref),
+            ("GET", "/bookmarks/search", jwt_authorizer.ref),
             ("POST", "/bookmarks", jwt_authorizer.ref),
+            ("POST", "/bookmarks:batch", jwt_authorizer.ref),
+            ("POST", "/bookmarks:batchGet", jwt_authorizer.ref),
             ("GET", "/bookmarks/{id}", jwt_authorizer.ref),
             ("PUT", "/bookmarks/{id}", jwt_authorizer.ref),
             ("DELETE", "/bookmarks/{id}", jwt_authorizer.ref),
@@ -137,14 +262,30 @@ class ApiStack(Stack):
             ("PUT", "/groups/{id}", jwt_authorizer.ref),
             ("DELETE", "/groups/{id}", jwt_authorizer.ref),
             ("POST", "/groups/{id}/invite", jwt_authorizer.ref),
+            ("POST", "/groups/{id}/accept", jwt_authorizer.ref),
             ("GET", "/groups/{id}/members", jwt_authorizer.ref),
+            ("PUT", "/groups/{id}/members/{user_id}", jwt_authorizer.ref),
+            ("GET", "/groups/{id}/settings", jwt_authorizer.ref),
+            ("PUT", "/groups/{id}/settings", jwt_authorizer.ref),
+            ("GET", "/me/groups", jwt_authorizer.ref),
+            ("GET", "/me/invitations", jwt_authorizer.ref),
             # Sessions
-            ("POST", "/sessions/{id}/emoji", jwt_authorizer.ref)
+            ("POST", "/sessions/{id}/emoji", jwt_authorizer.ref),
+            ("GET", "/sessions/{id}/feedback", jwt_authorizer.ref),
+            ("GET", "/feedback/hourly", jwt_authorizer.ref),
+            ("GET", "/feedback/daily", jwt_authorizer.ref),
+            # Delta sync
+            ("GET", "/sync/changes", jwt_authorizer.ref),
+            # Export
+            ("POST", "/export", jwt_authorizer.ref),
+            ("GET", "/export/{id}", jwt_authorizer.ref),
+            ("POST", "/restore", jwt_authorizer.ref),
+            ("GET", "/restore/{id}", jwt_authorizer.ref)
         ]
 
         for method, path, authorizer in routes:
             apigw.CfnRoute(
-                self, f"Route{method}{path.replace('/', '').replace('{', '').replace('}', '')}",
+                self, f"Route{method}{path.replace('/', '').replace('{', '').replace('}', '').replace(':', '')}",
                 api_id=self.api.api_id,
                 route_key=f"{method} {path}",
                 target=f"integrations/{lambda_integration.ref}",
@@ -1,5 +1,5 @@
 from aws_cdk import (
-    Stack, RemovalPolicy, CfnOutput,
+    Stack, RemovalPolicy, CfnOutput, Duration,
     aws_dynamodb as dynamodb,
     aws_s3 as s3,
     aws_ssm as ssm
@@ -19,9 +19,18 @@ class DataStack(Stack):
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
             point_in_time_recovery=True,
             stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES,
+            time_to_live_attribute="ttl",
             removal_policy=RemovalPolicy.DESTROY
         )
 
+        # Sparse public feed: only public settings carry `public_feed`
+        self.settings_table.add_global_secondary_index(
+            index_name="public-settings-index",
+            partition_key=dynamodb.Attribute(name="public_feed", type=dynamodb.AttributeType.STRING),
+            sort_key=dynamodb.Attribute(name="updated_at", type=dynamodb.AttributeType.NUMBER),
+            projection_type=dynamodb.ProjectionType.ALL
+        )
+
         self.bookmarks_table = dynamodb.Table(
             self, "BookmarksTable", 
             table_name="sync-hub-bookmarks",
@@ -29,6 +38,8 @@ class DataStack(Stack):
             sort_key=dynamodb.Attribute(name="bookmark_id", type=dynamodb.AttributeType.STRING),
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
             point_in_time_recovery=True,
+            stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES,
+            time_to_live_attribute="ttl",
             removal_policy=RemovalPolicy.DESTROY
         )
 
@@ -39,6 +50,7 @@ class DataStack(Stack):
             sort_key=dynamodb.Attribute(name="group_id", type=dynamodb.AttributeType.STRING),
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
             point_in_time_recovery=True,
+            time_to_live_attribute="ttl",
             removal_policy=RemovalPolicy.DESTROY
         )
 
@@ -59,9 +71,30 @@ class DataStack(Stack):
             sort_key=dynamodb.Attribute(name="session_id", type=dynamodb.AttributeType.STRING),
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
             point_in_time_recovery=True,
+            # Sessions confirmed before SESSION_TTL_DAYS still carry their flow's ttl:
+            # run tools/backfill_session_ttl.py before first deploying this
+            time_to_live_attribute="ttl",
             removal_policy=RemovalPolicy.DESTROY
         )
 
+        # Reverse membership for GET /me/groups: a user's memberships across every tenant
+        self.group_members_table.add_global_secondary_index(
+            index_name="member-groups-index",
+            partition_key=dynamodb.Attribute(name="user_id", type=dynamodb.AttributeType.STRING),
+            sort_key=dynamodb.Attribute(name="group_id", type=dynamodb.AttributeType.STRING),
+            projection_type=dynamodb.ProjectionType.INCLUDE,
+            non_key_attributes=["role", "joined_at"]
+        )
+
+        # Per-tenant change feed for GET /sync/changes; deletes leave tombstones that expire via `ttl`
+        for table in (self.settings_table, self.bookmarks_table, self.groups_table):
+            table.add_global_secondary_index(
+                index_name="changes-index",
+                partition_key=dynamodb.Attribute(name="tenant_id", type=dynamodb.AttributeType.STRING),
+                sort_key=dynamodb.Attribute(name="updated_at", type=dynamodb.AttributeType.NUMBER),
+                projection_type=dynamodb.ProjectionType.ALL
+            )
+
         # S3 Bucket for backups
         self.backup_bucket = s3.Bucket(
             self, "BackupBucket",
@@ -69,7 +102,17 @@ class DataStack(Stack):
             versioned=True,
             block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
             removal_policy=RemovalPolicy.DESTROY,
-            auto_delete_objects=True
+            auto_delete_objects=True,
+            lifecycle_rules=[
+                # Exports stream through multipart uploads; drop the parts of any that died
+                s3.LifecycleRule(abort_incomplete_multipart_upload_after=Duration.days(1)),
+                s3.LifecycleRule(
+                    prefix="exports/",
+                    expiration=Duration.days(7),
+                    noncurrent_version_expiration=Duration.days(1)
+                ),
+                s3.LifecycleRule(prefix="restores/", expiration=Duration.days(30))
+            ]
         )
 
         # Store table names in SSM
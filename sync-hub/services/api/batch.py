@@ -0,0 +1,160 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+
+from botocore.exceptions import ClientError
+
+import db
+
+# DynamoDB hard limits per BatchWriteItem / BatchGetItem call
+MAX_BATCH_WRITE = 25
+MAX_BATCH_GET = 100
+# Largest batch accepted from a single API request
+MAX_REQUEST_ITEMS = 100
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "8"))
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 0.05
+BACKOFF_CAP = 2.0
+# Whole-call rejections that are retried like unprocessed items
+THROTTLING_ERRORS = {"ProvisionedThroughputExceededException", "RequestLimitExceeded", "ThrottlingException"}
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def batch_entries(body: Dict[str, Any], field: str) -> List[Any]:
+    """Validate the list carried by a batch request body."""
+    entries = body.get(field)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{field} must be a non-empty list")
+    if len(entries) > MAX_REQUEST_ITEMS:
+        raise ValueError(f"At most {MAX_REQUEST_ITEMS} {field} per request")
+    return entries
+
+
+def _backoff(attempt: int) -> None:
+    # Full jitter: spread retries of throttled chunks across workers
+    time.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)))
+
+
+def _throttled(error: ClientError) -> bool:
+    return error.response.get("Error", {}).get("Code") in THROTTLING_ERRORS
+
+
+def _write_chunk(table_name: str, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    pending = {table_name: requests}
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            response = db.client().batch_write_item(RequestItems=pending)
+        except ClientError as e:
+            if not _throttled(e):
+                raise
+            _backoff(attempt)
+            continue
+        pending = response.get("UnprocessedItems") or {}
+        if not pending:
+            return []
+        _backoff(attempt)
+    return pending.get(table_name, [])
+
+
+def batch_write(table_name: str, requests: List[Dict[str, Any]], workers: int = BATCH_WORKERS) -> List[Dict[str, Any]]:
+    """Write ``PutRequest``/``DeleteRequest`` entries in chunks of 25 on a bounded pool.
+    
+    ``UnprocessedItems`` are retried with jittered exponential backoff. Whatever is
+    still unprocessed after ``MAX_ATTEMPTS`` is returned to the caller.
+    """
+    chunks = _chunks(requests, MAX_BATCH_WRITE)
+    if not chunks:
+        return []
+    if len(chunks) == 1 or workers <= 1:
+        return [request for chunk in chunks for request in _write_chunk(table_name, chunk)]
+    
+    with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        results = executor.map(lambda chunk: _write_chunk(table_name, chunk), chunks)
+        return [request for unprocessed in results for request in unprocessed]
+
+
+class BatchWriter:
+    """Stream puts into BatchWriteItem chunks, written concurrently on a bounded pool.
+    
+    Each table fills its own chunk of 25. ``put`` blocks while ``workers * 2`` chunks
+    are in flight, so memory stays bounded however long the stream is. ``flush``
+    writes the partial chunks, waits for everything submitted so far and returns the
+    requests that stayed unprocessed.
+    """
+    
+    def __init__(self, workers: int = BATCH_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(workers * 2)
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._futures: List[Future] = []
+    
+    def put(self, table_name: str, item: Dict[str, Any]) -> None:
+        buffer = self._buffers.setdefault(table_name, [])
+        buffer.append({"PutRequest": {"Item": item}})
+        if len(buffer) >= MAX_BATCH_WRITE:
+            self._submit(table_name, buffer)
+            self._buffers[table_name] = []
+    
+    def _submit(self, table_name: str, requests: List[Dict[str, Any]]) -> None:
+        self._slots.acquire()
+        future = self._executor.submit(_write_chunk, table_name, requests)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+    
+    def flush(self) -> List[Dict[str, Any]]:
+        for table_name, buffer in self._buffers.items():
+            if buffer:
+                self._submit(table_name, buffer)
+        self._buffers = {}
+        futures, self._futures = self._futures, []
+        return [request for future in futures for request in future.result()]
+    
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def _get_chunk(table_name: str, keys: List[Dict[str, Any]],
+               consistent_read: bool = False) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    items: List[Dict[str, Any]] = []
+    pending = {table_name: {"Keys": keys, "ConsistentRead": consistent_read}}
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            response = db.client().batch_get_item(RequestItems=pending)
+        except ClientError as e:
+            if not _throttled(e):
+                raise
+            _backoff(attempt)
+            continue
+        items.extend(response.get("Responses", {}).get(table_name, []))
+        pending = response.get("UnprocessedKeys") or {}
+        if not pending:
+            return items, []
+        _backoff(attempt)
+    return items, pending.get(table_name, {}).get("Keys", [])
+
+
+def batch_get(table_name: str, keys: List[Dict[str, Any]], workers: int = BATCH_WORKERS,
+              consistent_read: bool = False) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Read ``keys`` in chunks of 100 on a bounded pool.
+    
+    Keys must be unique. Returns ``(items, unprocessed_keys)``; items come back in
+    no particular order and missing keys are simply absent.
+    """
+    chunks = _chunks(keys, MAX_BATCH_GET)
+    if not chunks:
+        return [], []
+    if len(chunks) == 1 or workers <= 1:
+        results = [_get_chunk(table_name, chunk, consistent_read) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            results = list(executor.map(lambda chunk: _get_chunk(table_name, chunk, consistent_read), chunks))
+    
+    items = [item for found, _ in results for item in found]
+    unprocessed = [key for _, missed in results for key in missed]
+    return items, unprocessed
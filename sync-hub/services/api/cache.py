@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Hashable, Optional, Tuple
+
+from aws_lambda_powertools import Metrics
+from aws_lambda_powertools.metrics import MetricUnit
+
+metrics = Metrics()
+
+
+class StampedCache:
+    """Per-container LRU cache whose entries are tied to a per-tenant version stamp.
+
+    An entry is served only while the tenant's stamp and local generation are
+    unchanged and its TTL has not passed. The stamp is read *before* the loader
+    runs, so a fill that races with a writer is tagged with the older stamp and
+    is discarded as soon as the writer's stamp bump becomes visible.
+    """
+
+    def __init__(self, name: str, stamp_loader: Callable[[str], Any], max_entries: int,
+                 ttl_seconds: float, stamp_refresh_seconds: float):
+        self.name = name
+        self._stamp_loader = stamp_loader
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._stamp_refresh = stamp_refresh_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[Any, int, float, Any]]" = OrderedDict()
+        self._stamps: Dict[str, Tuple[Any, float]] = {}
+        self._generations: Dict[str, int] = {}
+
+    def _stamp(self, tenant_id: str) -> Any:
+        now = time.monotonic()
+        cached = self._stamps.get(tenant_id)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        stamp = self._stamp_loader(tenant_id)
+        self._stamps[tenant_id] = (stamp, now + self._stamp_refresh)
+        return stamp
+
+    def _count(self, event: str, value: int = 1) -> None:
+        metrics.add_metric(name=f"{self.name}Cache{event}", unit=MetricUnit.Count, value=value)
+
+    def get(self, tenant_id: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            stamp = self._stamp(tenant_id)
+            generation = self._generations.get(tenant_id, 0)
+            entry = self._entries.get((tenant_id, key))
+            if entry is not None:
+                entry_stamp, entry_generation, expires_at, value = entry
+                if entry_stamp == stamp and entry_generation == generation and expires_at > time.monotonic():
+                    self._entries.move_to_end((tenant_id, key))
+                    self._count("Hit")
+                    return value
+                del self._entries[(tenant_id, key)]
+                self._count("Eviction")
+
+        self._count("Miss")
+        value = loader()
+
+        with self._lock:
+            # A local write during the load bumped the generation: do not cache stale data
+            if self._generations.get(tenant_id, 0) != generation:
+                return value
+            self._entries[(tenant_id, key)] = (stamp, generation, time.monotonic() + self._ttl, value)
+            self._entries.move_to_end((tenant_id, key))
+            evicted = 0
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self._count("Eviction", evicted)
+        return value
+
+    def invalidate(self, tenant_id: str) -> None:
+        """Drop a tenant's entries after a write from this container (read-your-writes)."""
+        with self._lock:
+            self._generations[tenant_id] = self._generations.get(tenant_id, 0) + 1
+            self._stamps.pop(tenant_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stamps.clear()
+            self._generations.clear()
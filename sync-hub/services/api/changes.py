@@ -0,0 +1,41 @@
+import os
+import time
+from typing import Dict, Any
+
+from boto3.dynamodb.conditions import Attr
+
+# Per-tenant GSI on updated_at (settings, bookmarks, groups) that backs GET /sync/changes
+CHANGES_INDEX = "changes-index"
+
+# Sparse index: only public settings carry the partition attribute, which the
+# stream consumer sets and clears
+PUBLIC_INDEX = "public-settings-index"
+PUBLIC_FEED = "public"
+
+# Tombstones must outlive the longest gap between two syncs of a client
+TOMBSTONE_TTL = int(os.environ.get("TOMBSTONE_TTL_DAYS", "30")) * 24 * 3600
+
+# Filter for list queries, and condition for writes that must not touch deleted items
+LIVE = Attr('deleted').not_exists()
+LIVE_CONDITION = "attribute_not_exists(deleted)"
+
+
+def is_live(item: Dict[str, Any]) -> bool:
+    return item is not None and not item.get("deleted")
+
+
+def tombstone(key: Dict[str, Any]) -> Dict[str, Any]:
+    now = int(time.time())
+    return dict(key, deleted=True, updated_at=now, ttl=now + TOMBSTONE_TTL)
+
+
+def soft_delete(table, key: Dict[str, Any]) -> bool:
+    """Replace a live item with a tombstone; False if it was missing or already deleted."""
+    try:
+        table.put_item(
+            Item=tombstone(key),
+            ConditionExpression=f"attribute_exists(tenant_id) AND {LIVE_CONDITION}"
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        return False
+    return True
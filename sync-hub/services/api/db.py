@@ -0,0 +1,45 @@
+import os
+import threading
+from typing import Dict, Any
+
+import boto3
+
+# One DynamoDB resource per process; tables are created on first use
+_lock = threading.RLock()
+_resource = None
+_raw_client = None
+_tables: Dict[str, Any] = {}
+
+
+def resource():
+    global _resource
+    if _resource is None:
+        with _lock:
+            if _resource is None:
+                _resource = boto3.resource('dynamodb')
+    return _resource
+
+
+def client():
+    return resource().meta.client
+
+
+def raw_client():
+    """Plain DynamoDB client: wire-format attribute values, no automatic (de)serialization."""
+    global _raw_client
+    if _raw_client is None:
+        with _lock:
+            if _raw_client is None:
+                _raw_client = boto3.client('dynamodb')
+    return _raw_client
+
+
+def table(env_name: str):
+    """Return the table named by environment variable ``env_name``."""
+    cached = _tables.get(env_name)
+    if cached is None:
+        with _lock:
+            cached = _tables.get(env_name)
+            if cached is None:
+                cached = _tables[env_name] = resource().Table(os.environ[env_name])
+    return cached
@@ -0,0 +1,153 @@
+import os
+from decimal import Decimal
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer
+
+import db
+from pagination import decode_token, encode_token, page_params
+
+# Anything a codec does not know about goes through boto3's generic (reflective) path
+_deserializer = TypeDeserializer()
+_generic = _deserializer.deserialize
+
+Decoder = Callable[[Dict[str, Any]], Any]
+
+
+def _string(value: Dict[str, Any]) -> Any:
+    s = value.get("S")
+    return s if s is not None else _generic(value)
+
+
+def _number(value: Dict[str, Any]) -> Any:
+    n = value.get("N")
+    if n is None:
+        return _generic(value)
+    # Timestamps, versions and counters are integers; anything else stays exact
+    try:
+        return int(n)
+    except ValueError:
+        return _generic(value)
+
+
+def _boolean(value: Dict[str, Any]) -> Any:
+    b = value.get("BOOL")
+    return b if b is not None else _generic(value)
+
+
+def _string_list(value: Dict[str, Any]) -> Any:
+    items = value.get("L")
+    if items is None:
+        return _generic(value)
+    try:
+        return [item["S"] for item in items]
+    except KeyError:
+        return _generic(value)
+
+
+S, N, BOOL, STRINGS, ANY = _string, _number, _boolean, _string_list, _generic
+
+
+def _encode(value: Any) -> Dict[str, Any]:
+    # Scalars only: expression values and key attributes
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if isinstance(value, str):
+        return {"S": value}
+    if isinstance(value, (int, float, Decimal)):
+        return {"N": str(value)}
+    raise TypeError(f"Unsupported key or expression value: {type(value).__name__}")
+
+
+class Entity:
+    """Codec for one table: decodes known attributes with fixed, type-specific functions."""
+
+    def __init__(self, table_env: str, fields: Dict[str, Decoder]):
+        self.table_env = table_env
+        self.fields = fields
+
+    @property
+    def table_name(self) -> str:
+        return os.environ[self.table_env]
+
+    def decode(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        fields = self.fields
+        return {
+            name: (fields.get(name) or _generic)(value)
+            for name, value in item.items()
+        }
+
+    def encode_key(self, key: Dict[str, Any]) -> Dict[str, Any]:
+        return {name: _encode(value) for name, value in key.items()}
+
+    def query(self, key_condition: str, values: Dict[str, Any], names: Optional[Dict[str, str]] = None,
+              index: Optional[str] = None, filter_expression: Optional[str] = None,
+              projection: Optional[List[str]] = None, limit: Optional[int] = None,
+              start_key: Optional[Dict[str, Any]] = None,
+              forward: bool = True) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        names = dict(names or {})
+        params: Dict[str, Any] = {
+            "TableName": self.table_name,
+            "KeyConditionExpression": key_condition,
+            "ExpressionAttributeValues": {name: _encode(value) for name, value in values.items()},
+            "ScanIndexForward": forward
+        }
+        if index:
+            params["IndexName"] = index
+        if filter_expression:
+            params["FilterExpression"] = filter_expression
+        if projection:
+            # Aliases avoid clashes with reserved words (name, value, status, ttl, ...)
+            aliases = [f"#p{i}" for i in range(len(projection))]
+            names.update(zip(aliases, projection))
+            params["ProjectionExpression"] = ", ".join(aliases)
+        if names:
+            params["ExpressionAttributeNames"] = names
+        if limit:
+            params["Limit"] = limit
+        if start_key:
+            params["ExclusiveStartKey"] = self.encode_key(start_key)
+
+        response = db.raw_client().query(**params)
+        decode = self.decode
+        items = [decode(item) for item in response["Items"]]
+        last_key = response.get("LastEvaluatedKey")
+        return items, (decode(last_key) if last_key else None)
+
+    def query_page(self, event: Dict[str, Any], scope: str,
+                   **query_kwargs) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Like ``pagination.query_page``, over the low-level client."""
+        limit, token = page_params(event)
+        start_key = decode_token(token, scope) if token else None
+
+        items, last_key = self.query(limit=limit, start_key=start_key, **query_kwargs)
+        return items, (encode_token(last_key, scope) if last_key else None)
+
+
+SETTINGS = Entity("SETTINGS_TABLE", {
+    "tenant_id": S, "setting_id": S, "name": S, "value": ANY, "is_public": BOOL,
+    "version": N, "created_at": N, "updated_at": N, "public_feed": S,
+    "history_retention": N, "deleted": BOOL, "ttl": N
+})
+
+BOOKMARKS = Entity("BOOKMARKS_TABLE", {
+    "tenant_id": S, "bookmark_id": S, "title": S, "url": S, "tags": STRINGS,
+    "version": N, "created_at": N, "updated_at": N, "deleted": BOOL, "ttl": N
+})
+
+GROUPS = Entity("GROUPS_TABLE", {
+    "tenant_id": S, "group_id": S, "name": S, "description": S, "owner_id": S,
+    "version": N, "created_at": N, "updated_at": N, "deleted": BOOL, "ttl": N
+})
+
+MEMBERS = Entity("GROUP_MEMBERS_TABLE", {
+    "tenant_id": S, "group_id#user_id": S, "group_id": S, "user_id": S,
+    "role": S, "joined_at": N
+})
+
+SESSIONS = Entity("SESSIONS_TABLE", {
+    "tenant_id": S, "session_id": S, "device_code": S, "status": S,
+    "created_at": N, "confirmed_at": N, "ttl": N,
+    "emoji_feedback": S, "feedback_at": N, "feedback_count": N, "bucket_start": N, "total": N,
+    "owner_tenant_id": S, "owner_session_id": S
+})
@@ -0,0 +1,254 @@
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+import boto3
+from aws_lambda_powertools import Logger
+
+import serializer
+from changes import is_live
+from entities import BOOKMARKS, GROUPS, MEMBERS, SESSIONS, SETTINGS
+from http_responses import COMPRESSION_LEVEL
+
+logger = Logger()
+
+# Tenant exports: every table is queried concurrently and the rows are streamed as
+# gzip NDJSON into an S3 multipart upload. Memory is bounded by the page queue and
+# one part buffer, whatever the size of the tenant.
+
+# S3 needs at least 5 MiB per part, except the last one
+PART_SIZE = max(int(os.environ.get("EXPORT_PART_SIZE_MB", "8")), 5) * 1024 * 1024
+
+# Query pages waiting for the writer; readers block when it falls behind
+QUEUE_PAGES = 8
+
+# (table name in the export, entity, partition values relative to the tenant)
+SOURCES = (
+    ("settings", SETTINGS, ("", "#history")),
+    ("bookmarks", BOOKMARKS, ("",)),
+    ("groups", GROUPS, ("",)),
+    ("group_members", MEMBERS, ("",)),
+    ("sessions", SESSIONS, ("", "#feedback"))
+)
+
+FORMAT_VERSION = 1
+
+# Settings partitions of each of the tenant's groups, with the stamp effective settings watch
+GROUP_SUFFIXES = ("#group#{group_id}", "#group#{group_id}#meta")
+
+_lock = threading.Lock()
+_client = None
+
+
+def s3_client():
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = boto3.client('s3')
+    return _client
+
+
+def export_key(tenant_id: str, export_id: str) -> str:
+    return f"exports/{tenant_id}/{export_id}.ndjson.gz"
+
+
+def export_state_key(tenant_id: str, export_id: str) -> str:
+    return f"exports/{tenant_id}/{export_id}.json"
+
+
+def load_export_state(tenant_id: str, export_id: str) -> Optional[Dict[str, Any]]:
+    client = s3_client()
+    try:
+        response = client.get_object(Bucket=os.environ["BACKUP_BUCKET"], Key=export_state_key(tenant_id, export_id))
+    except client.exceptions.NoSuchKey:
+        return None
+    return json.loads(response["Body"].read())
+
+
+def save_export_state(tenant_id: str, export_id: str, status: str, error: Optional[str] = None) -> Dict[str, Any]:
+    """Record a job's status; the export file itself is the record of a finished one."""
+    state = {"tenant_id": tenant_id, "export_id": export_id, "status": status, "updated_at": int(time.time())}
+    if error is not None:
+        state["error"] = error
+    s3_client().put_object(
+        Bucket=os.environ["BACKUP_BUCKET"],
+        Key=export_state_key(tenant_id, export_id),
+        Body=serializer.dumpb(state),
+        ContentType="application/json"
+    )
+    return state
+
+
+class _GzipMultipartWriter:
+    """Gzip-compress a byte stream into an S3 multipart upload, one part at a time."""
+    
+    def __init__(self, bucket: str, key: str):
+        self.bucket = bucket
+        self.key = key
+        self._compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+        self._buffer = bytearray()
+        self._parts = []
+        self._upload_id = s3_client().create_multipart_upload(
+            Bucket=bucket, Key=key,
+            ContentType="application/x-ndjson",
+            ContentEncoding="gzip"
+        )["UploadId"]
+    
+    def write(self, data: bytes) -> None:
+        self._buffer += self._compressor.compress(data)
+        if len(self._buffer) >= PART_SIZE:
+            self._upload_part()
+    
+    def _upload_part(self) -> None:
+        part_number = len(self._parts) + 1
+        response = s3_client().upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+            PartNumber=part_number, Body=bytes(self._buffer)
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+        self._buffer.clear()
+    
+    def close(self) -> int:
+        self._buffer += self._compressor.flush()
+        self._upload_part()
+        s3_client().complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts}
+        )
+        return len(self._parts)
+    
+    def abort(self) -> None:
+        s3_client().abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+
+
+def _group_suffixes(tenant_id: str) -> Tuple[str, ...]:
+    suffixes = []
+    start_key = None
+    while True:
+        groups, start_key = GROUPS.query(
+            key_condition="tenant_id = :tenant",
+            values={":tenant": tenant_id},
+            projection=["group_id", "owner_id", "deleted"],
+            start_key=start_key
+        )
+        for group in groups:
+            if is_live(group) and group.get("owner_id") == tenant_id:
+                suffixes.extend(suffix.format(group_id=group["group_id"]) for suffix in GROUP_SUFFIXES)
+        if not start_key:
+            return tuple(suffixes)
+
+
+def _read_source(name: str, entity, partitions, tenant_id: str, pages: "queue.Queue", stop: threading.Event) -> None:
+    # Producer: one paginated query per partition, each page handed to the writer
+    def put(message) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(message, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    try:
+        for suffix in partitions:
+            start_key = None
+            while True:
+                items, start_key = entity.query(
+                    key_condition="tenant_id = :tenant",
+                    values={":tenant": f"{tenant_id}{suffix}"},
+                    start_key=start_key
+                )
+                if not put((name, [item for item in items if is_live(item)], None)):
+                    return
+                if not start_key:
+                    break
+        put((name, None, None))
+    except Exception as e:
+        put((name, None, e))
+
+
+def export_tenant(tenant_id: str, export_id: str) -> Dict[str, Any]:
+    """Stream all of a tenant's rows to ``exports/<tenant>/<export_id>.ndjson.gz``.
+    
+    The first line describes the export, then one line per row, then an ``end``
+    line with per-table counts. A file without the ``end`` line is incomplete.
+    """
+    bucket = os.environ["BACKUP_BUCKET"]
+    key = export_key(tenant_id, export_id)
+    # A retried invocation starts over, so an earlier failure no longer applies
+    save_export_state(tenant_id, export_id, "pending")
+    try:
+        writer = _GzipMultipartWriter(bucket, key)
+    except Exception as e:
+        logger.exception("Error starting tenant export", extra={"export_id": export_id})
+        save_export_state(tenant_id, export_id, "failed", str(e))
+        raise
+    pages: "queue.Queue" = queue.Queue(maxsize=QUEUE_PAGES)
+    stop = threading.Event()
+    counts = {name: 0 for name, _, _ in SOURCES}
+    
+    try:
+        writer.write(serializer.dumpb({
+            "type": "export", "format": FORMAT_VERSION, "tenant_id": tenant_id,
+            "export_id": export_id, "started_at": int(time.time())
+        }) + b"\n")
+        
+        group_suffixes = _group_suffixes(tenant_id)
+        with ThreadPoolExecutor(max_workers=len(SOURCES)) as executor:
+            try:
+                for name, entity, partitions in SOURCES:
+                    if entity is SETTINGS:
+                        partitions += group_suffixes
+                    executor.submit(_read_source, name, entity, partitions, tenant_id, pages, stop)
+                
+                remaining = len(SOURCES)
+                while remaining:
+                    name, items, error = pages.get()
+                    if error is not None:
+                        raise error
+                    if items is None:
+                        remaining -= 1
+                        continue
+                    writer.write(b"".join(
+                        serializer.dumpb({"type": "item", "table": name, "item": item}) + b"\n"
+                        for item in items
+                    ))
+                    counts[name] += len(items)
+            finally:
+                stop.set()
+        
+        writer.write(serializer.dumpb({"type": "end", "counts": counts}) + b"\n")
+        parts = writer.close()
+    except Exception as e:
+        logger.exception("Error exporting tenant", extra={"export_id": export_id})
+        writer.abort()
+        save_export_state(tenant_id, export_id, "failed", str(e))
+        raise
+    
+    logger.info("Tenant export complete", extra={"export_id": export_id, "counts": counts, "parts": parts})
+    return {"key": key, "counts": counts, "parts": parts}
+
+
+def describe_export(tenant_id: str, export_id: str, url_expires: int = 900) -> Optional[Dict[str, Any]]:
+    """Size and a download URL for a finished export, None while it is still running."""
+    bucket = os.environ["BACKUP_BUCKET"]
+    key = export_key(tenant_id, export_id)
+    client = s3_client()
+    try:
+        head = client.head_object(Bucket=bucket, Key=key)
+    except client.exceptions.ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+    return {
+        "size": head["ContentLength"],
+        "url": client.generate_presigned_url(
+            "get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=url_expires
+        )
+    }
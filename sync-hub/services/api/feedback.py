@@ -0,0 +1,157 @@
+import os
+import time
+import unicodedata
+from typing import Dict, Any, List, Optional
+
+# Emoji feedback counters. Each reaction adds one to a per-emoji counter on the session
+# and on the tenant's hour and day rollup items, so summaries read a few pre-aggregated
+# items instead of scanning sessions. Rollups live in the `<tenant>#feedback` partition
+# of the sessions table, sorted by bucket start.
+
+# Counter attributes are `emoji#<emoji>`; the emoji itself is only ever an attribute name
+COUNTER_PREFIX = "emoji#"
+MAX_EMOJI_LENGTH = 16
+
+# Distinct counters one item may hold; later emoji are counted under OTHER_EMOJI,
+# which keeps every item far below DynamoDB's 400 KB limit
+MAX_EMOJI_KINDS = int(os.environ.get("FEEDBACK_MAX_EMOJI_KINDS", "64"))
+OTHER_EMOJI = "other"
+
+PERIODS = {"hour": 3600, "day": 86400}
+
+# Hour buckets expire through the table's TTL; day buckets are kept
+HOURLY_RETENTION = 31 * 86400
+
+# Widest range one summary request may cover, in buckets
+MAX_BUCKETS = {"hour": HOURLY_RETENTION // 3600, "day": 366}
+
+_ZWJ = "\u200d"
+# Variation selector 16, combining keycap, skin tones and the tag characters of subdivision flags
+_MODIFIERS = ({"\ufe0f", "\u20e3"} | {chr(code) for code in range(0x1F3FB, 0x1F400)}
+              | {chr(code) for code in range(0xE0020, 0xE0080)})
+_KEYCAP_BASES = set("#*0123456789")
+_REGIONAL_INDICATORS = {chr(code) for code in range(0x1F1E6, 0x1F200)}
+
+
+def is_emoji(text: Any) -> bool:
+    """One emoji: a symbol with its modifiers, symbols joined by ZWJ, or a flag."""
+    if not isinstance(text, str) or not 1 <= len(text) <= MAX_EMOJI_LENGTH:
+        return False
+    if all(char in _REGIONAL_INDICATORS for char in text):
+        return len(text) == 2
+    
+    expect_symbol = True
+    for char in text:
+        if char == _ZWJ or char in _MODIFIERS:
+            if expect_symbol:
+                return False
+            expect_symbol = char == _ZWJ
+        elif expect_symbol and (unicodedata.category(char) == "So" or (char in _KEYCAP_BASES and text.endswith("\u20e3"))):
+            expect_symbol = False
+        else:
+            return False
+    return not expect_symbol
+
+
+def feedback_partition(tenant_id: str) -> str:
+    return f"{tenant_id}#feedback"
+
+
+def bucket_start(period: str, timestamp: int) -> int:
+    return timestamp - timestamp % PERIODS[period]
+
+
+def bucket_id(period: str, start: int) -> str:
+    # Zero-padded, so buckets sort by time within a period
+    return f"{period}#{start:012d}"
+
+
+def counts(item: Dict[str, Any]) -> Dict[str, int]:
+    return {name[len(COUNTER_PREFIX):]: int(value) for name, value in item.items() if name.startswith(COUNTER_PREFIX)}
+
+
+# (counter, update, condition): bump a known counter, else take a free slot for a new one;
+# twice, as another request may add the same counter in between; else count it as other
+_ATTEMPTS = (
+    ("emoji", "ADD #counter :one, #total :one", "attribute_exists(#counter)"),
+    ("emoji", "ADD #counter :one, #total :one, emoji_kinds :one",
+     "attribute_not_exists(#counter) AND (attribute_not_exists(emoji_kinds) OR emoji_kinds < :max_kinds)")
+) * 2 + (
+    ("other", "ADD #counter :one, #total :one", None),
+)
+
+
+def _add_reaction(table, key: Dict[str, str], emoji: str, total: str, set_expression: str,
+                  names: Dict[str, str], values: Dict[str, Any], guard: Optional[str] = None) -> bool:
+    """Add one to the item's counter for ``emoji`` and to its ``total``.
+    
+    Plain ADD updates, which commute, so concurrent reactions never conflict.
+    Returns False when ``guard`` fails.
+    """
+    for counter, add, condition in _ATTEMPTS:
+        update_names = dict(names, **{"#counter": COUNTER_PREFIX + (emoji if counter == "emoji" else OTHER_EMOJI),
+                                      "#total": total})
+        update_values = dict(values, **{":one": 1})
+        conditions = [f"({part})" for part in (condition, guard) if part]
+        if condition and ":max_kinds" in condition:
+            update_values[":max_kinds"] = MAX_EMOJI_KINDS
+        
+        update = {
+            "Key": key,
+            "UpdateExpression": f"{add} SET {set_expression}",
+            "ExpressionAttributeNames": update_names,
+            "ExpressionAttributeValues": update_values
+        }
+        if conditions:
+            update["ConditionExpression"] = " AND ".join(conditions)
+        try:
+            table.update_item(**update)
+            return True
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            if condition is None:
+                return False
+    return False
+
+
+def record_feedback(table, tenant_id: str, session_id: str, emoji: str) -> bool:
+    """Count one reaction on the session and in the tenant's rollups.
+    
+    Returns False, counting nothing, when the session does not exist. The rollups are
+    tenant-wide hot items, so they are separate updates rather than one transaction
+    that concurrent reactions would cancel.
+    """
+    now = int(time.time())
+    if not _add_reaction(table, {"tenant_id": tenant_id, "session_id": session_id}, emoji, "feedback_count",
+                         "emoji_feedback = :emoji, feedback_at = :now", {}, {":emoji": emoji, ":now": now},
+                         guard="attribute_exists(session_id)"):
+        return False
+    
+    for period in PERIODS:
+        start = bucket_start(period, now)
+        key = {"tenant_id": feedback_partition(tenant_id), "session_id": bucket_id(period, start)}
+        if period == "hour":
+            _add_reaction(table, key, emoji, "total", "bucket_start = :start, #ttl = :expires",
+                          {"#ttl": "ttl"}, {":start": start, ":expires": start + HOURLY_RETENTION})
+        else:
+            _add_reaction(table, key, emoji, "total", "bucket_start = :start", {}, {":start": start})
+    return True
+
+
+def read_rollups(table, tenant_id: str, period: str, start: int, end: int) -> List[Dict[str, Any]]:
+    """Rollup buckets of one period starting within [start, end], oldest first."""
+    query_kwargs = {
+        "KeyConditionExpression": "tenant_id = :partition AND session_id BETWEEN :first AND :last",
+        "ExpressionAttributeValues": {
+            ":partition": feedback_partition(tenant_id),
+            ":first": bucket_id(period, bucket_start(period, start)),
+            ":last": bucket_id(period, bucket_start(period, end))
+        }
+    }
+    buckets = []
+    while True:
+        response = table.query(**query_kwargs)
+        for item in response["Items"]:
+            buckets.append({"start": int(item["bucket_start"]), "total": int(item.get("total", 0)), "counts": counts(item)})
+        if "LastEvaluatedKey" not in response:
+            return buckets
+        query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
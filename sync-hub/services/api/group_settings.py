@@ -0,0 +1,233 @@
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from batch import BATCH_WORKERS, batch_get
+from changes import LIVE_CONDITION, is_live
+from entities import GROUPS, MEMBERS, SETTINGS
+from stamps import stamp_key
+
+# Group settings and the effective settings built from them. A group's settings live
+# in the `<owner>#group#<group_id>` partition of the settings table, one item per name,
+# and the stream consumer keeps a change stamp for that partition as it does for tenants.
+# A user's effective settings are their own settings over those of every group they are in.
+
+# GSI on the members table keyed by user_id; member items already carry it
+MEMBER_GROUPS_INDEX = "member-groups-index"
+MEMBERSHIP_FIELDS = ["tenant_id", "group_id", "role", "joined_at"]
+
+# Members with these roles may change a group's settings
+EDITOR_ROLES = ("owner", "admin")
+
+MAX_NAME_LENGTH = 200
+MAX_GROUP_SETTINGS_PER_REQUEST = 100
+
+LAYER_FIELDS = ["name", "value", "updated_at"]
+
+# Verified memberships are reused this long per container, so a stamp check, about once a
+# second, is a single stamps BatchGetItem instead of an index query and a groups read as well
+MEMBERSHIP_CACHE_SECONDS = float(os.environ.get("MEMBERSHIP_CACHE_SECONDS", "30"))
+MEMBERSHIP_CACHE_MAX_ENTRIES = int(os.environ.get("SETTINGS_CACHE_MAX_ENTRIES", "1000"))
+
+_membership_lock = threading.Lock()
+_membership_cache: Dict[str, Tuple[List[Dict[str, Any]], float]] = {}
+
+
+class AmbiguousMembership(Exception):
+    pass
+
+
+def group_partition(owner_id: str, group_id: str) -> str:
+    return f"{owner_id}#group#{group_id}"
+
+
+def is_group_partition(partition: str) -> bool:
+    # `<owner>#group#<group_id>` only; its `#meta` stamp partition has one more part
+    parts = partition.split("#")
+    return len(parts) == 3 and parts[1] == "group"
+
+
+def group_setting(owner_id: str, group_id: str, name: str, value: Any, user_id: str) -> Dict[str, Any]:
+    return {
+        "tenant_id": group_partition(owner_id, group_id),
+        "setting_id": name,
+        "name": name,
+        "value": value,
+        "updated_by": user_id,
+        "updated_at": int(time.time())
+    }
+
+
+def is_accepted(member: Dict[str, Any]) -> bool:
+    # Invitations carry invited_at; joined_at is only set once the invitee accepts
+    return "joined_at" in member
+
+
+def as_invitation(member: Dict[str, Any]) -> Dict[str, Any]:
+    """The member row as a pending invitation, for rows the invitee never accepted through the API."""
+    invitation = {name: value for name, value in member.items() if name != "joined_at"}
+    invitation["role"] = "member"
+    invitation["invited_at"] = member.get("invited_at") or member.get("joined_at") or int(time.time())
+    return invitation
+
+
+def _member_rows(user_id: str, group_id: Optional[str] = None, accepted: bool = True) -> List[Dict[str, Any]]:
+    key_condition = "user_id = :user"
+    values = {":user": user_id}
+    if group_id is not None:
+        key_condition += " AND group_id = :group"
+        values[":group"] = group_id
+    
+    items: List[Dict[str, Any]] = []
+    start_key = None
+    while True:
+        page, start_key = MEMBERS.query(
+            index=MEMBER_GROUPS_INDEX,
+            key_condition=key_condition,
+            values=values,
+            filter_expression="attribute_exists(joined_at)" if accepted else "attribute_not_exists(joined_at)",
+            projection=MEMBERSHIP_FIELDS,
+            start_key=start_key
+        )
+        items.extend(page)
+        if start_key is None:
+            return items
+
+
+def verify_owners(members: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The member rows whose group is live in the row's partition and owned by that tenant.
+    
+    Anyone can write member rows into their own partition, so the partition alone
+    does not prove who owns a group; the groups table does.
+    """
+    keys = {(member["tenant_id"], member["group_id"]) for member in members}
+    if not keys:
+        return []
+    groups, unprocessed = batch_get(GROUPS.table_name, [{"tenant_id": tenant_id, "group_id": group_id} for tenant_id, group_id in keys])
+    if unprocessed:
+        raise RuntimeError("Group reads were throttled")
+    
+    owned = {(group["tenant_id"], group["group_id"]) for group in groups
+             if is_live(group) and group.get("owner_id") == group["tenant_id"]}
+    return [member for member in members if (member["tenant_id"], member["group_id"]) in owned]
+
+
+def _single(members: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if len(members) > 1:
+        raise AmbiguousMembership("Several groups share this group_id")
+    return members[0] if members else None
+
+
+def memberships(user_id: str) -> List[Dict[str, Any]]:
+    """Every group the user has joined, most recently joined first; pending invitations are left out.
+    
+    A group_id claimed by more than one owner is left out too, rather than guessing.
+    """
+    items = verify_owners(_member_rows(user_id))
+    claims = Counter(item["group_id"] for item in items)
+    items = [item for item in items if claims[item["group_id"]] == 1]
+    items.sort(key=lambda item: (item["joined_at"], item["group_id"]), reverse=True)
+    return items
+
+
+def _remember(user_id: str, groups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    with _membership_lock:
+        _membership_cache.pop(user_id, None)
+        _membership_cache[user_id] = (groups, time.monotonic() + MEMBERSHIP_CACHE_SECONDS)
+        while len(_membership_cache) > MEMBERSHIP_CACHE_MAX_ENTRIES:
+            _membership_cache.pop(next(iter(_membership_cache)))
+    return groups
+
+
+def cached_memberships(user_id: str) -> List[Dict[str, Any]]:
+    """``memberships``, reused for MEMBERSHIP_CACHE_SECONDS."""
+    with _membership_lock:
+        cached = _membership_cache.get(user_id)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    return _remember(user_id, memberships(user_id))
+
+
+def forget_memberships(user_id: str) -> None:
+    with _membership_lock:
+        _membership_cache.pop(user_id, None)
+
+
+def membership(user_id: str, group_id: str) -> Optional[Dict[str, Any]]:
+    """The user's accepted membership of the group; raises AmbiguousMembership when several owners claim it."""
+    return _single(verify_owners(_member_rows(user_id, group_id)))
+
+
+def invitation(user_id: str, group_id: str) -> Optional[Dict[str, Any]]:
+    """The user's pending invitation to the group; raises AmbiguousMembership when several owners claim it."""
+    return _single(verify_owners(_member_rows(user_id, group_id, accepted=False)))
+
+
+def read_layer(partition: str) -> Dict[str, Dict[str, Any]]:
+    """Live settings of one partition by name; of duplicate names the latest update wins."""
+    layer: Dict[str, Dict[str, Any]] = {}
+    start_key = None
+    while True:
+        items, start_key = SETTINGS.query(
+            key_condition="tenant_id = :partition",
+            values={":partition": partition},
+            filter_expression=LIVE_CONDITION,
+            projection=LAYER_FIELDS,
+            start_key=start_key
+        )
+        for item in items:
+            name = item.get("name")
+            if not isinstance(name, str):
+                continue
+            current = layer.get(name)
+            if current is None or item.get("updated_at", 0) >= current.get("updated_at", 0):
+                layer[name] = item
+        if start_key is None:
+            return layer
+
+
+def _partitions(user_id: str, groups: List[Dict[str, Any]]) -> List[str]:
+    # Highest precedence first
+    return [user_id] + [group_partition(group["tenant_id"], group["group_id"]) for group in groups]
+
+
+def effective_stamp(user_id: str) -> Tuple:
+    """Version of everything the effective settings are built from.
+    
+    The user's groups plus the change stamp of each layer, the stamps read in one
+    consistent BatchGetItem. Any write to a layer changes it; joining or leaving a
+    group changes it once the cached memberships are re-read.
+    """
+    partitions = _partitions(user_id, cached_memberships(user_id))
+    items, unprocessed = batch_get(SETTINGS.table_name, [stamp_key(partition) for partition in partitions],
+                                   consistent_read=True)
+    if unprocessed:
+        raise RuntimeError("Settings stamps were throttled")
+    
+    stamps = {item["tenant_id"]: int(item.get("stamp", 0)) for item in items}
+    return tuple((partition, stamps.get(stamp_key(partition)["tenant_id"], 0)) for partition in partitions)
+
+
+def effective_settings(user_id: str) -> List[Dict[str, Any]]:
+    """The user's settings merged over their groups' settings, by name.
+    
+    Layers are read in parallel; each entry names the layer it came from.
+    """
+    # Read afresh and remembered, so the next stamp check covers the same groups
+    groups = _remember(user_id, memberships(user_id))
+    partitions = _partitions(user_id, groups)
+    with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(partitions))) as executor:
+        layers = list(executor.map(read_layer, partitions))
+    
+    sources: List[Dict[str, Any]] = [{"source": "user"}]
+    sources.extend({"source": "group", "group_id": group["group_id"]} for group in groups)
+    
+    # Lowest precedence first, so each layer overrides the ones below it
+    merged: Dict[str, Dict[str, Any]] = {}
+    for layer, source in reversed(list(zip(layers, sources))):
+        for name, item in layer.items():
+            merged[name] = dict(source, name=name, value=item.get("value"), updated_at=item.get("updated_at", 0))
+    return [merged[name] for name in sorted(merged)]
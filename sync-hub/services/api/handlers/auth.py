@@ -2,35 +2,76 @@ import json
 import os
 import uuid
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from aws_lambda_powertools import Logger
-import boto3
+import db
+import invocation
+import serializer
 
 logger = Logger()
 
+DEVICE_FLOW_TTL = 600  # 10 minutes
+
+# Confirmed sessions outlive the flow; the table's TTL removes them afterwards
+SESSION_TTL = int(os.environ.get("SESSION_TTL_DAYS", "30")) * 86400
+
+# Longest a status request waits for the flow to change, within API Gateway's 30s limit
+MAX_STATUS_WAIT = int(os.environ.get("DEVICE_STATUS_MAX_WAIT", "20"))
+
+# Status reads back off from the first delay up to the cap
+STATUS_POLL_INITIAL = 0.25
+STATUS_POLL_MAX = 2.0
+
+# Time kept back for answering before the invocation times out
+STATUS_RESERVE_MS = 2000
+
+
+def _device_lookup_key(device_code: str) -> Dict[str, str]:
+    # Lookup items live in their own partition, outside every tenant's key space
+    return {"tenant_id": f"device#{device_code}", "session_id": "device"}
+
 class AuthHandler:
-    def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.sessions_table = self.dynamodb.Table(os.environ['SESSIONS_TABLE'])
+    ROUTES = (
+        ("POST", "/auth/device/start", "_start_device_flow"),
+        ("POST", "/auth/device/confirm", "_confirm_device_flow"),
+        ("GET", "/auth/device/{session_id}/status", "_get_device_status")
+    )
     
-    def handle(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
-        method = event.get("requestContext", {}).get("http", {}).get("method")
-        path = event.get("requestContext", {}).get("http", {}).get("path")
-        
-        if path == "/auth/device/start" and method == "POST":
-            return self._start_device_flow(tenant_id)
-        elif path == "/auth/device/confirm" and method == "POST":
-            return self._confirm_device_flow(event, tenant_id)
-        
-        return {
-            "statusCode": 404,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Not found"})
-        }
+    @property
+    def sessions_table(self):
+        return db.table('SESSIONS_TABLE')
     
-    def _start_device_flow(self, tenant_id: str) -> Dict[str, Any]:
-        device_code = str(uuid.uuid4())[:8].upper()
+    def _start_device_flow(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
         session_id = str(uuid.uuid4())
+        now = int(time.time())
+        expires_at = now + DEVICE_FLOW_TTL
+        
+        # Reserve a device code; the condition rejects codes still held by a live flow
+        for _ in range(3):
+            device_code = str(uuid.uuid4())[:8].upper()
+            try:
+                self.sessions_table.put_item(
+                    Item={
+                        **_device_lookup_key(device_code),
+                        "owner_tenant_id": tenant_id,
+                        "owner_session_id": session_id,
+                        "created_at": now,
+                        "ttl": expires_at
+                    },
+                    ConditionExpression="attribute_not_exists(tenant_id) OR #ttl < :now",
+                    ExpressionAttributeNames={"#ttl": "ttl"},
+                    ExpressionAttributeValues={":now": now}
+                )
+                break
+            except self.sessions_table.meta.client.exceptions.ConditionalCheckFailedException:
+                continue
+        else:
+            logger.error("Could not allocate a unique device code")
+            return {
+                "statusCode": 503,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Please retry"})
+            }
         
         # Store device session
         self.sessions_table.put_item(
@@ -39,67 +80,146 @@ class AuthHandler:
                 "session_id": session_id,
                 "device_code": device_code,
                 "status": "pending",
-                "created_at": int(time.time()),
-                "ttl": int(time.time()) + 600  # 10 minutes
+                "created_at": now,
+                "ttl": expires_at
             }
         )
         
         return {
             "statusCode": 200,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({
+            "body": serializer.dumps({
                 "device_code": device_code,
                 "session_id": session_id,
-                "expires_in": 600
+                "expires_in": DEVICE_FLOW_TTL
             })
         }
     
     def _confirm_device_flow(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
         try:
             body = json.loads(event.get("body", "{}"))
-            device_code = body.get("device_code")
+            device_code = (body.get("device_code") or "").strip().upper()
             
             if not device_code:
                 return {
                     "statusCode": 400,
                     "headers": {"Content-Type": "application/json"},
-                    "body": json.dumps({"error": "device_code required"})
+                    "body": serializer.dumps({"error": "device_code required"})
                 }
             
-            # Find session by device code
-            response = self.sessions_table.scan(
-                FilterExpression="device_code = :code AND #status = :status",
-                ExpressionAttributeNames={"#status": "status"},
-                ExpressionAttributeValues={":code": device_code, ":status": "pending"}
+            now = int(time.time())
+            invalid_code = {
+                "statusCode": 404,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Invalid device code"})
+            }
+            
+            # Resolve the session through its lookup item
+            lookup = self.sessions_table.get_item(
+                Key=_device_lookup_key(device_code),
+                ConsistentRead=True
             )
             
-            if not response["Items"]:
+            if "Item" not in lookup or lookup["Item"]["ttl"] < now:
+                return invalid_code
+            
+            # Flip pending -> confirmed in one conditional write
+            try:
+                self.sessions_table.update_item(
+                    Key={"tenant_id": lookup["Item"]["owner_tenant_id"], "session_id": lookup["Item"]["owner_session_id"]},
+                    UpdateExpression="SET #status = :confirmed, confirmed_at = :now, #ttl = :expires",
+                    ConditionExpression="#status = :pending AND device_code = :code AND #ttl >= :now",
+                    ExpressionAttributeNames={"#status": "status", "#ttl": "ttl"},
+                    ExpressionAttributeValues={
+                        ":confirmed": "confirmed",
+                        ":pending": "pending",
+                        ":code": device_code,
+                        ":now": now,
+                        ":expires": now + SESSION_TTL
+                    }
+                )
+            except self.sessions_table.meta.client.exceptions.ConditionalCheckFailedException:
+                return invalid_code
+            
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"status": "confirmed"})
+            }
+        
+        except Exception as e:
+            logger.exception("Error confirming device flow")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _device_status(self, tenant_id: str, session_id: str) -> Optional[Dict[str, Any]]:
+        # Strongly consistent, so a confirmation is seen on the very next read
+        response = self.sessions_table.get_item(
+            Key={"tenant_id": tenant_id, "session_id": session_id},
+            ProjectionExpression="#status, confirmed_at, #ttl",
+            ExpressionAttributeNames={"#status": "status", "#ttl": "ttl"},
+            ConsistentRead=True
+        )
+        item = response.get("Item")
+        if item is None:
+            return None
+        
+        # TTL deletes lag expiry, sometimes by days; an expired pending flow reads as expired
+        now = int(time.time())
+        status = {"session_id": session_id, "status": item["status"]}
+        if item["status"] == "pending":
+            if item["ttl"] < now:
+                status["status"] = "expired"
+            else:
+                status["expires_in"] = int(item["ttl"]) - now
+        elif "confirmed_at" in item:
+            status["confirmed_at"] = int(item["confirmed_at"])
+        return status
+    
+    def _get_device_status(self, event: Dict[str, Any], session_id: str, tenant_id: str) -> Dict[str, Any]:
+        try:
+            params = event.get("queryStringParameters") or {}
+            try:
+                wait = int(params.get("wait", "0"))
+            except ValueError:
+                wait = -1
+            if not 0 <= wait <= MAX_STATUS_WAIT:
                 return {
-                    "statusCode": 404,
+                    "statusCode": 400,
                     "headers": {"Content-Type": "application/json"},
-                    "body": json.dumps({"error": "Invalid device code"})
+                    "body": serializer.dumps({"error": f"wait must be an integer between 0 and {MAX_STATUS_WAIT}"})
                 }
             
-            session = response["Items"][0]
-            
-            # Update session status
-            self.sessions_table.update_item(
-                Key={"tenant_id": session["tenant_id"], "session_id": session["session_id"]},
-                UpdateExpression="SET #status = :status",
-                ExpressionAttributeNames={"#status": "status"},
-                ExpressionAttributeValues={":status": "confirmed"}
-            )
+            # Long poll: re-read with backoff until the flow leaves pending or the wait runs out
+            deadline = time.monotonic() + wait
+            delay = STATUS_POLL_INITIAL
+            while True:
+                status = self._device_status(tenant_id, session_id)
+                if status is None:
+                    return {
+                        "statusCode": 404,
+                        "headers": {"Content-Type": "application/json"},
+                        "body": serializer.dumps({"error": "Session not found"})
+                    }
+                
+                remaining = deadline - time.monotonic()
+                if status["status"] != "pending" or remaining <= 0 or not invocation.has_time(STATUS_RESERVE_MS + int(delay * 1000)):
+                    break
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, STATUS_POLL_MAX)
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"status": "confirmed"})
+                "body": serializer.dumps(status)
             }
-            
         except Exception as e:
-            logger.exception("Error confirming device flow")
+            logger.exception("Error getting device status")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
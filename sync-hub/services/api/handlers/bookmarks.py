@@ -1,124 +1,456 @@
 import json
-import os
 import uuid
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from aws_lambda_powertools import Logger
-import boto3
-from boto3.dynamodb.conditions import Key
+import db
+import serializer
+from batch import BATCH_WORKERS, batch_entries, batch_get, batch_write
+from changes import LIVE_CONDITION, is_live, soft_delete, tombstone
+from entities import BOOKMARKS
+from pagination import InvalidPageRequest, decode_token, encode_token, page_params
+from http_responses import collection_etag, conditional_response
+from search_index import query_terms, search
+from tag_index import MAX_QUERY_TAGS, index_writes, match_tags, normalize_tags
+from url_index import claim_url, normalize_url, release_url, url_key
 
 logger = Logger()
 
+# Attributes that change on every write; list ETags are computed from these
+ETAG_FIELDS = ["bookmark_id", "version", "updated_at"]
+
+# What list routes read; tombstone markers stay server-side
+LIST_FIELDS = ["tenant_id", "bookmark_id", "title", "url", "tags", "version", "created_at", "updated_at"]
+
+# Optimistic retries when a write that moves index items (tags, URL lookup) races
+# with another write to the same bookmark
+INDEX_WRITE_ATTEMPTS = 3
+
+
+def _query_tags(params: Dict[str, Any]) -> Optional[List[str]]:
+    # HTTP APIs join repeated parameters with commas, so ?tag=a&tag=b is ?tag=a,b
+    raw = params.get("tag")
+    if raw is None:
+        return None
+    tags = list(dict.fromkeys(tag for tag in raw.split(",") if tag))
+    if not tags or len(tags) > MAX_QUERY_TAGS:
+        raise InvalidPageRequest(f"tag must name 1 to {MAX_QUERY_TAGS} tags")
+    return tags
+
+
+def _version_condition(item: Dict[str, Any]) -> Dict[str, Any]:
+    # Items written before versioning have no version attribute
+    if "version" not in item:
+        return {"ConditionExpression": f"attribute_not_exists(#version) AND {LIVE_CONDITION}",
+                "ExpressionAttributeNames": {"#version": "version"}}
+    return {"ConditionExpression": f"#version = :expected AND {LIVE_CONDITION}",
+            "ExpressionAttributeNames": {"#version": "version"},
+            "ExpressionAttributeValues": {":expected": item["version"]}}
+
+
+def _cancelled_by_condition(error, position: int = 0) -> bool:
+    # ``position`` is the index of the write in TransactItems
+    reasons = error.response.get("CancellationReasons", [])
+    return len(reasons) > position and reasons[position].get("Code") == "ConditionalCheckFailed"
+
 class BookmarksHandler:
-    def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.bookmarks_table = self.dynamodb.Table(os.environ['BOOKMARKS_TABLE'])
+    ROUTES = (
+        ("GET", "/bookmarks", "_list_bookmarks"),
+        ("GET", "/bookmarks/search", "_search_bookmarks"),
+        ("POST", "/bookmarks", "_create_bookmark"),
+        ("POST", "/bookmarks:batch", "_batch_create_bookmarks"),
+        ("POST", "/bookmarks:batchGet", "_batch_get_bookmarks"),
+        ("GET", "/bookmarks/{bookmark_id}", "_get_bookmark"),
+        ("PUT", "/bookmarks/{bookmark_id}", "_update_bookmark"),
+        ("DELETE", "/bookmarks/{bookmark_id}", "_delete_bookmark")
+    )
     
-    def handle(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
-        method = event.get("requestContext", {}).get("http", {}).get("method")
-        path = event.get("requestContext", {}).get("http", {}).get("path")
+    @property
+    def bookmarks_table(self):
+        return db.table('BOOKMARKS_TABLE')
+    
+    def _list_bookmarks(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            params = event.get("queryStringParameters") or {}
+            tags = _query_tags(params)
+            if tags is not None:
+                return self._list_tagged_bookmarks(event, tenant_id, tags, params.get("match", "all"))
+            
+            items, next_token = BOOKMARKS.query_page(
+                event, f"bookmarks:{tenant_id}",
+                key_condition="tenant_id = :tenant",
+                values={":tenant": tenant_id},
+                filter_expression=LIVE_CONDITION,
+                projection=LIST_FIELDS
+            )
+            
+            etag = collection_etag(items, ETAG_FIELDS, next_token)
+            return conditional_response(event, {"bookmarks": items, "next_token": next_token}, etag)
+        except InvalidPageRequest as e:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": str(e)})
+            }
+        except Exception as e:
+            logger.exception("Error listing bookmarks")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _list_tagged_bookmarks(self, event: Dict[str, Any], tenant_id: str, tags: List[str],
+                               match: str) -> Dict[str, Any]:
+        if match not in ("all", "any"):
+            raise InvalidPageRequest("match must be all or any")
         
-        if path == "/bookmarks" and method == "GET":
-            return self._list_bookmarks(tenant_id)
-        elif path == "/bookmarks" and method == "POST":
-            return self._create_bookmark(event, tenant_id)
-        elif path.startswith("/bookmarks/") and method == "GET":
-            bookmark_id = path.split("/")[-1]
-            return self._get_bookmark(bookmark_id, tenant_id)
-        elif path.startswith("/bookmarks/") and method == "PUT":
-            bookmark_id = path.split("/")[-1]
-            return self._update_bookmark(event, bookmark_id, tenant_id)
-        elif path.startswith("/bookmarks/") and method == "DELETE":
-            bookmark_id = path.split("/")[-1]
-            return self._delete_bookmark(bookmark_id, tenant_id)
+        limit, token = page_params(event)
+        scope = f"bookmarks:{tenant_id}:{match}:{','.join(tags)}"
+        after = decode_token(token, scope)["bookmark_id"] if token else None
         
-        return {
-            "statusCode": 404,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Not found"})
-        }
+        # Walk the tag partitions, then read just the matching bookmarks
+        bookmark_ids, more = match_tags(tenant_id, tags, match == "all", after, limit)
+        found, unprocessed = batch_get(
+            self.bookmarks_table.name,
+            [{"tenant_id": tenant_id, "bookmark_id": bookmark_id} for bookmark_id in bookmark_ids]
+        )
+        if unprocessed:
+            raise RuntimeError("Bookmark reads still unprocessed after retries")
+        
+        # The bookmark itself is the source of truth for its tags
+        wanted = set(tags)
+        check = wanted.issubset if match == "all" else (lambda bookmark_tags: not wanted.isdisjoint(bookmark_tags))
+        by_id = {item["bookmark_id"]: item for item in found if is_live(item) and check(set(item.get("tags", [])))}
+        items = [
+            {field: by_id[bookmark_id][field] for field in LIST_FIELDS if field in by_id[bookmark_id]}
+            for bookmark_id in bookmark_ids if bookmark_id in by_id
+        ]
+        
+        next_token = encode_token({"bookmark_id": bookmark_ids[-1]}, scope) if more and bookmark_ids else None
+        etag = collection_etag(items, ETAG_FIELDS, next_token)
+        return conditional_response(event, {"bookmarks": items, "next_token": next_token}, etag)
     
-    def _list_bookmarks(self, tenant_id: str) -> Dict[str, Any]:
+    def _search_bookmarks(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
         try:
-            response = self.bookmarks_table.query(
-                KeyConditionExpression=Key('tenant_id').eq(tenant_id)
+            params = event.get("queryStringParameters") or {}
+            try:
+                terms = query_terms(params.get("q", ""))
+                limit, _ = page_params(event)
+            except ValueError as e:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": str(e)})
+                }
+            
+            # Rank in memory, then read just the page of bookmarks that made the cut
+            bookmark_ids, total = search(tenant_id, terms, limit)
+            found, unprocessed = batch_get(
+                self.bookmarks_table.name,
+                [{"tenant_id": tenant_id, "bookmark_id": bookmark_id} for bookmark_id in bookmark_ids]
             )
+            if unprocessed:
+                raise RuntimeError("Bookmark reads still unprocessed after retries")
+            
+            by_id = {item["bookmark_id"]: item for item in found if is_live(item)}
+            items = [
+                {field: by_id[bookmark_id][field] for field in LIST_FIELDS if field in by_id[bookmark_id]}
+                for bookmark_id in bookmark_ids if bookmark_id in by_id
+            ]
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"bookmarks": response["Items"]})
+                "body": serializer.dumps({"bookmarks": items, "total": total})
             }
         except Exception as e:
-            logger.exception("Error listing bookmarks")
+            logger.exception("Error searching bookmarks")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
+    def _new_bookmark(self, body: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        return {
+            "tenant_id": tenant_id,
+            "bookmark_id": str(uuid.uuid4()),
+            "title": body.get("title"),
+            "url": body.get("url"),
+            "tags": normalize_tags(body.get("tags", [])),
+            "version": 1,
+            "created_at": int(time.time()),
+            "updated_at": int(time.time())
+        }
+    
     def _create_bookmark(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
         try:
             body = json.loads(event.get("body", "{}"))
-            bookmark_id = str(uuid.uuid4())
             
-            bookmark = {
-                "tenant_id": tenant_id,
-                "bookmark_id": bookmark_id,
-                "title": body.get("title"),
-                "url": body.get("url"),
-                "tags": body.get("tags", []),
-                "created_at": int(time.time()),
-                "updated_at": int(time.time())
-            }
+            try:
+                bookmark = self._new_bookmark(body, tenant_id)
+            except ValueError as e:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": str(e)})
+                }
             
-            self.bookmarks_table.put_item(Item=bookmark)
+            # A bookmark that already holds the URL comes back unchanged, with 200
+            bookmark, created = self._put_new_bookmark(bookmark)
             
             return {
-                "statusCode": 201,
+                "statusCode": 201 if created else 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(bookmark)
+                "body": serializer.dumps(bookmark)
             }
         except Exception as e:
             logger.exception("Error creating bookmark")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
-    def _get_bookmark(self, bookmark_id: str, tenant_id: str) -> Dict[str, Any]:
+    def _put_new_bookmark(self, bookmark: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Write a new bookmark together with its index items.
+        
+        Returns ``(bookmark, created)``. When a live bookmark already holds the URL,
+        nothing is written and that bookmark is returned instead.
+        """
+        tenant_id = bookmark["tenant_id"]
+        url = normalize_url(bookmark["url"])
+        if url is None and not bookmark["tags"]:
+            self.bookmarks_table.put_item(Item=bookmark)
+            return bookmark, True
+        
+        # The URL claim is always the second write, so its cancellation reason is found by position
+        table_name = self.bookmarks_table.name
+        writes = [{"Put": {"TableName": table_name, "Item": bookmark}}]
+        if url is not None:
+            writes.append(claim_url(table_name, tenant_id, url, bookmark["bookmark_id"]))
+        writes.extend(index_writes(table_name, tenant_id, bookmark["bookmark_id"], bookmark["tags"], []))
+        
+        for _ in range(INDEX_WRITE_ATTEMPTS):
+            try:
+                db.client().transact_write_items(TransactItems=writes)
+                return bookmark, True
+            except db.client().exceptions.TransactionCanceledException as e:
+                if url is None or not _cancelled_by_condition(e, 1):
+                    raise
+            
+            existing = self._url_owner(tenant_id, url)
+            if existing is not None:
+                return existing, False
+        raise RuntimeError("URL lookup kept changing under the create")
+    
+    def _url_owner(self, tenant_id: str, url: str) -> Optional[Dict[str, Any]]:
+        """The live bookmark holding ``url``. A lookup left pointing anywhere else is dropped."""
+        key = url_key(tenant_id, url)
+        lookup = self.bookmarks_table.get_item(Key=key, ConsistentRead=True).get("Item")
+        if lookup is None:
+            return None
+        
+        owner = self.bookmarks_table.get_item(
+            Key={"tenant_id": tenant_id, "bookmark_id": lookup["target_id"]}, ConsistentRead=True
+        ).get("Item")
+        if is_live(owner) and normalize_url(owner.get("url")) == url:
+            return owner
+        
+        try:
+            self.bookmarks_table.delete_item(
+                Key=key,
+                ConditionExpression="target_id = :bookmark",
+                ExpressionAttributeValues={":bookmark": lookup["target_id"]}
+            )
+        except self.bookmarks_table.meta.client.exceptions.ConditionalCheckFailedException:
+            pass
+        return None
+    
+    def _holds_url(self, tenant_id: str, url: str, bookmark_id: str) -> bool:
+        lookup = self.bookmarks_table.get_item(Key=url_key(tenant_id, url), ConsistentRead=True).get("Item")
+        return lookup is not None and lookup["target_id"] == bookmark_id
+    
+    def _batch_create_bookmarks(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            
+            try:
+                entries = batch_entries(body, "bookmarks")
+            except ValueError as e:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": str(e)})
+                }
+            
+            # One result per entry, in request order. A URL repeated within the batch is
+            # written once; the later entries share the first one's outcome
+            results = []
+            created = {}
+            urls = {}
+            first_by_url: Dict[str, int] = {}
+            repeats: Dict[int, int] = {}
+            for index, entry in enumerate(entries):
+                try:
+                    if not isinstance(entry, dict):
+                        raise ValueError("Each bookmark must be an object")
+                    bookmark = self._new_bookmark(entry, tenant_id)
+                except ValueError as e:
+                    results.append({"index": index, "status": 400, "error": str(e)})
+                    continue
+                url = normalize_url(bookmark["url"])
+                if url in first_by_url:
+                    repeats[index] = first_by_url[url]
+                    results.append({"index": index, "status": 200})
+                    continue
+                if url is not None:
+                    first_by_url[url] = index
+                created[bookmark["bookmark_id"]] = bookmark
+                urls[bookmark["bookmark_id"]] = url
+                results.append({"index": index, "status": 201, "bookmark": bookmark})
+            
+            # Plain bookmarks share BatchWriteItem calls; indexed ones (URL, tags) need a transaction each
+            plain = [bookmark for bookmark in created.values() if urls[bookmark["bookmark_id"]] is None and not bookmark["tags"]]
+            indexed = [bookmark for bookmark in created.values() if urls[bookmark["bookmark_id"]] is not None or bookmark["tags"]]
+            unprocessed = batch_write(
+                self.bookmarks_table.name,
+                [{"PutRequest": {"Item": bookmark}} for bookmark in plain]
+            )
+            failed = {request["PutRequest"]["Item"]["bookmark_id"] for request in unprocessed}
+            existing = {}
+            if indexed:
+                with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(indexed))) as executor:
+                    for bookmark, outcome in zip(indexed, executor.map(self._try_put_new_bookmark, indexed)):
+                        if outcome is None:
+                            failed.add(bookmark["bookmark_id"])
+                        elif not outcome[1]:
+                            existing[bookmark["bookmark_id"]] = outcome[0]
+            
+            for result in results:
+                if result["status"] != 201:
+                    continue
+                bookmark_id = result["bookmark"]["bookmark_id"]
+                if bookmark_id in failed:
+                    result.pop("bookmark")
+                    result.update({"status": 503, "error": "Please retry"})
+                elif bookmark_id in existing:
+                    result.update({"status": 200, "bookmark": existing[bookmark_id]})
+            for index, first in repeats.items():
+                if results[first]["status"] == 503:
+                    results[index].update({"status": 503, "error": "Please retry"})
+                else:
+                    results[index]["bookmark"] = results[first]["bookmark"]
+            
+            return {
+                "statusCode": 207,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"results": results})
+            }
+        except Exception as e:
+            logger.exception("Error batch creating bookmarks")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _try_put_new_bookmark(self, bookmark: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], bool]]:
+        try:
+            return self._put_new_bookmark(bookmark)
+        except Exception:
+            logger.exception("Error creating indexed bookmark")
+            return None
+    
+    def _batch_get_bookmarks(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            
+            try:
+                bookmark_ids = batch_entries(body, "bookmark_ids")
+                if not all(isinstance(bookmark_id, str) and bookmark_id for bookmark_id in bookmark_ids):
+                    raise ValueError("bookmark_ids must be strings")
+            except ValueError as e:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": str(e)})
+                }
+            
+            # BatchGetItem rejects duplicate keys
+            unique_ids = list(dict.fromkeys(bookmark_ids))
+            items, unprocessed = batch_get(
+                self.bookmarks_table.name,
+                [{"tenant_id": tenant_id, "bookmark_id": bookmark_id} for bookmark_id in unique_ids]
+            )
+            found = {item["bookmark_id"]: item for item in items if is_live(item)}
+            retry = {key["bookmark_id"] for key in unprocessed}
+            
+            results = []
+            for bookmark_id in bookmark_ids:
+                if bookmark_id in found:
+                    results.append({"bookmark_id": bookmark_id, "status": 200, "bookmark": found[bookmark_id]})
+                elif bookmark_id in retry:
+                    results.append({"bookmark_id": bookmark_id, "status": 503, "error": "Please retry"})
+                else:
+                    results.append({"bookmark_id": bookmark_id, "status": 404, "error": "Bookmark not found"})
+            
+            return {
+                "statusCode": 207,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"results": results})
+            }
+        except Exception as e:
+            logger.exception("Error batch getting bookmarks")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _get_bookmark(self, event: Dict[str, Any], bookmark_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
             response = self.bookmarks_table.get_item(
                 Key={"tenant_id": tenant_id, "bookmark_id": bookmark_id}
             )
             
-            if "Item" not in response:
+            if not is_live(response.get("Item")):
                 return {
                     "statusCode": 404,
                     "headers": {"Content-Type": "application/json"},
-                    "body": json.dumps({"error": "Bookmark not found"})
+                    "body": serializer.dumps({"error": "Bookmark not found"})
                 }
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(response["Item"])
+                "body": serializer.dumps(response["Item"])
             }
         except Exception as e:
             logger.exception("Error getting bookmark")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
     def _update_bookmark(self, event: Dict[str, Any], bookmark_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
             body = json.loads(event.get("body", "{}"))
             
-            update_expression = "SET updated_at = :updated"
-            expression_values = {":updated": int(time.time())}
+            try:
+                tags = normalize_tags(body["tags"]) if "tags" in body else None
+            except ValueError as e:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": str(e)})
+                }
+            
+            update_expression = "SET updated_at = :updated, #version = if_not_exists(#version, :zero) + :one"
+            expression_values = {":updated": int(time.time()), ":zero": 0, ":one": 1}
             
             if "title" in body:
                 update_expression += ", title = :title"
@@ -128,36 +460,152 @@ class BookmarksHandler:
                 update_expression += ", #url = :url"
                 expression_values[":url"] = body["url"]
             
-            if "tags" in body:
+            if tags is not None:
                 update_expression += ", tags = :tags"
-                expression_values[":tags"] = body["tags"]
-            
-            self.bookmarks_table.update_item(
-                Key={"tenant_id": tenant_id, "bookmark_id": bookmark_id},
-                UpdateExpression=update_expression,
-                ExpressionAttributeNames={"#url": "url"} if "url" in body else None,
-                ExpressionAttributeValues=expression_values,
-                ReturnValues="ALL_NEW"
-            )
+                expression_values[":tags"] = tags
+            
+            expression_names = {"#version": "version"}
+            if "url" in body:
+                expression_names["#url"] = "url"
+            
+            key = {"tenant_id": tenant_id, "bookmark_id": bookmark_id}
+            holder = None
+            if tags is None and "url" not in body:
+                # No tag or URL change, no index change: one conditional update
+                try:
+                    self.bookmarks_table.update_item(
+                        Key=key,
+                        UpdateExpression=update_expression,
+                        ConditionExpression=f"attribute_exists(#id) AND {LIVE_CONDITION}",
+                        ExpressionAttributeNames=dict(expression_names, **{"#id": "bookmark_id"}),
+                        ExpressionAttributeValues=expression_values
+                    )
+                    status = 200
+                except self.bookmarks_table.meta.client.exceptions.ConditionalCheckFailedException:
+                    status = 404
+            else:
+                status, holder = self._update_indexed_bookmark(
+                    key, tags, body, update_expression, expression_names, expression_values
+                )
+            
+            if status == 404:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Bookmark not found"})
+                }
+            if holder is not None:
+                return {
+                    "statusCode": 409,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Another bookmark already has this URL", "bookmark_id": holder})
+                }
+            if status == 409:
+                return {
+                    "statusCode": 409,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Bookmark is being modified, please retry"})
+                }
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"message": "Bookmark updated"})
+                "body": serializer.dumps({"message": "Bookmark updated"})
             }
         except Exception as e:
             logger.exception("Error updating bookmark")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _update_indexed_bookmark(self, key: Dict[str, Any], tags: Optional[List[str]], body: Dict[str, Any],
+                                 update_expression: str, expression_names: Dict[str, str],
+                                 expression_values: Dict[str, Any]) -> Tuple[int, Optional[str]]:
+        """Update a bookmark and move its tag index items and URL lookup in one
+        transaction, conditioned on the version read first.
+        
+        Returns ``(status, holder)``; ``holder`` is the bookmark that already has the new URL.
+        """
+        table_name = self.bookmarks_table.name
+        tenant_id, bookmark_id = key["tenant_id"], key["bookmark_id"]
+        for _ in range(INDEX_WRITE_ATTEMPTS):
+            current = self.bookmarks_table.get_item(Key=key, ConsistentRead=True).get("Item")
+            if not is_live(current):
+                return 404, None
+            
+            condition = _version_condition(current)
+            update = {
+                "TableName": table_name,
+                "Key": key,
+                "UpdateExpression": update_expression,
+                "ConditionExpression": condition["ConditionExpression"],
+                "ExpressionAttributeNames": dict(expression_names, **condition["ExpressionAttributeNames"]),
+                "ExpressionAttributeValues": dict(expression_values, **condition.get("ExpressionAttributeValues", {}))
             }
+            writes = [{"Update": update}]
+            
+            claimed = None
+            if "url" in body:
+                old_url, new_url = normalize_url(current.get("url")), normalize_url(body["url"])
+                if new_url != old_url:
+                    if new_url is not None:
+                        claimed = new_url
+                        writes.append(claim_url(table_name, tenant_id, new_url, bookmark_id))
+                    if old_url is not None and self._holds_url(tenant_id, old_url, bookmark_id):
+                        writes.append(release_url(table_name, tenant_id, old_url, bookmark_id))
+            
+            if tags is not None:
+                old_tags = current.get("tags", [])
+                writes.extend(index_writes(
+                    table_name, tenant_id, bookmark_id,
+                    [tag for tag in tags if tag not in old_tags],
+                    [tag for tag in old_tags if tag not in tags]
+                ))
+            
+            try:
+                db.client().transact_write_items(TransactItems=writes)
+                return 200, None
+            except db.client().exceptions.TransactionCanceledException as e:
+                if claimed is not None and _cancelled_by_condition(e, 1):
+                    holder = self._url_owner(tenant_id, claimed)
+                    if holder is not None:
+                        return 409, holder["bookmark_id"]
+                elif not _cancelled_by_condition(e):
+                    raise
+        return 409, None
     
-    def _delete_bookmark(self, bookmark_id: str, tenant_id: str) -> Dict[str, Any]:
+    def _delete_bookmark(self, event: Dict[str, Any], bookmark_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
-            self.bookmarks_table.delete_item(
-                Key={"tenant_id": tenant_id, "bookmark_id": bookmark_id}
-            )
+            # Tombstone instead of delete, so /sync/changes can report it
+            key = {"tenant_id": tenant_id, "bookmark_id": bookmark_id}
+            table_name = self.bookmarks_table.name
+            for _ in range(INDEX_WRITE_ATTEMPTS):
+                current = self.bookmarks_table.get_item(Key=key, ConsistentRead=True).get("Item")
+                url = normalize_url(current.get("url")) if is_live(current) else None
+                holds_url = url is not None and self._holds_url(tenant_id, url, bookmark_id)
+                if not is_live(current) or not (current.get("tags") or holds_url):
+                    soft_delete(self.bookmarks_table, key)
+                    break
+                
+                # Indexed: the tombstone, the URL release and the tag index removals land together
+                writes = [{"Put": dict({"TableName": table_name, "Item": tombstone(key)}, **_version_condition(current))}]
+                if holds_url:
+                    writes.append(release_url(table_name, tenant_id, url, bookmark_id))
+                writes.extend(index_writes(table_name, tenant_id, bookmark_id, [], current.get("tags", [])))
+                try:
+                    db.client().transact_write_items(TransactItems=writes)
+                    break
+                except db.client().exceptions.TransactionCanceledException as e:
+                    if not _cancelled_by_condition(e):
+                        raise
+            else:
+                return {
+                    "statusCode": 409,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Bookmark is being modified, please retry"})
+                }
             
             return {
                 "statusCode": 204,
@@ -169,5 +617,5 @@ class BookmarksHandler:
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
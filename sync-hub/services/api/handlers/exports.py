@@ -0,0 +1,145 @@
+import json
+import uuid
+from typing import Dict, Any
+from aws_lambda_powertools import Logger
+import serializer
+import tasks
+from export import describe_export, load_export_state, save_export_state
+from restore import load_state, new_state
+
+logger = Logger()
+
+
+def _is_uuid(value: str) -> bool:
+    # Ids become S3 key segments; anything else is simply not found
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+class ExportsHandler:
+    ROUTES = (
+        ("POST", "/export", "_start_export"),
+        ("GET", "/export/{export_id}", "_get_export"),
+        ("POST", "/restore", "_start_restore"),
+        ("GET", "/restore/{restore_id}", "_get_restore")
+    )
+    
+    def _start_export(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            # The export can outlive an API request, so the jobs function streams it
+            export_id = str(uuid.uuid4())
+            state = save_export_state(tenant_id, export_id, "pending")
+            tasks.enqueue("export_tenant", tenant_id=tenant_id, export_id=export_id)
+            
+            return {
+                "statusCode": 202,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"export_id": export_id, "status": state["status"]})
+            }
+        except Exception as e:
+            logger.exception("Error starting export")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _get_export(self, event: Dict[str, Any], export_id: str, tenant_id: str) -> Dict[str, Any]:
+        try:
+            if not _is_uuid(export_id):
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Export not found"})
+                }
+            
+            export = describe_export(tenant_id, export_id)
+            if export is not None:
+                body = {"export_id": export_id, "status": "ready", **export}
+            else:
+                state = load_export_state(tenant_id, export_id)
+                if state is None:
+                    return {
+                        "statusCode": 404,
+                        "headers": {"Content-Type": "application/json"},
+                        "body": serializer.dumps({"error": "Export not found"})
+                    }
+                body = {"export_id": export_id, "status": state["status"]}
+                if "error" in state:
+                    body["error"] = state["error"]
+            
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps(body)
+            }
+        except Exception as e:
+            logger.exception("Error getting export")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _start_restore(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            export_id = body.get("export_id")
+            dry_run = body.get("dry_run", False)
+            
+            if not isinstance(export_id, str) or not isinstance(dry_run, bool):
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "export_id required, dry_run must be a boolean"})
+                }
+            
+            if not _is_uuid(export_id) or describe_export(tenant_id, export_id) is None:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Export not found"})
+                }
+            
+            restore_id = str(uuid.uuid4())
+            state = new_state(tenant_id, restore_id, export_id, dry_run)
+            tasks.enqueue("restore_tenant", tenant_id=tenant_id, restore_id=restore_id)
+            
+            return {
+                "statusCode": 202,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps(state)
+            }
+        except Exception as e:
+            logger.exception("Error starting restore")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _get_restore(self, event: Dict[str, Any], restore_id: str, tenant_id: str) -> Dict[str, Any]:
+        try:
+            state = load_state(tenant_id, restore_id) if _is_uuid(restore_id) else None
+            if state is None:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Restore not found"})
+                }
+            
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps(state)
+            }
+        except Exception as e:
+            logger.exception("Error getting restore")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
@@ -2,66 +2,91 @@ import json
 import os
 import uuid
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from aws_lambda_powertools import Logger
-import boto3
+import db
+import serializer
+import invocation
+import tasks
+from batch import batch_write
+from changes import LIVE_CONDITION, is_live, soft_delete
+from entities import GROUPS, MEMBERS
+from group_settings import (EDITOR_ROLES, MAX_GROUP_SETTINGS_PER_REQUEST, MAX_NAME_LENGTH, MEMBER_GROUPS_INDEX,
+                            MEMBERSHIP_FIELDS, AmbiguousMembership, group_partition, group_setting, invitation,
+                            membership, read_layer, verify_owners)
+from handlers.settings import invalidate_settings
 from boto3.dynamodb.conditions import Key
+from pagination import InvalidPageRequest
+from http_responses import collection_etag, conditional_response
+from stamps import expire_stamp
 
 logger = Logger()
 
+# Attributes that change on every write; list ETags are computed from these
+ETAG_FIELDS = ["group_id", "version", "updated_at"]
+MEMBER_ETAG_FIELDS = ["group_id#user_id", "role", "joined_at"]
+
+# Roles the owner may give a member who has joined; admins may invite and edit group settings
+MEMBER_ROLES = ("member", "admin")
+
+# Pending invitations, as the member-groups index projects them
+INVITATION_FIELDS = ["tenant_id", "group_id", "role"]
+
+# What list routes read; tombstone markers stay server-side
+LIST_FIELDS = ["tenant_id", "group_id", "name", "description", "owner_id", "version", "created_at", "updated_at"]
+
+# Time kept back for handing an unfinished cascade to the jobs function
+CASCADE_RESERVE_MS = int(os.environ.get("CASCADE_RESERVE_MS", "5000"))
+
 class GroupsHandler:
-    def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.groups_table = self.dynamodb.Table(os.environ['GROUPS_TABLE'])
-        self.group_members_table = self.dynamodb.Table(os.environ['GROUP_MEMBERS_TABLE'])
-    
-    def handle(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
-        method = event.get("requestContext", {}).get("http", {}).get("method")
-        path = event.get("requestContext", {}).get("http", {}).get("path")
-        
-        if path == "/groups" and method == "GET":
-            return self._list_groups(tenant_id)
-        elif path == "/groups" and method == "POST":
-            return self._create_group(event, tenant_id)
-        elif path.startswith("/groups/") and method == "GET":
-            group_id = path.split("/")[-1]
-            if path.endswith("/members"):
-                return self._list_group_members(group_id, tenant_id)
-            else:
-                return self._get_group(group_id, tenant_id)
-        elif path.startswith("/groups/") and method == "PUT":
-            group_id = path.split("/")[-1]
-            return self._update_group(event, group_id, tenant_id)
-        elif path.startswith("/groups/") and method == "DELETE":
-            group_id = path.split("/")[-1]
-            return self._delete_group(group_id, tenant_id)
-        elif path.startswith("/groups/") and path.endswith("/invite") and method == "POST":
-            group_id = path.split("/")[-2]
-            return self._invite_member(event, group_id, tenant_id)
-        
-        return {
-            "statusCode": 404,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Not found"})
-        }
+    ROUTES = (
+        ("GET", "/groups", "_list_groups"),
+        ("POST", "/groups", "_create_group"),
+        ("GET", "/groups/{group_id}", "_get_group"),
+        ("PUT", "/groups/{group_id}", "_update_group"),
+        ("DELETE", "/groups/{group_id}", "_delete_group"),
+        ("POST", "/groups/{group_id}/invite", "_invite_member"),
+        ("POST", "/groups/{group_id}/accept", "_accept_invitation"),
+        ("GET", "/groups/{group_id}/members", "_list_group_members"),
+        ("PUT", "/groups/{group_id}/members/{user_id}", "_set_member_role"),
+        ("GET", "/groups/{group_id}/settings", "_get_group_settings"),
+        ("PUT", "/groups/{group_id}/settings", "_update_group_settings"),
+        ("GET", "/me/groups", "_list_my_groups"),
+        ("GET", "/me/invitations", "_list_my_invitations")
+    )
+    
+    @property
+    def groups_table(self):
+        return db.table('GROUPS_TABLE')
+    
+    @property
+    def group_members_table(self):
+        return db.table('GROUP_MEMBERS_TABLE')
     
-    def _list_groups(self, tenant_id: str) -> Dict[str, Any]:
+    def _list_groups(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
         try:
-            response = self.groups_table.query(
-                KeyConditionExpression=Key('tenant_id').eq(tenant_id)
+            items, next_token = GROUPS.query_page(
+                event, f"groups:{tenant_id}",
+                key_condition="tenant_id = :tenant",
+                values={":tenant": tenant_id},
+                filter_expression=LIVE_CONDITION,
+                projection=LIST_FIELDS
             )
             
+            etag = collection_etag(items, ETAG_FIELDS, next_token)
+            return conditional_response(event, {"groups": items, "next_token": next_token}, etag)
+        except InvalidPageRequest as e:
             return {
-                "statusCode": 200,
+                "statusCode": 400,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"groups": response["Items"]})
+                "body": serializer.dumps({"error": str(e)})
             }
         except Exception as e:
             logger.exception("Error listing groups")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
     def _create_group(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
@@ -75,6 +100,7 @@ class GroupsHandler:
                 "name": body.get("name"),
                 "description": body.get("description", ""),
                 "owner_id": tenant_id,  # Current user is owner
+                "version": 1,
                 "created_at": int(time.time()),
                 "updated_at": int(time.time())
             }
@@ -96,48 +122,48 @@ class GroupsHandler:
             return {
                 "statusCode": 201,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(group)
+                "body": serializer.dumps(group)
             }
         except Exception as e:
             logger.exception("Error creating group")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
-    def _get_group(self, group_id: str, tenant_id: str) -> Dict[str, Any]:
+    def _get_group(self, event: Dict[str, Any], group_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
             response = self.groups_table.get_item(
                 Key={"tenant_id": tenant_id, "group_id": group_id}
             )
             
-            if "Item" not in response:
+            if not is_live(response.get("Item")):
                 return {
                     "statusCode": 404,
                     "headers": {"Content-Type": "application/json"},
-                    "body": json.dumps({"error": "Group not found"})
+                    "body": serializer.dumps({"error": "Group not found"})
                 }
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(response["Item"])
+                "body": serializer.dumps(response["Item"])
             }
         except Exception as e:
             logger.exception("Error getting group")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
     def _update_group(self, event: Dict[str, Any], group_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
             body = json.loads(event.get("body", "{}"))
             
-            update_expression = "SET updated_at = :updated"
-            expression_values = {":updated": int(time.time())}
+            update_expression = "SET updated_at = :updated, #version = if_not_exists(#version, :zero) + :one"
+            expression_values = {":updated": int(time.time()), ":zero": 0, ":one": 1}
             
             if "name" in body:
                 update_expression += ", #name = :name"
@@ -147,42 +173,51 @@ class GroupsHandler:
                 update_expression += ", description = :description"
                 expression_values[":description"] = body["description"]
             
-            self.groups_table.update_item(
-                Key={"tenant_id": tenant_id, "group_id": group_id},
-                UpdateExpression=update_expression,
-                ExpressionAttributeNames={"#name": "name"} if "name" in body else None,
-                ExpressionAttributeValues=expression_values
-            )
+            expression_names = {"#id": "group_id", "#version": "version"}
+            if "name" in body:
+                expression_names["#name"] = "name"
+            
+            try:
+                self.groups_table.update_item(
+                    Key={"tenant_id": tenant_id, "group_id": group_id},
+                    UpdateExpression=update_expression,
+                    ConditionExpression=f"attribute_exists(#id) AND {LIVE_CONDITION}",
+                    ExpressionAttributeNames=expression_names,
+                    ExpressionAttributeValues=expression_values
+                )
+            except self.groups_table.meta.client.exceptions.ConditionalCheckFailedException:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Group not found"})
+                }
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"message": "Group updated"})
+                "body": serializer.dumps({"message": "Group updated"})
             }
         except Exception as e:
             logger.exception("Error updating group")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
-    def _delete_group(self, group_id: str, tenant_id: str) -> Dict[str, Any]:
+    def _delete_group(self, event: Dict[str, Any], group_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
-            # Delete group
-            self.groups_table.delete_item(
-                Key={"tenant_id": tenant_id, "group_id": group_id}
-            )
-            
-            # Delete all members
-            members_response = self.group_members_table.query(
-                KeyConditionExpression=Key('tenant_id').eq(tenant_id) & Key('group_id#user_id').begins_with(f"{group_id}#")
-            )
+            # Tombstone the group, so /sync/changes can report it
+            soft_delete(self.groups_table, {"tenant_id": tenant_id, "group_id": group_id})
             
-            for member in members_response["Items"]:
-                self.group_members_table.delete_item(
-                    Key={"tenant_id": member["tenant_id"], "group_id#user_id": member["group_id#user_id"]}
-                )
+            # Delete all members and settings; large groups finish in the background
+            if not self.delete_group_data(tenant_id, group_id):
+                tasks.enqueue("delete_group_members", tenant_id=tenant_id, group_id=group_id)
+                return {
+                    "statusCode": 202,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"message": "Group deleted, member and settings cleanup continues asynchronously"})
+                }
             
             return {
                 "statusCode": 204,
@@ -194,61 +229,440 @@ class GroupsHandler:
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
+    def delete_group_members(self, tenant_id: str, group_id: str) -> bool:
+        """Delete every member of a group, one query page at a time.
+        
+        Returns False when the invocation runs short of time or some deletes stay
+        unprocessed; the caller is expected to continue the cascade asynchronously.
+        """
+        query_kwargs = {
+            "KeyConditionExpression": Key('tenant_id').eq(tenant_id) & Key('group_id#user_id').begins_with(f"{group_id}#"),
+            "ProjectionExpression": "tenant_id, #member_key",
+            "ExpressionAttributeNames": {"#member_key": "group_id#user_id"}
+        }
+        
+        while True:
+            if not invocation.has_time(CASCADE_RESERVE_MS):
+                return False
+            
+            response = self.group_members_table.query(**query_kwargs)
+            requests = [{"DeleteRequest": {"Key": member}} for member in response["Items"]]
+            
+            if batch_write(self.group_members_table.name, requests):
+                return False
+            
+            if "LastEvaluatedKey" not in response:
+                return True
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    
+    def delete_group_settings(self, tenant_id: str, group_id: str) -> bool:
+        """Delete a group's settings, one query page at a time, then retire its change stamp.
+        
+        Returns False when the invocation runs short of time or some deletes stay unprocessed.
+        """
+        settings_table = db.table('SETTINGS_TABLE')
+        partition = group_partition(tenant_id, group_id)
+        query_kwargs = {
+            "KeyConditionExpression": Key('tenant_id').eq(partition),
+            "ProjectionExpression": "tenant_id, setting_id"
+        }
+        
+        while True:
+            if not invocation.has_time(CASCADE_RESERVE_MS):
+                return False
+            
+            response = settings_table.query(**query_kwargs)
+            requests = [{"DeleteRequest": {"Key": setting}} for setting in response["Items"]]
+            
+            if batch_write(settings_table.name, requests):
+                return False
+            
+            if "LastEvaluatedKey" not in response:
+                break
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        
+        expire_stamp(settings_table, partition)
+        return True
+    
+    def delete_group_data(self, tenant_id: str, group_id: str) -> bool:
+        """Delete a deleted group's members and settings; False when the cascade has to be continued."""
+        return self.delete_group_members(tenant_id, group_id) and self.delete_group_settings(tenant_id, group_id)
+    
+    def _group_owner_for_editor(self, group_id: str, tenant_id: str) -> Tuple[int, Optional[str]]:
+        """Owner of a group the caller may manage, as ``(200, owner_id)``, else ``(404, 403 or 409, None)``."""
+        # The owner's own group is read directly, so a group just created can be managed at once
+        response = self.groups_table.get_item(
+            Key={"tenant_id": tenant_id, "group_id": group_id},
+            ConsistentRead=True
+        )
+        group = response.get("Item")
+        if is_live(group) and group.get("owner_id") == tenant_id:
+            return 200, tenant_id
+        
+        try:
+            member = membership(tenant_id, group_id)
+        except AmbiguousMembership:
+            return 409, None
+        if member is None:
+            return 404, None
+        if member.get("role") not in EDITOR_ROLES:
+            return 403, None
+        return 200, member["tenant_id"]
+    
     def _invite_member(self, event: Dict[str, Any], group_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
             body = json.loads(event.get("body", "{}"))
             user_id = body.get("user_id")
-            role = body.get("role", "member")
             
-            if not user_id:
+            if not user_id or not isinstance(user_id, str):
                 return {
                     "statusCode": 400,
                     "headers": {"Content-Type": "application/json"},
-                    "body": json.dumps({"error": "user_id required"})
+                    "body": serializer.dumps({"error": "user_id required"})
                 }
             
+            status, owner_id = self._group_owner_for_editor(group_id, tenant_id)
+            if status == 404:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Group not found"})
+                }
+            if status == 403:
+                return {
+                    "statusCode": 403,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Only group owners and admins can invite members"})
+                }
+            if status == 409:
+                return {
+                    "statusCode": 409,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Several groups share this group_id"})
+                }
+            
+            # An invitation only: the invitee joins, as a plain member, by accepting it
             member = {
-                "tenant_id": tenant_id,
+                "tenant_id": owner_id,
                 "group_id#user_id": f"{group_id}#{user_id}",
                 "group_id": group_id,
                 "user_id": user_id,
-                "role": role,
-                "joined_at": int(time.time())
+                "role": "member",
+                "invited_by": tenant_id,
+                "invited_at": int(time.time())
             }
             
-            self.group_members_table.put_item(Item=member)
+            try:
+                self.group_members_table.put_item(
+                    Item=member,
+                    ConditionExpression="attribute_not_exists(tenant_id)"
+                )
+            except self.group_members_table.meta.client.exceptions.ConditionalCheckFailedException:
+                return {
+                    "statusCode": 409,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "User is already a member or invited"})
+                }
             
             return {
                 "statusCode": 201,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(member)
+                "body": serializer.dumps(member)
             }
         except Exception as e:
             logger.exception("Error inviting member")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
-    def _list_group_members(self, group_id: str, tenant_id: str) -> Dict[str, Any]:
+    def _set_member_role(self, event: Dict[str, Any], group_id: str, user_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
-            response = self.group_members_table.query(
-                KeyConditionExpression=Key('tenant_id').eq(tenant_id) & Key('group_id#user_id').begins_with(f"{group_id}#")
+            body = json.loads(event.get("body", "{}"))
+            role = body.get("role")
+            
+            if role not in MEMBER_ROLES:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": f"role must be one of: {', '.join(MEMBER_ROLES)}"})
+                }
+            
+            # Only the owner hands out roles, so admins cannot promote each other
+            response = self.groups_table.get_item(
+                Key={"tenant_id": tenant_id, "group_id": group_id},
+                ConsistentRead=True
             )
+            group = response.get("Item")
+            if not is_live(group) or group.get("owner_id") != tenant_id:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Group not found"})
+                }
+            if user_id == tenant_id:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "The owner's role cannot be changed"})
+                }
+            
+            try:
+                self.group_members_table.update_item(
+                    Key={"tenant_id": tenant_id, "group_id#user_id": f"{group_id}#{user_id}"},
+                    UpdateExpression="SET #role = :role",
+                    ConditionExpression="attribute_exists(joined_at)",
+                    ExpressionAttributeNames={"#role": "role"},
+                    ExpressionAttributeValues={":role": role}
+                )
+            except self.group_members_table.meta.client.exceptions.ConditionalCheckFailedException:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Member not found"})
+                }
+            
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"group_id": group_id, "user_id": user_id, "role": role})
+            }
+        except Exception as e:
+            logger.exception("Error setting member role")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _accept_invitation(self, event: Dict[str, Any], group_id: str, tenant_id: str) -> Dict[str, Any]:
+        try:
+            try:
+                pending = invitation(tenant_id, group_id)
+            except AmbiguousMembership:
+                return {
+                    "statusCode": 409,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Several groups share this group_id"})
+                }
+            if pending is None:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Invitation not found"})
+                }
+            
+            owner_id = pending["tenant_id"]
+            try:
+                self.group_members_table.update_item(
+                    Key={"tenant_id": owner_id, "group_id#user_id": f"{group_id}#{tenant_id}"},
+                    UpdateExpression="SET joined_at = :now",
+                    ConditionExpression="attribute_exists(invited_at) AND attribute_not_exists(joined_at)",
+                    ExpressionAttributeValues={":now": int(time.time())}
+                )
+            except self.group_members_table.meta.client.exceptions.ConditionalCheckFailedException:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Invitation not found"})
+                }
+            invalidate_settings(tenant_id)
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"members": response["Items"]})
+                "body": serializer.dumps({"group_id": group_id, "owner_id": owner_id, "message": "Invitation accepted"})
+            }
+        except Exception as e:
+            logger.exception("Error accepting invitation")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _list_group_members(self, event: Dict[str, Any], group_id: str, tenant_id: str) -> Dict[str, Any]:
+        try:
+            items, next_token = MEMBERS.query_page(
+                event, f"group-members:{tenant_id}:{group_id}",
+                key_condition="tenant_id = :tenant AND begins_with(#member_key, :prefix)",
+                values={":tenant": tenant_id, ":prefix": f"{group_id}#"},
+                names={"#member_key": "group_id#user_id"}
+            )
+            
+            etag = collection_etag(items, MEMBER_ETAG_FIELDS, next_token)
+            return conditional_response(event, {"members": items, "next_token": next_token}, etag)
+        except InvalidPageRequest as e:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": str(e)})
             }
         except Exception as e:
             logger.exception("Error listing group members")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _list_my_groups(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            # One index query, however many groups (and group owners) the user has, and one
+            # batch read of those groups: only joined groups whose owner really holds them count
+            items, next_token = MEMBERS.query_page(
+                event, f"member-groups:{tenant_id}",
+                index=MEMBER_GROUPS_INDEX,
+                key_condition="user_id = :user",
+                values={":user": tenant_id},
+                filter_expression="attribute_exists(joined_at)",
+                projection=MEMBERSHIP_FIELDS
+            )
+            items = verify_owners(items)
+            
+            etag = collection_etag(items, MEMBERSHIP_FIELDS, next_token)
+            return conditional_response(event, {"groups": items, "next_token": next_token}, etag)
+        except InvalidPageRequest as e:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": str(e)})
+            }
+        except Exception as e:
+            logger.exception("Error listing user groups")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _get_group_settings(self, event: Dict[str, Any], group_id: str, tenant_id: str) -> Dict[str, Any]:
+        try:
+            # Any member may read; the membership also names the group's owner
+            member = membership(tenant_id, group_id)
+            if member is None:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Group not found"})
+                }
+            
+            layer = read_layer(group_partition(member["tenant_id"], group_id))
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"settings": [layer[name] for name in sorted(layer)]})
+            }
+        except AmbiguousMembership:
+            return {
+                "statusCode": 409,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Several groups share this group_id"})
+            }
+        except Exception as e:
+            logger.exception("Error getting group settings")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _update_group_settings(self, event: Dict[str, Any], group_id: str, tenant_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            settings = body.get("settings")
+            
+            if not isinstance(settings, dict) or not 1 <= len(settings) <= MAX_GROUP_SETTINGS_PER_REQUEST:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": f"settings must map 1 to {MAX_GROUP_SETTINGS_PER_REQUEST} names to values"})
+                }
+            if any(not name or len(name) > MAX_NAME_LENGTH for name in settings):
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": f"Setting names must be 1 to {MAX_NAME_LENGTH} characters"})
+                }
+            
+            status, owner_id = self._group_owner_for_editor(group_id, tenant_id)
+            if status == 404:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Group not found"})
+                }
+            if status == 403:
+                return {
+                    "statusCode": 403,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Only group owners and admins can change group settings"})
+                }
+            if status == 409:
+                return {
+                    "statusCode": 409,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Several groups share this group_id"})
+                }
+            
+            # A null value removes the setting, so the layers below show through again
+            requests = []
+            for name, value in settings.items():
+                if value is None:
+                    key = {"tenant_id": group_partition(owner_id, group_id), "setting_id": name}
+                    requests.append({"DeleteRequest": {"Key": key}})
+                else:
+                    requests.append({"PutRequest": {"Item": group_setting(owner_id, group_id, name, value, tenant_id)}})
+            
+            if batch_write(db.table('SETTINGS_TABLE').name, requests):
+                return {
+                    "statusCode": 503,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Some settings were not written, retry the request"})
+                }
+            invalidate_settings(tenant_id)
+            
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"message": "Group settings updated"})
+            }
+        except Exception as e:
+            logger.exception("Error updating group settings")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _list_my_invitations(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            items, next_token = MEMBERS.query_page(
+                event, f"member-invitations:{tenant_id}",
+                index=MEMBER_GROUPS_INDEX,
+                key_condition="user_id = :user",
+                values={":user": tenant_id},
+                filter_expression="attribute_not_exists(joined_at)",
+                projection=INVITATION_FIELDS
+            )
+            items = verify_owners(items)
+            
+            etag = collection_etag(items, INVITATION_FIELDS, next_token)
+            return conditional_response(event, {"invitations": items, "next_token": next_token}, etag)
+        except InvalidPageRequest as e:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": str(e)})
+            }
+        except Exception as e:
+            logger.exception("Error listing invitations")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
             }
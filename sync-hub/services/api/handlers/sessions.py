@@ -1,62 +1,138 @@
 import json
-import os
 import time
 from typing import Dict, Any
 from aws_lambda_powertools import Logger
-import boto3
+import db
+import serializer
+from feedback import MAX_BUCKETS, PERIODS, counts, is_emoji, read_rollups, record_feedback
 
 logger = Logger()
 
 class SessionsHandler:
-    def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.sessions_table = self.dynamodb.Table(os.environ['SESSIONS_TABLE'])
+    ROUTES = (
+        ("POST", "/sessions/{session_id}/emoji", "_add_emoji_feedback"),
+        ("GET", "/sessions/{session_id}/feedback", "_get_session_feedback"),
+        ("GET", "/feedback/hourly", "_get_hourly_feedback"),
+        ("GET", "/feedback/daily", "_get_daily_feedback")
+    )
     
-    def handle(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
-        method = event.get("requestContext", {}).get("http", {}).get("method")
-        path = event.get("requestContext", {}).get("http", {}).get("path")
-        
-        if path.startswith("/sessions/") and path.endswith("/emoji") and method == "POST":
-            session_id = path.split("/")[-2]
-            return self._add_emoji_feedback(event, session_id, tenant_id)
-        
-        return {
-            "statusCode": 404,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Not found"})
-        }
+    @property
+    def sessions_table(self):
+        return db.table('SESSIONS_TABLE')
     
     def _add_emoji_feedback(self, event: Dict[str, Any], session_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
             body = json.loads(event.get("body", "{}"))
             emoji = body.get("emoji")
             
-            if not emoji:
+            if not is_emoji(emoji):
                 return {
                     "statusCode": 400,
                     "headers": {"Content-Type": "application/json"},
-                    "body": json.dumps({"error": "emoji required"})
+                    "body": serializer.dumps({"error": "emoji must be a single emoji"})
                 }
             
-            # Update session with emoji feedback
-            self.sessions_table.update_item(
-                Key={"tenant_id": tenant_id, "session_id": session_id},
-                UpdateExpression="SET emoji_feedback = :emoji, feedback_at = :feedback_at",
-                ExpressionAttributeValues={
-                    ":emoji": emoji,
-                    ":feedback_at": int(time.time())
+            # The session's counter, then the tenant's hour and day rollups
+            if not record_feedback(self.sessions_table, tenant_id, session_id, emoji):
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Session not found"})
                 }
-            )
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"emoji": emoji, "session_id": session_id})
+                "body": serializer.dumps({"emoji": emoji, "session_id": session_id})
             }
         except Exception as e:
             logger.exception("Error adding emoji feedback")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _get_session_feedback(self, event: Dict[str, Any], session_id: str, tenant_id: str) -> Dict[str, Any]:
+        try:
+            response = self.sessions_table.get_item(
+                Key={"tenant_id": tenant_id, "session_id": session_id}
+            )
+            
+            if "Item" not in response:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Session not found"})
+                }
+            
+            session = response["Item"]
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({
+                    "session_id": session_id,
+                    "total": int(session.get("feedback_count", 0)),
+                    "counts": counts(session),
+                    "last_emoji": session.get("emoji_feedback"),
+                    "last_feedback_at": session.get("feedback_at")
+                })
+            }
+        except Exception as e:
+            logger.exception("Error getting session feedback")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _get_hourly_feedback(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        return self._feedback_summary(event, tenant_id, "hour")
+    
+    def _get_daily_feedback(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        return self._feedback_summary(event, tenant_id, "day")
+    
+    def _feedback_summary(self, event: Dict[str, Any], tenant_id: str, period: str) -> Dict[str, Any]:
+        try:
+            params = event.get("queryStringParameters") or {}
+            max_span = MAX_BUCKETS[period] * PERIODS[period]
+            try:
+                end = int(params.get("to", time.time()))
+                start = int(params.get("from", end - max_span + PERIODS[period]))
+            except ValueError:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "from and to must be unix timestamps"})
+                }
+            if not 0 <= start <= end or end - start >= max_span:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": f"from must not be after to, and the range may cover at most {MAX_BUCKETS[period]} {period}s"})
+                }
+            
+            # A handful of rollup items, however many sessions reacted
+            buckets = read_rollups(self.sessions_table, tenant_id, period, start, end)
+            totals: Dict[str, int] = {}
+            for bucket in buckets:
+                for emoji, count in bucket["counts"].items():
+                    totals[emoji] = totals.get(emoji, 0) + count
+            
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({
+                    "period": period,
+                    "total": sum(bucket["total"] for bucket in buckets),
+                    "counts": totals,
+                    "buckets": buckets
+                })
+            }
+        except Exception as e:
+            logger.exception("Error summarizing feedback")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
             }
@@ -2,180 +2,397 @@ import json
 import os
 import uuid
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from aws_lambda_powertools import Logger
-import boto3
-from boto3.dynamodb.conditions import Key
+import db
+import serializer
+from batch import batch_entries, batch_get, batch_write
+from cache import StampedCache
+from changes import LIVE_CONDITION, PUBLIC_FEED, PUBLIC_INDEX, is_live, soft_delete
+from entities import SETTINGS
+from group_settings import effective_settings, effective_stamp, forget_memberships
+from history import MAX_HISTORY_RETENTION, history_key
+from pagination import InvalidPageRequest
+from http_responses import collection_etag, conditional_response
+from stamps import read_counters, read_stamp
 
 logger = Logger()
 
+# Attributes that change on every write; list ETags are computed from these
+ETAG_FIELDS = ["setting_id", "version", "updated_at", "is_public"]
+
+# What list routes read; index attributes and tombstone markers stay server-side
+LIST_FIELDS = ["tenant_id", "setting_id", "name", "value", "is_public", "version",
+               "created_at", "updated_at", "history_retention"]
+
+def _history_retention(body: Dict[str, Any]) -> Optional[int]:
+    if "history_retention" not in body:
+        return None
+    retention = body["history_retention"]
+    if not isinstance(retention, int) or isinstance(retention, bool) or not 1 <= retention <= MAX_HISTORY_RETENTION:
+        raise ValueError(f"history_retention must be an integer between 1 and {MAX_HISTORY_RETENTION}")
+    return retention
+
+
+# Warm-container cache; entries die with the tenant's stream-fed stamp, the TTL bounds staleness
+settings_cache = StampedCache(
+    "Settings",
+    stamp_loader=lambda tenant_id: read_stamp(db.table('SETTINGS_TABLE'), tenant_id),
+    max_entries=int(os.environ.get("SETTINGS_CACHE_MAX_ENTRIES", "1000")),
+    ttl_seconds=float(os.environ.get("SETTINGS_CACHE_TTL_SECONDS", "60")),
+    stamp_refresh_seconds=float(os.environ.get("SETTINGS_CACHE_STAMP_REFRESH_SECONDS", "1"))
+)
+
+# Merged user and group settings; the stamp covers the user's groups and every layer's stamp
+effective_cache = StampedCache(
+    "EffectiveSettings",
+    stamp_loader=effective_stamp,
+    max_entries=int(os.environ.get("SETTINGS_CACHE_MAX_ENTRIES", "1000")),
+    ttl_seconds=float(os.environ.get("SETTINGS_CACHE_TTL_SECONDS", "60")),
+    stamp_refresh_seconds=float(os.environ.get("SETTINGS_CACHE_STAMP_REFRESH_SECONDS", "1"))
+)
+
+# Names and sources change with the layers; updated_at with every value
+EFFECTIVE_ETAG_FIELDS = ["name", "source", "group_id", "updated_at"]
+
+
+def invalidate_settings(tenant_id: str) -> None:
+    # Our own writes show up here at once, ahead of the stream-fed stamps
+    settings_cache.invalidate(tenant_id)
+    effective_cache.invalidate(tenant_id)
+    forget_memberships(tenant_id)
+
+
+def _if_match_version(event: Dict[str, Any]) -> Optional[int]:
+    headers = event.get("headers") or {}
+    raw = headers.get("if-match") or headers.get("If-Match")
+    if raw is None:
+        return None
+    
+    raw = raw.strip()
+    if raw.startswith("W/"):
+        raw = raw[2:]
+    return int(raw.strip('"'))
+
+
+def _version_conflict(current_version: Optional[int] = None) -> Dict[str, Any]:
+    body = {"error": "Version conflict"}
+    if current_version is not None:
+        body["current_version"] = int(current_version)
+    return {
+        "statusCode": 409,
+        "headers": {"Content-Type": "application/json"},
+        "body": serializer.dumps(body)
+    }
+
+
 class SettingsHandler:
-    def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.settings_table = self.dynamodb.Table(os.environ['SETTINGS_TABLE'])
+    ROUTES = (
+        ("GET", "/settings", "_list_settings"),
+        ("POST", "/settings", "_create_setting"),
+        ("POST", "/settings:batch", "_batch_create_settings"),
+        ("POST", "/settings:batchGet", "_batch_get_settings"),
+        ("GET", "/settings/public", "_list_public_settings"),
+        ("GET", "/settings/stats", "_get_setting_stats"),
+        ("GET", "/settings/effective", "_get_effective_settings"),
+        ("GET", "/settings/{setting_id}", "_get_setting"),
+        ("PUT", "/settings/{setting_id}", "_update_setting"),
+        ("DELETE", "/settings/{setting_id}", "_delete_setting"),
+        ("GET", "/settings/{setting_id}/history", "_get_setting_history"),
+        ("POST", "/settings/{setting_id}/rollback", "_rollback_setting"),
+        ("PUT", "/settings/{setting_id}/visibility", "_update_visibility")
+    )
     
-    def handle(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
-        method = event.get("requestContext", {}).get("http", {}).get("method")
-        path = event.get("requestContext", {}).get("http", {}).get("path")
-        
-        if path == "/settings" and method == "GET":
-            return self._list_settings(tenant_id)
-        elif path == "/settings" and method == "POST":
-            return self._create_setting(event, tenant_id)
-        elif path.startswith("/settings/") and method == "GET":
-            setting_id = path.split("/")[-1]
-            if path.endswith("/history"):
-                return self._get_setting_history(setting_id, tenant_id)
-            else:
-                return self._get_setting(setting_id, tenant_id)
-        elif path.startswith("/settings/") and method == "PUT":
-            setting_id = path.split("/")[-1]
-            if path.endswith("/visibility"):
-                return self._update_visibility(event, setting_id, tenant_id)
-            else:
-                return self._update_setting(event, setting_id, tenant_id)
-        elif path.startswith("/settings/") and method == "DELETE":
-            setting_id = path.split("/")[-1]
-            return self._delete_setting(setting_id, tenant_id)
-        elif path.startswith("/settings/") and path.endswith("/rollback") and method == "POST":
-            setting_id = path.split("/")[-2]
-            return self._rollback_setting(event, setting_id, tenant_id)
-        elif path == "/settings/public" and method == "GET":
-            return self._list_public_settings()
-        
-        return {
-            "statusCode": 404,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Not found"})
-        }
+    @property
+    def settings_table(self):
+        return db.table('SETTINGS_TABLE')
     
-    def _list_settings(self, tenant_id: str) -> Dict[str, Any]:
+    def _list_settings(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
         try:
-            response = self.settings_table.query(
-                KeyConditionExpression=Key('tenant_id').eq(tenant_id)
+            params = event.get("queryStringParameters") or {}
+            items, next_token = settings_cache.get(
+                tenant_id, ("list", params.get("limit"), params.get("next_token")),
+                lambda: SETTINGS.query_page(
+                    event, f"settings:{tenant_id}",
+                    key_condition="tenant_id = :tenant",
+                    values={":tenant": tenant_id},
+                    filter_expression=LIVE_CONDITION,
+                    projection=LIST_FIELDS
+                )
             )
             
+            etag = collection_etag(items, ETAG_FIELDS, next_token)
+            return conditional_response(event, {"settings": items, "next_token": next_token}, etag)
+        except InvalidPageRequest as e:
             return {
-                "statusCode": 200,
+                "statusCode": 400,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"settings": response["Items"]})
+                "body": serializer.dumps({"error": str(e)})
             }
         except Exception as e:
             logger.exception("Error listing settings")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
+    def _new_setting(self, body: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        history_retention = _history_retention(body)
+        
+        setting = {
+            "tenant_id": tenant_id,
+            "setting_id": str(uuid.uuid4()),
+            "name": body.get("name"),
+            "value": body.get("value"),
+            "is_public": body.get("is_public", False),
+            "version": 1,
+            "created_at": int(time.time()),
+            "updated_at": int(time.time())
+        }
+        if history_retention is not None:
+            setting["history_retention"] = history_retention
+        return setting
+    
     def _create_setting(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
         try:
             body = json.loads(event.get("body", "{}"))
-            setting_id = str(uuid.uuid4())
             
-            setting = {
-                "tenant_id": tenant_id,
-                "setting_id": setting_id,
-                "name": body.get("name"),
-                "value": body.get("value"),
-                "is_public": body.get("is_public", False),
-                "version": 1,
-                "created_at": int(time.time()),
-                "updated_at": int(time.time())
-            }
+            try:
+                setting = self._new_setting(body, tenant_id)
+            except ValueError as e:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": str(e)})
+                }
             
             self.settings_table.put_item(Item=setting)
+            invalidate_settings(tenant_id)
             
             return {
                 "statusCode": 201,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(setting)
+                "body": serializer.dumps(setting)
             }
         except Exception as e:
             logger.exception("Error creating setting")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _batch_create_settings(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            
+            try:
+                entries = batch_entries(body, "settings")
+            except ValueError as e:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": str(e)})
+                }
+            
+            # One result per entry, in request order
+            results = []
+            created = {}
+            for index, entry in enumerate(entries):
+                try:
+                    if not isinstance(entry, dict):
+                        raise ValueError("Each setting must be an object")
+                    setting = self._new_setting(entry, tenant_id)
+                except ValueError as e:
+                    results.append({"index": index, "status": 400, "error": str(e)})
+                    continue
+                created[setting["setting_id"]] = setting
+                results.append({"index": index, "status": 201, "setting": setting})
+            
+            unprocessed = batch_write(
+                self.settings_table.name,
+                [{"PutRequest": {"Item": setting}} for setting in created.values()]
+            )
+            invalidate_settings(tenant_id)
+            failed = {request["PutRequest"]["Item"]["setting_id"] for request in unprocessed}
+            for result in results:
+                if result["status"] == 201 and result["setting"]["setting_id"] in failed:
+                    result.pop("setting")
+                    result.update({"status": 503, "error": "Please retry"})
+            
+            return {
+                "statusCode": 207,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"results": results})
+            }
+        except Exception as e:
+            logger.exception("Error batch creating settings")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _batch_get_settings(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            
+            try:
+                setting_ids = batch_entries(body, "setting_ids")
+                if not all(isinstance(setting_id, str) and setting_id for setting_id in setting_ids):
+                    raise ValueError("setting_ids must be strings")
+            except ValueError as e:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": str(e)})
+                }
+            
+            # BatchGetItem rejects duplicate keys
+            unique_ids = list(dict.fromkeys(setting_ids))
+            items, unprocessed = batch_get(
+                self.settings_table.name,
+                [{"tenant_id": tenant_id, "setting_id": setting_id} for setting_id in unique_ids]
+            )
+            found = {item["setting_id"]: item for item in items if is_live(item)}
+            retry = {key["setting_id"] for key in unprocessed}
+            
+            results = []
+            for setting_id in setting_ids:
+                if setting_id in found:
+                    results.append({"setting_id": setting_id, "status": 200, "setting": found[setting_id]})
+                elif setting_id in retry:
+                    results.append({"setting_id": setting_id, "status": 503, "error": "Please retry"})
+                else:
+                    results.append({"setting_id": setting_id, "status": 404, "error": "Setting not found"})
+            
+            return {
+                "statusCode": 207,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"results": results})
+            }
+        except Exception as e:
+            logger.exception("Error batch getting settings")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
-    def _get_setting(self, setting_id: str, tenant_id: str) -> Dict[str, Any]:
+    def _get_setting(self, event: Dict[str, Any], setting_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
-            response = self.settings_table.get_item(
-                Key={"tenant_id": tenant_id, "setting_id": setting_id}
+            item = settings_cache.get(
+                tenant_id, ("item", setting_id),
+                lambda: self.settings_table.get_item(
+                    Key={"tenant_id": tenant_id, "setting_id": setting_id}
+                ).get("Item")
             )
             
-            if "Item" not in response:
+            if not is_live(item):
                 return {
                     "statusCode": 404,
                     "headers": {"Content-Type": "application/json"},
-                    "body": json.dumps({"error": "Setting not found"})
+                    "body": serializer.dumps({"error": "Setting not found"})
                 }
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(response["Item"])
+                "body": serializer.dumps(item)
             }
         except Exception as e:
             logger.exception("Error getting setting")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
     def _update_setting(self, event: Dict[str, Any], setting_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
             body = json.loads(event.get("body", "{}"))
             
+            try:
+                expected_version = _if_match_version(event)
+            except ValueError:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "If-Match must carry a setting version"})
+                }
+            
+            try:
+                history_retention = _history_retention(body)
+            except ValueError as e:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": str(e)})
+                }
+            
             # Get current setting to increment version
             current = self.settings_table.get_item(
-                Key={"tenant_id": tenant_id, "setting_id": setting_id}
+                Key={"tenant_id": tenant_id, "setting_id": setting_id},
+                ConsistentRead=True
             )
             
-            if "Item" not in current:
+            if not is_live(current.get("Item")):
                 return {
                     "statusCode": 404,
                     "headers": {"Content-Type": "application/json"},
-                    "body": json.dumps({"error": "Setting not found"})
+                    "body": serializer.dumps({"error": "Setting not found"})
                 }
             
-            # Create history entry
-            history_id = f"{setting_id}#v{current['Item']['version']}"
-            history_item = current["Item"].copy()
-            history_item["setting_id"] = history_id
-            self.settings_table.put_item(Item=history_item)
+            current_item = current["Item"]
+            if expected_version is not None and expected_version != current_item["version"]:
+                return _version_conflict(current_item["version"])
             
             # Update current setting
-            updated_setting = current["Item"].copy()
+            updated_setting = current_item.copy()
             updated_setting.update({
                 "name": body.get("name", updated_setting["name"]),
                 "value": body.get("value", updated_setting["value"]),
                 "version": updated_setting["version"] + 1,
                 "updated_at": int(time.time())
             })
+            if history_retention is not None:
+                updated_setting["history_retention"] = history_retention
             
-            self.settings_table.put_item(Item=updated_setting)
+            try:
+                self._commit_version(current_item, updated_setting)
+            except self.settings_table.meta.client.exceptions.ConditionalCheckFailedException:
+                return _version_conflict()
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(updated_setting)
+                "body": serializer.dumps(updated_setting)
             }
         except Exception as e:
             logger.exception("Error updating setting")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
-    def _delete_setting(self, setting_id: str, tenant_id: str) -> Dict[str, Any]:
+    def _commit_version(self, current_item: Dict[str, Any], new_item: Dict[str, Any]) -> None:
+        # One conditional write; the stream consumer files the replaced version under
+        # history and applies retention
+        self.settings_table.put_item(
+            Item=new_item,
+            ConditionExpression="#version = :expected",
+            ExpressionAttributeNames={"#version": "version"},
+            ExpressionAttributeValues={":expected": current_item["version"]}
+        )
+        invalidate_settings(current_item["tenant_id"])
+    
+    def _delete_setting(self, event: Dict[str, Any], setting_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
-            self.settings_table.delete_item(
-                Key={"tenant_id": tenant_id, "setting_id": setting_id}
-            )
+            # Tombstone instead of delete, so /sync/changes can report it
+            soft_delete(self.settings_table, {"tenant_id": tenant_id, "setting_id": setting_id})
+            invalidate_settings(tenant_id)
             
             return {
                 "statusCode": 204,
@@ -187,26 +404,38 @@ class SettingsHandler:
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
-    def _get_setting_history(self, setting_id: str, tenant_id: str) -> Dict[str, Any]:
+    def _get_setting_history(self, event: Dict[str, Any], setting_id: str, tenant_id: str) -> Dict[str, Any]:
         try:
-            response = self.settings_table.query(
-                KeyConditionExpression=Key('tenant_id').eq(tenant_id) & Key('setting_id').begins_with(f"{setting_id}#v")
+            # Newest version first
+            items, next_token = SETTINGS.query_page(
+                event, f"settings-history:{tenant_id}:{setting_id}",
+                key_condition="tenant_id = :partition AND begins_with(setting_id, :prefix)",
+                values={":partition": f"{tenant_id}#history", ":prefix": f"{setting_id}#v"},
+                projection=LIST_FIELDS,
+                forward=False
             )
+            history = [dict(item, tenant_id=tenant_id, setting_id=setting_id) for item in items]
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"history": response["Items"]})
+                "body": serializer.dumps({"history": history, "next_token": next_token})
+            }
+        except InvalidPageRequest as e:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": str(e)})
             }
         except Exception as e:
             logger.exception("Error getting setting history")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
     def _rollback_setting(self, event: Dict[str, Any], setting_id: str, tenant_id: str) -> Dict[str, Any]:
@@ -218,47 +447,83 @@ class SettingsHandler:
                 return {
                     "statusCode": 400,
                     "headers": {"Content-Type": "application/json"},
-                    "body": json.dumps({"error": "version required"})
+                    "body": serializer.dumps({"error": "version required"})
+                }
+            
+            try:
+                historical_key = history_key(tenant_id, setting_id, version)
+            except (TypeError, ValueError):
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "version must be an integer"})
+                }
+            
+            try:
+                expected_version = _if_match_version(event)
+            except ValueError:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "If-Match must carry a setting version"})
                 }
             
-            # Get historical version
-            history_response = self.settings_table.get_item(
-                Key={"tenant_id": tenant_id, "setting_id": f"{setting_id}#v{version}"}
+            # Read current and historical versions in one consistent round trip
+            response = db.client().transact_get_items(
+                TransactItems=[
+                    {"Get": {"TableName": self.settings_table.name, "Key": {"tenant_id": tenant_id, "setting_id": setting_id}}},
+                    {"Get": {"TableName": self.settings_table.name, "Key": historical_key}}
+                ]
             )
+            current_item, historical_item = (r.get("Item") for r in response["Responses"])
             
-            if "Item" not in history_response:
+            if not is_live(current_item):
                 return {
                     "statusCode": 404,
                     "headers": {"Content-Type": "application/json"},
-                    "body": json.dumps({"error": "Version not found"})
+                    "body": serializer.dumps({"error": "Setting not found"})
                 }
             
+            if historical_item is None:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Version not found"})
+                }
+            
+            if expected_version is not None and expected_version != current_item["version"]:
+                return _version_conflict(current_item["version"])
+            
             # Restore as new version
-            historical_item = history_response["Item"]
             restored_setting = {
                 "tenant_id": tenant_id,
                 "setting_id": setting_id,
                 "name": historical_item["name"],
                 "value": historical_item["value"],
                 "is_public": historical_item.get("is_public", False),
-                "version": historical_item["version"] + 1,
-                "created_at": historical_item["created_at"],
+                "version": current_item["version"] + 1,
+                "created_at": current_item["created_at"],
                 "updated_at": int(time.time())
             }
+            if "history_retention" in current_item:
+                restored_setting["history_retention"] = current_item["history_retention"]
             
-            self.settings_table.put_item(Item=restored_setting)
+            try:
+                self._commit_version(current_item, restored_setting)
+            except self.settings_table.meta.client.exceptions.ConditionalCheckFailedException:
+                return _version_conflict()
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(restored_setting)
+                "body": serializer.dumps(restored_setting)
             }
         except Exception as e:
             logger.exception("Error rolling back setting")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
     def _update_visibility(self, event: Dict[str, Any], setting_id: str, tenant_id: str) -> Dict[str, Any]:
@@ -266,44 +531,94 @@ class SettingsHandler:
             body = json.loads(event.get("body", "{}"))
             is_public = body.get("is_public", False)
             
-            self.settings_table.update_item(
-                Key={"tenant_id": tenant_id, "setting_id": setting_id},
-                UpdateExpression="SET is_public = :public, updated_at = :updated",
-                ExpressionAttributeValues={
-                    ":public": is_public,
-                    ":updated": int(time.time())
+            try:
+                # The public feed entry follows asynchronously, via the stream consumer
+                self.settings_table.update_item(
+                    Key={"tenant_id": tenant_id, "setting_id": setting_id},
+                    UpdateExpression="SET is_public = :public, updated_at = :updated",
+                    ConditionExpression=f"attribute_exists(setting_id) AND {LIVE_CONDITION}",
+                    ExpressionAttributeValues={":public": is_public, ":updated": int(time.time())}
+                )
+                invalidate_settings(tenant_id)
+            except self.settings_table.meta.client.exceptions.ConditionalCheckFailedException:
+                return {
+                    "statusCode": 404,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": "Setting not found"})
                 }
-            )
             
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"is_public": is_public})
+                "body": serializer.dumps({"is_public": is_public})
             }
         except Exception as e:
             logger.exception("Error updating visibility")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
             }
     
-    def _list_public_settings(self) -> Dict[str, Any]:
+    def _list_public_settings(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
         try:
-            response = self.settings_table.scan(
-                FilterExpression="is_public = :public",
-                ExpressionAttributeValues={":public": True}
+            # Newest first from the sparse index; cost scales with public items only.
+            # The feed entry trails the setting, so a setting made private is filtered out here
+            items, next_token = SETTINGS.query_page(
+                event, "settings:public",
+                index=PUBLIC_INDEX,
+                key_condition="public_feed = :feed",
+                values={":feed": PUBLIC_FEED, ":public": True},
+                filter_expression="is_public = :public",
+                projection=LIST_FIELDS,
+                forward=False
             )
             
+            etag = collection_etag(items, ETAG_FIELDS, next_token)
+            return conditional_response(event, {"settings": items, "next_token": next_token}, etag)
+        except InvalidPageRequest as e:
             return {
-                "statusCode": 200,
+                "statusCode": 400,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"settings": response["Items"]})
+                "body": serializer.dumps({"error": str(e)})
             }
         except Exception as e:
             logger.exception("Error listing public settings")
             return {
                 "statusCode": 500,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Internal server error"})
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _get_setting_stats(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            # Counters are kept by the stream consumer, so this is a single read
+            counters = read_counters(self.settings_table, tenant_id)
+            
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps(counters)
+            }
+        except Exception as e:
+            logger.exception("Error getting setting stats")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
+    
+    def _get_effective_settings(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            # Built from every layer on a miss; a warm hit costs the stamp check at most
+            items = effective_cache.get(tenant_id, "effective", lambda: effective_settings(tenant_id))
+            
+            etag = collection_etag(items, EFFECTIVE_ETAG_FIELDS)
+            return conditional_response(event, {"settings": items}, etag)
+        except Exception as e:
+            logger.exception("Error resolving effective settings")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
             }
@@ -0,0 +1,121 @@
+import os
+import time
+from typing import Dict, Any
+from aws_lambda_powertools import Logger
+import serializer
+from changes import CHANGES_INDEX, TOMBSTONE_TTL
+from entities import BOOKMARKS, GROUPS, SETTINGS
+from handlers.bookmarks import LIST_FIELDS as BOOKMARKS_FIELDS
+from handlers.groups import LIST_FIELDS as GROUPS_FIELDS
+from handlers.settings import LIST_FIELDS as SETTINGS_FIELDS
+from pagination import InvalidPageRequest, decode_token, encode_token, page_params
+
+logger = Logger()
+
+# The index is eventually consistent, so each new window re-reads the last few
+# seconds of the previous one; clients apply changes idempotently
+CONSISTENCY_WINDOW = int(os.environ.get("SYNC_CONSISTENCY_WINDOW", "5"))
+
+# (response field, entity, id attribute, fields a live item is returned with)
+RESOURCES = (
+    ("settings", SETTINGS, "setting_id", SETTINGS_FIELDS),
+    ("bookmarks", BOOKMARKS, "bookmark_id", BOOKMARKS_FIELDS),
+    ("groups", GROUPS, "group_id", GROUPS_FIELDS)
+)
+
+class SyncExpired(Exception):
+    pass
+
+
+class SyncHandler:
+    ROUTES = (
+        ("GET", "/sync/changes", "_list_changes"),
+    )
+    
+    def _read_state(self, event: Dict[str, Any], scope: str) -> Dict[str, Any]:
+        token = (event.get("queryStringParameters") or {}).get("since")
+        if not token:
+            # First sync: everything the tenant has
+            state = {"since": 0}
+        else:
+            try:
+                state = decode_token(token, scope)
+            except InvalidPageRequest:
+                raise InvalidPageRequest("Invalid since token")
+            # Tombstones older than this are gone, so a delta could silently miss deletes;
+            # a first sync (since 0) reads everything live and needs none
+            if 0 < state["since"] < int(time.time()) - TOMBSTONE_TTL:
+                raise SyncExpired("Sync token expired, full resync required")
+        
+        if "until" not in state:
+            # Fresh window: pin its upper bound so paging through it is stable
+            state = {
+                "since": state["since"],
+                "until": max(int(time.time()), state["since"] + 1),
+                "pending": {name: None for name, _, _, _ in RESOURCES}
+            }
+        return state
+    
+    def _list_changes(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            limit, _ = page_params(event)
+            scope = f"sync:{tenant_id}"
+            state = self._read_state(event, scope)
+            
+            changes = {name: [] for name, _, _, _ in RESOURCES}
+            pending = {}
+            for name, entity, id_attr, fields in RESOURCES:
+                if name not in state["pending"]:
+                    continue
+                
+                items, last_key = entity.query(
+                    index=CHANGES_INDEX,
+                    key_condition="tenant_id = :tenant AND updated_at BETWEEN :since AND :until",
+                    values={":tenant": tenant_id, ":since": state["since"] + 1, ":until": state["until"]},
+                    # The same fields the list routes return; index and feed attributes stay server-side
+                    projection=fields + ["deleted"],
+                    limit=limit,
+                    start_key=state["pending"][name]
+                )
+                for item in items:
+                    if item.get("deleted"):
+                        item = {id_attr: item[id_attr], "deleted": True, "updated_at": item["updated_at"]}
+                    changes[name].append(item)
+                
+                if last_key:
+                    pending[name] = last_key
+            
+            if pending:
+                # Same window, resume the resources that still have pages
+                next_state = {"since": state["since"], "until": state["until"], "pending": pending}
+            else:
+                next_state = {"since": state["until"] - CONSISTENCY_WINDOW}
+            
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({
+                    "changes": changes,
+                    "sync_token": encode_token(next_state, scope),
+                    "has_more": bool(pending)
+                })
+            }
+        except InvalidPageRequest as e:
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": str(e)})
+            }
+        except SyncExpired as e:
+            return {
+                "statusCode": 410,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": str(e)})
+            }
+        except Exception as e:
+            logger.exception("Error listing changes")
+            return {
+                "statusCode": 500,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"error": "Internal server error"})
+            }
@@ -0,0 +1,14 @@
+import os
+from typing import Dict
+
+# Past setting versions, written by the stream consumer and read by the history and rollback routes.
+
+# Versions kept per setting unless the setting carries its own `history_retention`
+HISTORY_RETENTION = int(os.environ.get("SETTINGS_HISTORY_RETENTION", "50"))
+MAX_HISTORY_RETENTION = 1000
+
+
+def history_key(tenant_id: str, setting_id: str, version: int) -> Dict[str, str]:
+    # History lives in its own partition so live listings never read it;
+    # zero-padded versions keep the sort order numeric
+    return {"tenant_id": f"{tenant_id}#history", "setting_id": f"{setting_id}#v{int(version):010d}"}
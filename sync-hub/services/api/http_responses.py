@@ -0,0 +1,111 @@
+import base64
+import gzip
+import hashlib
+import os
+from typing import Dict, Any, Iterable, List, Optional
+
+import serializer
+
+# Bodies below this size are cheaper to send as-is than to compress
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", "5"))
+
+
+def collection_etag(items: Iterable[Dict[str, Any]], fields: List[str], next_token: Optional[str] = None) -> str:
+    """Strong ETag for a list page, built from each item's id/version fields only.
+
+    Hashing a few short attributes per item is much cheaper than hashing the
+    serialized body, and changes whenever any listed item is written.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for item in items:
+        for field in fields:
+            digest.update(str(item.get(field)).encode())
+            digest.update(b"\x1f")
+        digest.update(b"\x1e")
+    if next_token:
+        digest.update(next_token.encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def matching_etag(event: Dict[str, Any], etag: str) -> Optional[str]:
+    """The representation tag from If-None-Match that is still current, if any."""
+    headers = event.get("headers") or {}
+    header = headers.get("if-none-match") or headers.get("If-None-Match")
+    if not header:
+        return None
+    # If-None-Match uses weak comparison, so W/"x" matches "x"; the gzip variant matches too
+    accepted = (etag, _gzip_etag(etag))
+    for candidate in header.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate == "*":
+            return etag
+        if candidate in accepted:
+            return candidate
+    return None
+
+
+def conditional_response(event: Dict[str, Any], payload: Dict[str, Any], etag: str) -> Dict[str, Any]:
+    """200 with ``payload`` and ``ETag``, or a bodiless 304 if the client already has it."""
+    current = matching_etag(event, etag)
+    if current is not None:
+        return {
+            "statusCode": 304,
+            "headers": {"ETag": current},
+            "body": ""
+        }
+    
+    return {
+        "statusCode": 200,
+        "headers": {"Content-Type": "application/json", "ETag": etag, "Cache-Control": "no-cache"},
+        "body": serializer.dumps(payload)
+    }
+
+
+def _gzip_etag(etag: str) -> str:
+    # A compressed body is a different representation and needs its own strong ETag
+    return f'{etag[:-1]}-gzip"'
+
+
+def accepts_gzip(event: Dict[str, Any]) -> bool:
+    headers = event.get("headers") or {}
+    header = headers.get("accept-encoding") or headers.get("Accept-Encoding") or ""
+    for coding in header.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def compress_response(event: Dict[str, Any], response: Dict[str, Any]) -> Dict[str, Any]:
+    """Gzip a JSON response when the client accepts it and the body is worth it."""
+    body = response.get("body")
+    if not body or response.get("isBase64Encoded") or not accepts_gzip(event):
+        return response
+    
+    headers = response.setdefault("headers", {})
+    if "Content-Encoding" in headers:
+        return response
+    
+    raw = body.encode() if isinstance(body, str) else body
+    if len(raw) < COMPRESSION_MIN_BYTES:
+        return response
+    
+    compressed = gzip.compress(raw, compresslevel=COMPRESSION_LEVEL, mtime=0)
+    if len(compressed) >= len(raw):
+        return response
+    
+    headers["Content-Encoding"] = "gzip"
+    headers["Vary"] = "Accept-Encoding"
+    if "ETag" in headers:
+        headers["ETag"] = _gzip_etag(headers["ETag"])
+    response["body"] = base64.b64encode(compressed).decode()
+    response["isBase64Encoded"] = True
+    return response
@@ -0,0 +1,21 @@
+import contextvars
+from typing import Optional
+
+# Lambda context of the request being handled, so handlers can budget long work
+_context = contextvars.ContextVar("lambda_context", default=None)
+
+
+def bind(context) -> None:
+    _context.set(context)
+
+
+def remaining_ms() -> Optional[int]:
+    context = _context.get()
+    if context is None:
+        return None
+    return context.get_remaining_time_in_millis()
+
+
+def has_time(reserve_ms: int) -> bool:
+    remaining = remaining_ms()
+    return remaining is None or remaining > reserve_ms
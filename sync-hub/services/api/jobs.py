@@ -0,0 +1,57 @@
+import os
+from typing import Dict, Any
+from aws_lambda_powertools import Logger, Tracer
+import invocation
+import tasks
+from export import export_tenant
+from restore import restore_tenant
+from handlers.groups import GroupsHandler
+
+logger = Logger()
+tracer = Tracer()
+
+groups_handler = GroupsHandler()
+
+
+def _delete_group_members(event: Dict[str, Any]) -> Dict[str, Any]:
+    done = groups_handler.delete_group_data(event["tenant_id"], event["group_id"])
+    if not done:
+        # Out of time again: pick up where this run stopped in a fresh invocation
+        tasks.enqueue("delete_group_members", tenant_id=event["tenant_id"], group_id=event["group_id"])
+    return {"job": "delete_group_members", "done": done}
+
+
+def _export_tenant(event: Dict[str, Any]) -> Dict[str, Any]:
+    result = export_tenant(event["tenant_id"], event["export_id"])
+    return {"job": "export_tenant", "done": True, **result}
+
+
+def _restore_tenant(event: Dict[str, Any]) -> Dict[str, Any]:
+    state = restore_tenant(event["tenant_id"], event["restore_id"])
+    done = state["status"] != "running"
+    if not done:
+        # Checkpointed before running out of time: the next run resumes from it
+        tasks.enqueue("restore_tenant", tenant_id=event["tenant_id"], restore_id=event["restore_id"])
+    return {"job": "restore_tenant", "done": done, "status": state["status"]}
+
+
+JOBS = {
+    "delete_group_members": _delete_group_members,
+    "export_tenant": _export_tenant,
+    "restore_tenant": _restore_tenant,
+}
+
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def handler(event: Dict[str, Any], context) -> Dict[str, Any]:
+    invocation.bind(context)
+    # Continuations are sent back to this same function
+    os.environ.setdefault("JOBS_FUNCTION", context.function_name)
+    
+    job = JOBS.get(event.get("job"))
+    if job is None:
+        raise ValueError(f"Unknown job: {event.get('job')}")
+    
+    logger.info(f"Running job {event['job']}")
+    return job(event)
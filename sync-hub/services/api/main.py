@@ -1,4 +1,3 @@
-import json
 import os
 from typing import Dict, Any
 from aws_lambda_powertools import Logger, Tracer, Metrics
@@ -9,23 +8,43 @@ from handlers.settings import SettingsHandler
 from handlers.bookmarks import BookmarksHandler
 from handlers.groups import GroupsHandler
 from handlers.sessions import SessionsHandler
+from handlers.sync import SyncHandler
+from handlers.exports import ExportsHandler
+from http_responses import compress_response
+from routing import Router
+import invocation
+import pagination
+import serializer
 
 logger = Logger()
 tracer = Tracer()
 metrics = Metrics()
 
+# Fetched at cold start, so an instance without the signing key fails before serving
+pagination.token_secret()
+
 # Initialize handlers
 auth_handler = AuthHandler()
 settings_handler = SettingsHandler()
 bookmarks_handler = BookmarksHandler()
 groups_handler = GroupsHandler()
 sessions_handler = SessionsHandler()
+sync_handler = SyncHandler()
+exports_handler = ExportsHandler()
+
+# One route table for the whole API, compiled at import time
+router = Router(
+    (method, pattern, getattr(resource_handler, name))
+    for resource_handler in (auth_handler, settings_handler, bookmarks_handler, groups_handler, sessions_handler, sync_handler, exports_handler)
+    for method, pattern, name in resource_handler.ROUTES
+)
 
 @logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_HTTP)
 @tracer.capture_lambda_handler
 @metrics.log_metrics
 def handler(event: Dict[str, Any], context) -> Dict[str, Any]:
     try:
+        invocation.bind(context)
         method = event.get("requestContext", {}).get("http", {}).get("method")
         path = event.get("requestContext", {}).get("http", {}).get("path")
         
@@ -37,7 +56,7 @@ def handler(event: Dict[str, Any], context) -> Dict[str, Any]:
             return {
                 "statusCode": 200,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"ok": True})
+                "body": serializer.dumps({"ok": True})
             }
         
         # Extract tenant_id from JWT claims
@@ -47,22 +66,16 @@ def handler(event: Dict[str, Any], context) -> Dict[str, Any]:
             tenant_id = claims.get("sub", "default")
         
         # Route to appropriate handler
-        if path.startswith("/auth/"):
-            return auth_handler.handle(event, tenant_id)
-        elif path.startswith("/settings"):
-            return settings_handler.handle(event, tenant_id)
-        elif path.startswith("/bookmarks"):
-            return bookmarks_handler.handle(event, tenant_id)
-        elif path.startswith("/groups"):
-            return groups_handler.handle(event, tenant_id)
-        elif path.startswith("/sessions"):
-            return sessions_handler.handle(event, tenant_id)
-        else:
+        match = router.match(method, path)
+        if match is None:
             return {
                 "statusCode": 404,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"error": "Not found"})
+                "body": serializer.dumps({"error": "Not found"})
             }
+        
+        target, params = match
+        return compress_response(event, target(event, tenant_id=tenant_id, **params))
             
     except Exception as e:
         logger.exception("Unhandled error")
@@ -70,5 +83,5 @@ def handler(event: Dict[str, Any], context) -> Dict[str, Any]:
         return {
             "statusCode": 500,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Internal server error"})
+            "body": serializer.dumps({"error": "Internal server error"})
         }
@@ -0,0 +1,108 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+import boto3
+
+DEFAULT_PAGE_SIZE = int(os.environ.get("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", "200"))
+
+_lock = threading.Lock()
+_token_secret: Optional[bytes] = None
+
+
+class InvalidPageRequest(ValueError):
+    """Raised when ``limit`` or ``next_token`` cannot be honoured."""
+
+
+def _encode_key_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else str(value)
+    raise TypeError(f"Unsupported key type: {type(value).__name__}")
+
+
+def token_secret() -> bytes:
+    """The token signing key, fetched from Secrets Manager once per process.
+
+    Every instance must sign with the same key, so a missing secret is an error
+    rather than a reason to make one up.
+    """
+    global _token_secret
+    if _token_secret is None:
+        with _lock:
+            if _token_secret is None:
+                secret_arn = os.environ.get("PAGE_TOKEN_SECRET_ARN")
+                if not secret_arn:
+                    raise RuntimeError("PAGE_TOKEN_SECRET_ARN is not set")
+                response = boto3.client("secretsmanager").get_secret_value(SecretId=secret_arn)
+                _token_secret = response["SecretString"].encode()
+    return _token_secret
+
+
+def _sign(scope: str, payload: bytes) -> bytes:
+    return hmac.new(token_secret(), scope.encode() + b"\x00" + payload, hashlib.sha256).digest()[:16]
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def encode_token(last_key: Dict[str, Any], scope: str) -> str:
+    payload = json.dumps(last_key, separators=(",", ":"), sort_keys=True, default=_encode_key_value).encode()
+    return f"{_b64encode(payload)}.{_b64encode(_sign(scope, payload))}"
+
+
+def decode_token(token: str, scope: str) -> Dict[str, Any]:
+    try:
+        payload_part, signature_part = token.split(".", 1)
+        payload = _b64decode(payload_part)
+        signature = _b64decode(signature_part)
+    except ValueError:
+        raise InvalidPageRequest("Invalid next_token")
+
+    # The scope binds a token to one tenant and one list route
+    if not hmac.compare_digest(signature, _sign(scope, payload)):
+        raise InvalidPageRequest("Invalid next_token")
+
+    return json.loads(payload)
+
+
+def page_params(event: Dict[str, Any]) -> Tuple[int, Optional[str]]:
+    params = event.get("queryStringParameters") or {}
+    raw_limit = params.get("limit")
+
+    if raw_limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise InvalidPageRequest("limit must be an integer")
+        if limit < 1:
+            raise InvalidPageRequest("limit must be positive")
+
+    return min(limit, MAX_PAGE_SIZE), params.get("next_token") or None
+
+
+def query_page(table, event: Dict[str, Any], scope: str, **query_kwargs) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    limit, token = page_params(event)
+
+    query_kwargs["Limit"] = limit
+    if token:
+        query_kwargs["ExclusiveStartKey"] = decode_token(token, scope)
+
+    response = table.query(**query_kwargs)
+
+    last_key = response.get("LastEvaluatedKey")
+    next_token = encode_token(last_key, scope) if last_key else None
+
+    return response["Items"], next_token
@@ -0,0 +1,251 @@
+import gzip
+import json
+import os
+import time
+from decimal import Decimal
+from typing import Dict, Any, Optional
+
+from aws_lambda_powertools import Logger
+
+import db
+import invocation
+import serializer
+from batch import BATCH_WORKERS, BatchWriter
+from entities import BOOKMARKS, SETTINGS
+from export import FORMAT_VERSION, SOURCES, export_key, s3_client
+from group_settings import as_invitation, is_group_partition
+from stamps import STAMP_SUFFIX, restore_stamp
+from tag_index import index_items
+from url_index import normalize_url, url_item
+
+logger = Logger()
+
+# Tenant restores: an export file is streamed back from S3 and its rows are fanned out
+# to BatchWriteItem workers. Progress is checkpointed to S3 every CHECKPOINT_LINES
+# lines, so a restore that runs out of time or crashes resumes from the last checkpoint.
+
+RESTORE_WORKERS = int(os.environ.get("RESTORE_WORKERS", str(BATCH_WORKERS * 2)))
+CHECKPOINT_LINES = int(os.environ.get("RESTORE_CHECKPOINT_LINES", "10000"))
+
+# Time kept back for writing the checkpoint and handing over to a fresh invocation
+RESTORE_RESERVE_MS = int(os.environ.get("RESTORE_RESERVE_MS", "30000"))
+
+MAX_REPORTED_ERRORS = 20
+
+# Sort key of each exported table; the partition key is always tenant_id
+SORT_KEYS = {
+    "settings": "setting_id",
+    "bookmarks": "bookmark_id",
+    "groups": "group_id",
+    "group_members": "group_id#user_id",
+    "sessions": "session_id"
+}
+
+PARTITIONS = {name: suffixes for name, _, suffixes in SOURCES}
+
+
+class InvalidExport(Exception):
+    pass
+
+
+def restore_key(tenant_id: str, restore_id: str) -> str:
+    return f"restores/{tenant_id}/{restore_id}.json"
+
+
+def load_state(tenant_id: str, restore_id: str) -> Optional[Dict[str, Any]]:
+    client = s3_client()
+    try:
+        response = client.get_object(Bucket=os.environ["BACKUP_BUCKET"], Key=restore_key(tenant_id, restore_id))
+    except client.exceptions.NoSuchKey:
+        return None
+    return json.loads(response["Body"].read())
+
+
+def save_state(state: Dict[str, Any]) -> None:
+    state["updated_at"] = int(time.time())
+    s3_client().put_object(
+        Bucket=os.environ["BACKUP_BUCKET"],
+        Key=restore_key(state["tenant_id"], state["restore_id"]),
+        Body=serializer.dumpb(state),
+        ContentType="application/json"
+    )
+
+
+def new_state(tenant_id: str, restore_id: str, export_id: str, dry_run: bool) -> Dict[str, Any]:
+    state = {
+        "tenant_id": tenant_id,
+        "restore_id": restore_id,
+        "export_id": export_id,
+        "dry_run": dry_run,
+        "status": "pending",
+        "line": 0,
+        "counts": {name: 0 for name, _, _ in SOURCES},
+        "error_count": 0,
+        "errors": [],
+        "url_conflicts": 0,
+        "started_at": int(time.time())
+    }
+    save_state(state)
+    return state
+
+
+def _check_header(record: Dict[str, Any], tenant_id: str) -> None:
+    if record.get("type") != "export":
+        raise InvalidExport("Missing export header")
+    if record.get("format") != FORMAT_VERSION:
+        raise InvalidExport(f"Unsupported export format: {record.get('format')}")
+    if record.get("tenant_id") != tenant_id:
+        raise InvalidExport("Export belongs to another tenant")
+
+
+def _own_partition(table: str, partition: Any, tenant_id: str) -> bool:
+    if partition in {f"{tenant_id}{suffix}" for suffix in PARTITIONS[table]}:
+        return True
+    # Settings of the tenant's groups, `<tenant>#group#<group_id>`, and their stamps
+    if table != "settings" or not isinstance(partition, str) or not partition.startswith(f"{tenant_id}#group#"):
+        return False
+    return is_group_partition(partition[:-len(STAMP_SUFFIX)] if partition.endswith(STAMP_SUFFIX) else partition)
+
+
+def _check_item(record: Dict[str, Any], tenant_id: str) -> str:
+    table = record.get("table")
+    item = record.get("item")
+    if table not in PARTITIONS:
+        raise InvalidExport(f"Unknown table: {table}")
+    if not isinstance(item, dict):
+        raise InvalidExport("Row without an item")
+    if not _own_partition(table, item.get("tenant_id"), tenant_id):
+        raise InvalidExport("Row belongs to another tenant")
+    sort_key = item.get(SORT_KEYS[table])
+    if not isinstance(sort_key, str) or not sort_key:
+        raise InvalidExport(f"Row without {SORT_KEYS[table]}")
+    return table
+
+
+def _restore_url(table, tenant_id: str, url: str, bookmark_id: str) -> bool:
+    """Point the URL lookup at a restored bookmark unless another bookmark holds the URL.
+    
+    Conditional, like ``claim_url``: a bookmark created after the export keeps its URL,
+    and writing the same lookup again on resume is harmless.
+    """
+    try:
+        table.put_item(
+            Item=url_item(tenant_id, url, bookmark_id),
+            ConditionExpression="attribute_not_exists(bookmark_id) OR target_id = :bookmark",
+            ExpressionAttributeValues={":bookmark": bookmark_id}
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        return False
+    return True
+
+
+def _record_error(state: Dict[str, Any], line_number: int, error: Exception) -> None:
+    state["error_count"] += 1
+    if len(state["errors"]) < MAX_REPORTED_ERRORS:
+        state["errors"].append({"line": line_number, "error": str(error)})
+
+
+def _checkpoint(state: Dict[str, Any], writer: Optional[BatchWriter], line_number: int) -> None:
+    # Only lines whose writes all landed are covered by the checkpoint
+    if writer is not None and writer.flush():
+        raise RuntimeError("Rows still unprocessed after retries")
+    state["line"] = line_number
+    save_state(state)
+
+
+def restore_tenant(tenant_id: str, restore_id: str) -> Dict[str, Any]:
+    """Run or resume a restore; returns its state, with ``status`` still ``running``
+    when the invocation ran short of time and the restore has to be continued.
+    
+    A dry run reads and validates the whole file without writing anything.
+    """
+    state = load_state(tenant_id, restore_id)
+    if state is None:
+        raise ValueError(f"Unknown restore: {restore_id}")
+    # A failure recorded by an interrupted attempt is retried; a validation failure is final
+    if state["status"] == "complete" or (state["status"] == "failed" and not state.pop("retryable", False)):
+        return state
+    
+    state.pop("error", None)
+    state.setdefault("url_conflicts", 0)
+    state["status"] = "running"
+    tables = {name: entity.table_name for name, entity, _ in SOURCES}
+    settings_table = db.table(SETTINGS.table_env)
+    bookmarks_table = db.table(BOOKMARKS.table_env)
+    writer = None if state["dry_run"] else BatchWriter(RESTORE_WORKERS)
+    line_number = state["line"]
+    footer = None
+    
+    try:
+        body = s3_client().get_object(
+            Bucket=os.environ["BACKUP_BUCKET"], Key=export_key(tenant_id, state["export_id"])
+        )["Body"]
+        with gzip.GzipFile(fileobj=body) as lines:
+            for line_number, line in enumerate(lines, 1):
+                # Resuming: everything up to the checkpoint is already written
+                if line_number <= state["line"]:
+                    continue
+                
+                try:
+                    record = json.loads(line, parse_float=Decimal)
+                    if line_number == 1:
+                        _check_header(record, tenant_id)
+                    elif record.get("type") == "end":
+                        footer = record
+                    else:
+                        table = _check_item(record, tenant_id)
+                        if writer is not None:
+                            item = record["item"]
+                            # Export files pass through the client; other users' memberships come back as invitations
+                            if table == "group_members" and item.get("user_id") != tenant_id:
+                                item = as_invitation(item)
+                            if table == "settings" and item["tenant_id"].endswith(STAMP_SUFFIX):
+                                # Putting an older stamp back would repeat ETags clients already hold
+                                if item["setting_id"] == "stamp":
+                                    restore_stamp(settings_table, item["tenant_id"][:-len(STAMP_SUFFIX)], int(item.get("stamp", 0)))
+                            else:
+                                writer.put(tables[table], item)
+                            # Tag index items and URL lookups are derived data and not exported
+                            if table == "bookmarks":
+                                for index_item in index_items(tenant_id, item["bookmark_id"], item.get("tags") or []):
+                                    writer.put(tables[table], index_item)
+                                url = normalize_url(item.get("url"))
+                                if url is not None and not _restore_url(bookmarks_table, tenant_id, url, item["bookmark_id"]):
+                                    state["url_conflicts"] += 1
+                        state["counts"][table] += 1
+                except (ValueError, InvalidExport) as e:
+                    if writer is not None or line_number == 1:
+                        raise
+                    _record_error(state, line_number, e)
+                
+                if line_number % CHECKPOINT_LINES == 0:
+                    _checkpoint(state, writer, line_number)
+                    if not invocation.has_time(RESTORE_RESERVE_MS):
+                        return state
+        
+        if footer is None:
+            raise InvalidExport("Export is incomplete: no end line")
+        if footer.get("counts") != state["counts"]:
+            raise InvalidExport(f"Row counts do not match the export: {footer.get('counts')}")
+        
+        state["status"] = "failed" if state["error_count"] else "complete"
+        _checkpoint(state, writer, line_number)
+    except (ValueError, InvalidExport, EOFError, gzip.BadGzipFile) as e:
+        logger.warning("Restore failed validation", extra={"restore_id": restore_id, "line": line_number})
+        _record_error(state, line_number, e)
+        state["status"] = "failed"
+        save_state(state)
+    except Exception as e:
+        logger.exception("Error restoring tenant", extra={"restore_id": restore_id})
+        # Recorded on the last checkpoint, whose counts match its line; an async retry
+        # resumes from there, and once retries run out the failure stands
+        failed = load_state(tenant_id, restore_id)
+        failed.update(status="failed", error=str(e), retryable=True)
+        save_state(failed)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    logger.info("Restore finished", extra={"restore_id": restore_id, "status": state["status"], "counts": state["counts"]})
+    return state
@@ -0,0 +1,95 @@
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+Route = Tuple[str, str, Any]
+Match = Tuple[Any, Dict[str, str]]
+
+
+class _Node:
+    __slots__ = ("static", "param_name", "param", "targets")
+
+    def __init__(self):
+        self.static: Dict[str, "_Node"] = {}
+        self.param_name: Optional[str] = None
+        self.param: Optional["_Node"] = None
+        self.targets: Dict[str, Any] = {}
+
+
+def _normalize(path: str) -> str:
+    return path.rstrip("/") or "/"
+
+
+class Router:
+    """Route table compiled into a per-method static dict plus a segment trie.
+
+    Patterns use ``{name}`` segments for parameters. Static routes always win over
+    parameterized ones, so ``GET /settings/public`` never matches ``/settings/{setting_id}``.
+    """
+
+    def __init__(self, routes: Iterable[Route] = ()):
+        self._static: Dict[str, Dict[str, Any]] = {}
+        self._root = _Node()
+        for method, pattern, target in routes:
+            self.add(method, pattern, target)
+
+    def add(self, method: str, pattern: str, target: Any) -> None:
+        pattern = _normalize(pattern)
+        segments = pattern.strip("/").split("/")
+
+        if not any(segment.startswith("{") for segment in segments):
+            methods = self._static.setdefault(method, {})
+            if pattern in methods:
+                raise ValueError(f"Duplicate route: {method} {pattern}")
+            methods[pattern] = target
+            return
+
+        node = self._root
+        for segment in segments:
+            if segment.startswith("{") and segment.endswith("}"):
+                name = segment[1:-1]
+                if node.param is None:
+                    node.param_name, node.param = name, _Node()
+                elif node.param_name != name:
+                    raise ValueError(f"Conflicting parameter names in {pattern}: {node.param_name} vs {name}")
+                node = node.param
+            else:
+                node = node.static.setdefault(segment, _Node())
+
+        if method in node.targets:
+            raise ValueError(f"Duplicate route: {method} {pattern}")
+        node.targets[method] = target
+
+    def match(self, method: str, path: str) -> Optional[Match]:
+        path = _normalize(path)
+
+        methods = self._static.get(method)
+        if methods is not None and path in methods:
+            return methods[path], {}
+
+        values: List[Tuple[str, str]] = []
+        target = self._walk(self._root, path.strip("/").split("/"), 0, method, values)
+        if target is None:
+            return None
+        return target, dict(values)
+
+    def _walk(self, node: _Node, segments: List[str], index: int, method: str,
+              values: List[Tuple[str, str]]) -> Optional[Any]:
+        if index == len(segments):
+            return node.targets.get(method)
+
+        segment = segments[index]
+
+        # Static children first, then fall back to the parameter branch
+        child = node.static.get(segment)
+        if child is not None:
+            target = self._walk(child, segments, index + 1, method, values)
+            if target is not None:
+                return target
+
+        if node.param is not None and segment:
+            values.append((node.param_name, segment))
+            target = self._walk(node.param, segments, index + 1, method, values)
+            if target is not None:
+                return target
+            values.pop()
+
+        return None
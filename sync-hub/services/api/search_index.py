@@ -0,0 +1,255 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict
+from operator import itemgetter
+from typing import Dict, Any, List, Optional, Tuple
+
+from changes import CHANGES_INDEX, LIVE_CONDITION
+from entities import BOOKMARKS
+
+# Bookmark search. The stream consumer keeps one small document per bookmark (its
+# casefolded title and url) in the `<tenant>#search` partition of the bookmarks table.
+# Each warm container loads a tenant's documents on first search into a token index
+# (token -> documents) and a trigram index over the vocabulary (trigram -> tokens),
+# then follows later changes through the changes index instead of reloading.
+
+MAX_QUERY_LENGTH = 200
+MAX_QUERY_TERMS = 8
+
+SEARCH_CACHE_MAX_TENANTS = int(os.environ.get("SEARCH_CACHE_MAX_TENANTS", "16"))
+SEARCH_REFRESH_SECONDS = float(os.environ.get("SEARCH_REFRESH_SECONDS", "1"))
+
+# The changes index is eventually consistent; each refresh re-reads this many seconds
+REFRESH_OVERLAP = int(os.environ.get("SYNC_CONSISTENCY_WINDOW", "5"))
+
+# Replaced documents leave dead entries in the postings until the next compaction
+COMPACT_MIN_DEAD = 1000
+
+DOC_FIELDS = ["bookmark_id", "title", "url", "deleted"]
+
+_TOKEN = re.compile(r"\w+")
+_EMPTY = array("I")
+
+
+def search_partition(tenant_id: str) -> str:
+    return f"{tenant_id}#search"
+
+
+def normalize(text: Any) -> str:
+    return unicodedata.normalize("NFKC", text).casefold() if isinstance(text, str) else ""
+
+
+def query_terms(query: str) -> List[str]:
+    """Split a search query into distinct terms; raises ValueError when it is unusable."""
+    if len(query) > MAX_QUERY_LENGTH:
+        raise ValueError(f"q must be at most {MAX_QUERY_LENGTH} characters")
+    terms = list(dict.fromkeys(_TOKEN.findall(normalize(query))))
+    if not terms or len(terms) > MAX_QUERY_TERMS:
+        raise ValueError(f"q must contain 1 to {MAX_QUERY_TERMS} words")
+    return terms
+
+
+def search_doc(bookmark: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "tenant_id": search_partition(bookmark["tenant_id"]),
+        "bookmark_id": bookmark["bookmark_id"],
+        "title": normalize(bookmark.get("title")),
+        "url": normalize(bookmark.get("url")),
+        "updated_at": int(time.time())
+    }
+
+
+def _trigrams(term: str) -> set:
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+def _grams(token: str) -> set:
+    # Trigrams serve terms of 3+ characters; shorter terms match token prefixes
+    return _trigrams(token) | {"\0" + token[:n] for n in (1, 2)}
+
+
+class _TenantIndex:
+    """In-memory search index for one tenant; documents are numbered in insertion order."""
+    
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.synced_at = 0
+        self.checked_at = 0.0
+        self._reset()
+    
+    def _reset(self) -> None:
+        self.docs: List[Optional[Tuple[str, str, str]]] = []
+        self.ordinals: Dict[str, int] = {}
+        self.dead: set = set()
+        # Per field, token -> ordinals of the documents holding it, ascending
+        self.titles: Dict[str, array] = {}
+        self.urls: Dict[str, array] = {}
+        self.tokens: List[str] = []
+        self.token_ids: Dict[str, int] = {}
+        self.grams: Dict[str, array] = {}
+    
+    def _postings(self, field: Dict[str, array], token: str) -> array:
+        postings = field.get(token)
+        if postings is None:
+            postings = field[token] = array("I")
+            if token not in self.token_ids:
+                token_id = self.token_ids[token] = len(self.tokens)
+                self.tokens.append(token)
+                for gram in _grams(token):
+                    self.grams.setdefault(gram, array("I")).append(token_id)
+        return postings
+    
+    def upsert(self, bookmark_id: str, title: str, url: str) -> None:
+        ordinal = self.ordinals.get(bookmark_id)
+        if ordinal is not None:
+            if self.docs[ordinal] == (bookmark_id, title, url):
+                return
+            self.remove(bookmark_id)
+        
+        ordinal = len(self.docs)
+        self.docs.append((bookmark_id, title, url))
+        self.ordinals[bookmark_id] = ordinal
+        for token in set(_TOKEN.findall(title)):
+            self._postings(self.titles, token).append(ordinal)
+        for token in set(_TOKEN.findall(url)):
+            self._postings(self.urls, token).append(ordinal)
+    
+    def remove(self, bookmark_id: str) -> None:
+        ordinal = self.ordinals.pop(bookmark_id, None)
+        if ordinal is not None:
+            self.docs[ordinal] = None
+            self.dead.add(ordinal)
+    
+    def compact(self) -> None:
+        if len(self.dead) < max(COMPACT_MIN_DEAD, len(self.ordinals)):
+            return
+        live = [doc for doc in self.docs if doc is not None]
+        self._reset()
+        for doc in live:
+            self.upsert(*doc)
+    
+    def _matching_tokens(self, term: str) -> List[str]:
+        if len(term) < 3:
+            return [self.tokens[token_id] for token_id in self.grams.get("\0" + term, _EMPTY)]
+        # Tokens holding every trigram of the term, then the real substring check
+        candidates = sorted((self.grams.get(gram, _EMPTY) for gram in _trigrams(term)), key=len)
+        token_ids = set(candidates[0])
+        for other in candidates[1:]:
+            if not token_ids:
+                break
+            token_ids.intersection_update(other)
+        return [self.tokens[token_id] for token_id in token_ids if term in self.tokens[token_id]]
+    
+    def _term_docs(self, term: str) -> Tuple[set, List[set]]:
+        """Documents holding the term anywhere, and the title hits at each rank:
+        inside a title word, at the start of one, a whole title word."""
+        matched: set = set()
+        inside, prefix, whole = set(), set(), set()
+        for token in self._matching_tokens(term):
+            title = self.titles.get(token, _EMPTY)
+            matched.update(title)
+            matched.update(self.urls.get(token, _EMPTY))
+            inside.update(title)
+            if token.startswith(term):
+                prefix.update(title)
+                if token == term:
+                    whole.update(title)
+        return matched, [inside, prefix, whole]
+    
+    def search(self, terms: List[str], limit: int) -> Tuple[List[str], int]:
+        term_docs = [self._term_docs(term) for term in terms]
+        
+        # Rarest term first, so each intersection only shrinks a small set
+        matched = None
+        for docs, _ in sorted(term_docs, key=lambda entry: len(entry[0])):
+            matched = docs if matched is None else matched & docs
+            if not matched:
+                return [], 0
+        matched -= self.dead
+        
+        # A point per rank reached in the title; the updates stay in C however many match
+        scores: Counter = Counter()
+        for _, ranks in term_docs:
+            for hits in ranks:
+                scores.update(hits & matched)
+        
+        # Title hits by score, then url-only hits; ties go to the most recently indexed.
+        # Plain sorts with C keys, so a term that matches every bookmark stays cheap
+        ranked = [ordinal for ordinal, _ in sorted(scores.items(), key=itemgetter(1, 0), reverse=True)[:limit]]
+        if len(ranked) < limit:
+            ranked.extend(sorted(matched.difference(scores), reverse=True)[:limit - len(ranked)])
+        return [self.docs[ordinal][0] for ordinal in ranked], len(matched)
+    
+    def _apply(self, items: List[Dict[str, Any]]) -> None:
+        for item in items:
+            if item.get("deleted"):
+                self.remove(item["bookmark_id"])
+            else:
+                self.upsert(item["bookmark_id"], item.get("title", ""), item.get("url", ""))
+    
+    def refresh(self) -> None:
+        """Load the tenant's documents, or apply what changed since the last refresh."""
+        if self.loaded and time.monotonic() - self.checked_at < SEARCH_REFRESH_SECONDS:
+            return
+        
+        # Taken before reading, so writes that land during the read are picked up next time
+        started_at = int(time.time())
+        partition = search_partition(self.tenant_id)
+        if self.loaded:
+            query = {
+                "index": CHANGES_INDEX,
+                "key_condition": "tenant_id = :partition AND updated_at >= :since",
+                "values": {":partition": partition, ":since": self.synced_at - REFRESH_OVERLAP}
+            }
+        else:
+            query = {
+                "key_condition": "tenant_id = :partition",
+                "values": {":partition": partition},
+                "filter_expression": LIVE_CONDITION
+            }
+        
+        start_key = None
+        while True:
+            items, start_key = BOOKMARKS.query(projection=DOC_FIELDS, start_key=start_key, **query)
+            self._apply(items)
+            if start_key is None:
+                break
+        
+        self.compact()
+        self.loaded = True
+        self.synced_at = started_at
+        self.checked_at = time.monotonic()
+
+
+_lock = threading.Lock()
+_indexes: "OrderedDict[str, _TenantIndex]" = OrderedDict()
+
+
+def _tenant_index(tenant_id: str) -> _TenantIndex:
+    with _lock:
+        index = _indexes.get(tenant_id)
+        if index is None:
+            index = _indexes[tenant_id] = _TenantIndex(tenant_id)
+            while len(_indexes) > SEARCH_CACHE_MAX_TENANTS:
+                _indexes.popitem(last=False)
+        _indexes.move_to_end(tenant_id)
+        return index
+
+
+def search(tenant_id: str, terms: List[str], limit: int) -> Tuple[List[str], int]:
+    """Bookmark ids matching every term (as a word substring), best first, and the match count."""
+    index = _tenant_index(tenant_id)
+    with index.lock:
+        index.refresh()
+        return index.search(terms, limit)
+
+
+def clear() -> None:
+    with _lock:
+        _indexes.clear()
@@ -0,0 +1,35 @@
+import base64
+import json
+from decimal import Decimal
+from typing import Any
+
+from boto3.dynamodb.types import Binary
+
+
+def _default(value: Any) -> Any:
+    # Only called for types the C encoder does not know, so plain items cost nothing extra
+    if isinstance(value, Decimal):
+        # Timestamps and versions are integral; int() first is the cheap path for them
+        integral = int(value)
+        return integral if integral == value else float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, Binary):
+        value = value.value
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Compact output; ensure_ascii keeps the str -> bytes step a plain ASCII copy
+_encoder = json.JSONEncoder(separators=(",", ":"), default=_default)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize DynamoDB items (Decimal, sets, Binary) to compact JSON in one pass."""
+    return _encoder.encode(obj)
+
+
+def dumpb(obj: Any) -> bytes:
+    """Like ``dumps`` but returns bytes, for gzip and S3 bodies."""
+    return _encoder.encode(obj).encode("ascii")
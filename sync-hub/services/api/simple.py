@@ -0,0 +1,89 @@
+import json
+import os
+import time
+import uuid
+from decimal import Decimal
+
+import boto3
+from boto3.dynamodb.conditions import Key
+
+import serializer
+from changes import PUBLIC_FEED, PUBLIC_INDEX
+from pagination import InvalidPageRequest, query_page
+
+# Handler of the single-function stack in simple_app.py: health check, public feed and
+# setting creation, on the same signed page tokens as the full API.
+
+dynamodb = boto3.resource('dynamodb')
+table = dynamodb.Table(os.environ['SETTINGS_TABLE'])
+
+# Feed entries carry these fields only; `public_feed` is the index key and stays server-side
+PUBLIC_FIELDS = ["tenant_id", "setting_id", "name", "value", "is_public", "created_at", "updated_at"]
+
+
+def handler(event, context):
+    try:
+        method = event.get("requestContext", {}).get("http", {}).get("method")
+        path = event.get("requestContext", {}).get("http", {}).get("path")
+        
+        if path == "/_health":
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"ok": True, "message": "Sync Hub API is running!"})
+            }
+        
+        if path == "/settings/public":
+            try:
+                items, next_token = query_page(
+                    table, event, "settings:public",
+                    IndexName=PUBLIC_INDEX,
+                    KeyConditionExpression=Key("public_feed").eq(PUBLIC_FEED),
+                    ProjectionExpression=", ".join(f"#f{i}" for i in range(len(PUBLIC_FIELDS))),
+                    ExpressionAttributeNames={f"#f{i}": field for i, field in enumerate(PUBLIC_FIELDS)},
+                    ScanIndexForward=False
+                )
+            except InvalidPageRequest as e:
+                return {
+                    "statusCode": 400,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": serializer.dumps({"error": str(e)})
+                }
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({"settings": items, "next_token": next_token})
+            }
+        
+        if path == "/settings" and method == "POST":
+            body = json.loads(event.get("body", "{}"), parse_float=Decimal)
+            setting = {
+                "tenant_id": "default",
+                "setting_id": str(uuid.uuid4()),
+                "name": body.get("name", "Sample Setting"),
+                "value": body.get("value", "Sample Value"),
+                "is_public": body.get("is_public", True),
+                "created_at": int(time.time()),
+                "updated_at": int(time.time())
+            }
+            if setting["is_public"]:
+                setting["public_feed"] = PUBLIC_FEED
+            table.put_item(Item=setting)
+            return {
+                "statusCode": 201,
+                "headers": {"Content-Type": "application/json"},
+                "body": serializer.dumps({field: setting[field] for field in PUBLIC_FIELDS})
+            }
+        
+        return {
+            "statusCode": 404,
+            "headers": {"Content-Type": "application/json"},
+            "body": serializer.dumps({"error": "Not found"})
+        }
+    
+    except Exception as e:
+        return {
+            "statusCode": 500,
+            "headers": {"Content-Type": "application/json"},
+            "body": serializer.dumps({"error": str(e)})
+        }
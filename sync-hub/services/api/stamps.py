@@ -0,0 +1,124 @@
+import time
+from typing import Dict, Any
+
+# Per-tenant change stamp and counters for the settings table, kept by the stream consumer.
+# They live in their own partition, so no list query or index ever sees them.
+
+# Stream records are retained for 24 hours; replay markers only need to outlive that
+APPLIED_MARKER_TTL = 2 * 24 * 3600
+
+COUNTERS = ("settings", "public_settings")
+
+STAMP_SUFFIX = "#meta"
+
+
+def stamp_key(tenant_id: str) -> Dict[str, str]:
+    return {"tenant_id": f"{tenant_id}{STAMP_SUFFIX}", "setting_id": "stamp"}
+
+
+def counters_key(tenant_id: str) -> Dict[str, str]:
+    return {"tenant_id": f"{tenant_id}{STAMP_SUFFIX}", "setting_id": "counters"}
+
+
+def is_tenant_partition(partition: str) -> bool:
+    # History (`<tenant>#history`) and meta (`<tenant>#meta`) rows are not tenant data
+    return "#" not in partition
+
+
+def read_stamp(table, tenant_id: str) -> int:
+    response = table.get_item(Key=stamp_key(tenant_id), ConsistentRead=True)
+    return int(response.get("Item", {}).get("stamp", 0))
+
+
+def bump_stamp(table, tenant_id: str) -> None:
+    table.update_item(
+        Key=stamp_key(tenant_id),
+        UpdateExpression="ADD stamp :one SET updated_at = :now",
+        ExpressionAttributeValues={":one": 1, ":now": int(time.time())}
+    )
+
+
+def restore_stamp(table, tenant_id: str, stamp: int) -> None:
+    """Raise the stamp to an exported value, or bump it when it is already past that.
+    
+    Stamps only move forward, so cached ETags stay unique; a stamp left to expire by
+    a deleted group is kept again.
+    """
+    update = {
+        "Key": stamp_key(tenant_id),
+        "ExpressionAttributeNames": {"#ttl": "ttl"},
+        "ExpressionAttributeValues": {":stamp": stamp, ":now": int(time.time())}
+    }
+    try:
+        table.update_item(
+            UpdateExpression="SET stamp = :stamp, updated_at = :now REMOVE #ttl",
+            ConditionExpression="attribute_not_exists(stamp) OR stamp < :stamp",
+            **update
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        update["ExpressionAttributeValues"][":stamp"] = 1
+        table.update_item(UpdateExpression="ADD stamp :stamp SET updated_at = :now REMOVE #ttl", **update)
+
+
+def expire_stamp(table, tenant_id: str) -> None:
+    """Bump the stamp of a partition being deleted and let TTL remove it.
+    
+    Stream records for the deleted rows still bump it, so it is kept until they are gone.
+    """
+    now = int(time.time())
+    table.update_item(
+        Key=stamp_key(tenant_id),
+        UpdateExpression="ADD stamp :one SET updated_at = :now, #ttl = :expires",
+        ExpressionAttributeNames={"#ttl": "ttl"},
+        ExpressionAttributeValues={":one": 1, ":now": now, ":expires": now + APPLIED_MARKER_TTL}
+    )
+
+
+def read_counters(table, tenant_id: str) -> Dict[str, int]:
+    item = table.get_item(Key=counters_key(tenant_id)).get("Item", {})
+    return {name: int(item.get(name, 0)) for name in COUNTERS}
+
+
+def add_counts(table, tenant_id: str, record_id: str, deltas: Dict[str, int]) -> bool:
+    """Apply counter deltas for one stream record, at most once.
+    
+    Records after a failed one are redelivered, so a marker keyed by the record id
+    is written in the same transaction. Returns False for a record already applied.
+    """
+    now = int(time.time())
+    names = {f"#{name}": name for name in deltas}
+    values: Dict[str, Any] = {f":{name}": delta for name, delta in deltas.items()}
+    values[":now"] = now
+    
+    client = table.meta.client
+    try:
+        client.transact_write_items(
+            TransactItems=[
+                {
+                    "Put": {
+                        "TableName": table.name,
+                        "Item": {
+                            "tenant_id": f"{tenant_id}#meta",
+                            "setting_id": f"applied#{record_id}",
+                            "ttl": now + APPLIED_MARKER_TTL
+                        },
+                        "ConditionExpression": "attribute_not_exists(setting_id)"
+                    }
+                },
+                {
+                    "Update": {
+                        "TableName": table.name,
+                        "Key": counters_key(tenant_id),
+                        "UpdateExpression": "ADD " + ", ".join(f"#{name} :{name}" for name in deltas) + " SET updated_at = :now",
+                        "ExpressionAttributeNames": names,
+                        "ExpressionAttributeValues": values
+                    }
+                }
+            ]
+        )
+    except client.exceptions.TransactionCanceledException as e:
+        reasons = e.response.get("CancellationReasons", [])
+        if reasons and reasons[0].get("Code") == "ConditionalCheckFailed":
+            return False
+        raise
+    return True
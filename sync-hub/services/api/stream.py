@@ -0,0 +1,157 @@
+from typing import Dict, Any, Optional
+from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools.utilities.batch import BatchProcessor, EventType, process_partial_response
+from aws_lambda_powertools.utilities.data_classes.dynamo_db_stream_event import DynamoDBRecord
+from boto3.dynamodb.conditions import Key
+import db
+from batch import batch_write
+from changes import LIVE_CONDITION, PUBLIC_FEED, is_live, tombstone
+from group_settings import is_group_partition
+from history import HISTORY_RETENTION, history_key
+from search_index import search_doc, search_partition
+from stamps import add_counts, bump_stamp, is_tenant_partition
+
+logger = Logger()
+tracer = Tracer()
+
+processor = BatchProcessor(event_type=EventType.DynamoDBStreams)
+
+# Every handler below is idempotent or guarded, because a failed record makes
+# the batch redeliver it together with the records after it
+
+
+def _is_public(image: Optional[Dict[str, Any]]) -> bool:
+    return is_live(image) and bool(image.get("is_public"))
+
+
+def _record_history(table, old_image: Dict[str, Any], new_image: Dict[str, Any]) -> None:
+    # A version bump on a live setting files the replaced version under history
+    if not (is_live(old_image) and is_live(new_image)):
+        return
+    if int(new_image.get("version", 0)) <= int(old_image.get("version", 0)):
+        return
+    
+    tenant_id = old_image["tenant_id"]
+    setting_id = old_image["setting_id"]
+    version = int(old_image["version"])
+    history_item = dict(old_image)
+    history_item.update(history_key(tenant_id, setting_id, version))
+    history_item.pop("public_feed", None)
+    table.put_item(Item=history_item)
+    
+    # Retention: every version below the window is dropped, not just the one that fell out
+    # of it, so a lowered retention or an earlier failed delete does not leave versions behind
+    retention = int(new_image.get("history_retention", HISTORY_RETENTION))
+    expired_version = version - retention
+    if expired_version > 0:
+        _delete_history(table, tenant_id, setting_id, expired_version)
+
+
+def _delete_history(table, tenant_id: str, setting_id: str, last_version: int) -> None:
+    first_key = history_key(tenant_id, setting_id, 0)
+    last_key = history_key(tenant_id, setting_id, last_version)
+    query_kwargs = {
+        "KeyConditionExpression": Key("tenant_id").eq(first_key["tenant_id"])
+                                  & Key("setting_id").between(first_key["setting_id"], last_key["setting_id"]),
+        "ProjectionExpression": "tenant_id, setting_id"
+    }
+    # The range can also hold versions of a setting whose own id extends this one's
+    version_length = len(last_key["setting_id"])
+    while True:
+        response = table.query(**query_kwargs)
+        requests = [{"DeleteRequest": {"Key": item}} for item in response["Items"]
+                    if len(item["setting_id"]) == version_length]
+        if batch_write(table.name, requests):
+            raise RuntimeError("History deletes still unprocessed after retries")
+        if "LastEvaluatedKey" not in response:
+            return
+        query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def _sync_public_feed(table, new_image: Optional[Dict[str, Any]]) -> None:
+    # Conditioned on the item's current visibility, so a stale record never undoes a newer write
+    if not is_live(new_image):
+        return
+    key = {"tenant_id": new_image["tenant_id"], "setting_id": new_image["setting_id"]}
+    try:
+        if _is_public(new_image) and "public_feed" not in new_image:
+            table.update_item(
+                Key=key,
+                UpdateExpression="SET public_feed = :feed",
+                ConditionExpression=f"is_public = :public AND {LIVE_CONDITION}",
+                ExpressionAttributeValues={":feed": PUBLIC_FEED, ":public": True}
+            )
+        elif not _is_public(new_image) and "public_feed" in new_image:
+            table.update_item(
+                Key=key,
+                UpdateExpression="REMOVE public_feed",
+                ConditionExpression="is_public = :public",
+                ExpressionAttributeValues={":public": False}
+            )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        logger.debug("Public feed already superseded", extra={"key": key})
+
+
+def _count(table, record_id: str, tenant_id: str, old_image: Optional[Dict[str, Any]],
+           new_image: Optional[Dict[str, Any]]) -> None:
+    deltas = {
+        "settings": int(is_live(new_image)) - int(is_live(old_image)),
+        "public_settings": int(_is_public(new_image)) - int(_is_public(old_image))
+    }
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if deltas and not add_counts(table, tenant_id, record_id, deltas):
+        logger.debug("Counters already applied", extra={"event_id": record_id})
+
+
+def record_handler(record: DynamoDBRecord) -> None:
+    keys = record.dynamodb.keys
+    tenant_id = keys["tenant_id"]
+    if is_group_partition(tenant_id):
+        # Group settings have no history or counters, only the stamp effective settings watch
+        bump_stamp(db.table('SETTINGS_TABLE'), tenant_id)
+        return
+    if not is_tenant_partition(tenant_id):
+        return
+    
+    table = db.table('SETTINGS_TABLE')
+    old_image = record.dynamodb.old_image
+    new_image = record.dynamodb.new_image
+    
+    _record_history(table, old_image, new_image)
+    _sync_public_feed(table, new_image)
+    _count(table, record.event_id, tenant_id, old_image, new_image)
+    
+    # Any change to a tenant's settings invalidates every warm cache holding them
+    bump_stamp(table, tenant_id)
+
+
+def bookmark_record_handler(record: DynamoDBRecord) -> None:
+    keys = record.dynamodb.keys
+    tenant_id = keys["tenant_id"]
+    if not is_tenant_partition(tenant_id):
+        return
+    
+    table = db.table('BOOKMARKS_TABLE')
+    old_image = record.dynamodb.old_image
+    new_image = record.dynamodb.new_image
+    
+    # The search document mirrors the bookmark's title and url; tag-only edits leave it alone
+    if is_live(new_image):
+        if is_live(old_image) and all(old_image.get(field) == new_image.get(field) for field in ("title", "url")):
+            return
+        table.put_item(Item=search_doc(new_image))
+    elif is_live(old_image):
+        # Tombstoned (or removed outright): a tombstone tells warm indexes to drop it
+        table.put_item(Item=tombstone({"tenant_id": search_partition(tenant_id), "bookmark_id": keys["bookmark_id"]}))
+
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def handler(event: Dict[str, Any], context) -> Dict[str, Any]:
+    return process_partial_response(event=event, record_handler=record_handler, processor=processor, context=context)
+
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def bookmarks_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
+    return process_partial_response(event=event, record_handler=bookmark_record_handler, processor=processor, context=context)
@@ -0,0 +1,110 @@
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+from entities import BOOKMARKS
+
+# Inverted index for bookmark tags: one keys-only item per (tag, bookmark) in the
+# `<tenant>#tag#<tag>` partition of the bookmarks table, sorted by bookmark_id.
+# Bookmark writes maintain it in the same transaction. Tag queries walk these
+# partitions, so they cost in proportion to the matches, not the collection.
+
+MAX_TAGS = 20
+MAX_TAG_LENGTH = 100
+MAX_QUERY_TAGS = 10
+
+
+def tag_partition(tenant_id: str, tag: str) -> str:
+    return f"{tenant_id}#tag#{tag}"
+
+
+def normalize_tags(value: Any) -> List[str]:
+    """Validate a bookmark's tags; duplicates are dropped, order is kept."""
+    if not isinstance(value, list):
+        raise ValueError("tags must be a list of strings")
+    tags = list(dict.fromkeys(value))
+    if not all(isinstance(tag, str) and 0 < len(tag) <= MAX_TAG_LENGTH for tag in tags):
+        raise ValueError(f"Each tag must be a string of 1 to {MAX_TAG_LENGTH} characters")
+    if len(tags) > MAX_TAGS:
+        raise ValueError(f"At most {MAX_TAGS} tags per bookmark")
+    return tags
+
+
+def index_items(tenant_id: str, bookmark_id: str, tags: List[str]) -> List[Dict[str, Any]]:
+    # Keys only: no updated_at, so index items never reach the changes index
+    return [{"tenant_id": tag_partition(tenant_id, tag), "bookmark_id": bookmark_id} for tag in tags]
+
+
+def index_writes(table_name: str, tenant_id: str, bookmark_id: str,
+                 added: List[str], removed: List[str]) -> List[Dict[str, Any]]:
+    """TransactWriteItems entries that move a bookmark's index items from ``removed`` to ``added``."""
+    writes = [{"Put": {"TableName": table_name, "Item": item}} for item in index_items(tenant_id, bookmark_id, added)]
+    writes.extend(
+        {"Delete": {"TableName": table_name, "Key": key}} for key in index_items(tenant_id, bookmark_id, removed)
+    )
+    return writes
+
+
+class _TagCursor:
+    """Ascending bookmark ids of one tag partition, read a page at a time."""
+    
+    def __init__(self, tenant_id: str, tag: str, page_size: int):
+        self.partition = tag_partition(tenant_id, tag)
+        self.page_size = page_size
+        self._ids: deque = deque()
+        self._exhausted = False
+    
+    def seek(self, target: Optional[str], inclusive: bool) -> Optional[str]:
+        """First id at (or after, unless ``inclusive``) ``target``; None when there is none."""
+        ids = self._ids
+        while ids and target is not None and (ids[0] < target or (ids[0] == target and not inclusive)):
+            ids.popleft()
+        if ids or self._exhausted:
+            return ids[0] if ids else None
+        
+        # Buffer used up: read the next page straight from the target
+        values = {":partition": self.partition}
+        key_condition = "tenant_id = :partition"
+        if target is not None:
+            key_condition += f" AND bookmark_id {'>=' if inclusive else '>'} :target"
+            values[":target"] = target
+        items, last_key = BOOKMARKS.query(
+            key_condition=key_condition, values=values,
+            projection=["bookmark_id"], limit=self.page_size
+        )
+        ids.extend(item["bookmark_id"] for item in items)
+        self._exhausted = last_key is None
+        return ids[0] if ids else None
+
+
+def match_tags(tenant_id: str, tags: List[str], match_all: bool, after: Optional[str],
+               limit: int) -> Tuple[List[str], bool]:
+    """Bookmark ids after ``after`` carrying all (or any) of ``tags``, in id order.
+    
+    All: a leapfrog join, every cursor seeks to the highest current id, so reads
+    follow the rarest tag. Any: a merge of the sorted partitions. Returns
+    ``(ids, more)``; ``more`` is False once every partition is exhausted.
+    """
+    cursors = [_TagCursor(tenant_id, tag, limit) for tag in tags]
+    matches: List[str] = []
+    target, inclusive = after, False
+    
+    while len(matches) < limit:
+        current = [cursor.seek(target, inclusive) for cursor in cursors]
+        if match_all:
+            if None in current:
+                return matches, False
+            highest = max(current)
+            if current.count(highest) == len(current):
+                matches.append(highest)
+                target, inclusive = highest, False
+            else:
+                target, inclusive = highest, True
+        else:
+            remaining = [bookmark_id for bookmark_id in current if bookmark_id is not None]
+            if not remaining:
+                return matches, False
+            lowest = min(remaining)
+            matches.append(lowest)
+            target, inclusive = lowest, False
+    
+    return matches, True
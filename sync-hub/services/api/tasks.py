@@ -0,0 +1,27 @@
+import json
+import os
+import threading
+from typing import Any
+
+import boto3
+
+# Fire-and-forget jobs run by the JobsFunction (see jobs.py)
+_lock = threading.Lock()
+_client = None
+
+
+def _lambda_client():
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = boto3.client('lambda')
+    return _client
+
+
+def enqueue(job: str, **payload: Any) -> None:
+    _lambda_client().invoke(
+        FunctionName=os.environ["JOBS_FUNCTION"],
+        InvocationType="Event",
+        Payload=json.dumps({"job": job, **payload}).encode()
+    )
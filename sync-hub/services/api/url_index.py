@@ -0,0 +1,69 @@
+import hashlib
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+# URL lookup for bookmarks: one item per normalized URL in the `<tenant>#url` partition
+# of the bookmarks table, keyed by the URL's hash and naming the bookmark that holds it.
+# Bookmark writes claim and release it in the same transaction, so a URL belongs to
+# at most one live bookmark and creating a bookmark for a known URL finds the existing one.
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: Any) -> Optional[str]:
+    """Canonical form compared for duplicates; None when the URL cannot be compared.
+    
+    Scheme and host are lowercased, default ports, user info, fragments and a trailing
+    slash are dropped. The query string is kept as is.
+    """
+    if not isinstance(url, str) or not url.strip():
+        return None
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    
+    scheme = parts.scheme.lower()
+    host = parts.hostname
+    if not scheme or not host:
+        return None
+    if ":" in host:
+        host = f"[{host}]"
+    netloc = host if port is None or port == DEFAULT_PORTS.get(scheme) else f"{host}:{port}"
+    return urlunsplit((scheme, netloc, parts.path.rstrip("/"), parts.query, ""))
+
+
+def url_key(tenant_id: str, url: str) -> Dict[str, str]:
+    return {
+        "tenant_id": f"{tenant_id}#url",
+        "bookmark_id": hashlib.sha256(url.encode()).hexdigest()
+    }
+
+
+def url_item(tenant_id: str, url: str, bookmark_id: str) -> Dict[str, Any]:
+    # No updated_at, so lookups never reach the changes index
+    return dict(url_key(tenant_id, url), target_id=bookmark_id)
+
+
+def claim_url(table_name: str, tenant_id: str, url: str, bookmark_id: str) -> Dict[str, Any]:
+    """TransactWriteItems entry that fails when another bookmark holds ``url``."""
+    return {
+        "Put": {
+            "TableName": table_name,
+            "Item": url_item(tenant_id, url, bookmark_id),
+            "ConditionExpression": "attribute_not_exists(bookmark_id) OR target_id = :bookmark",
+            "ExpressionAttributeValues": {":bookmark": bookmark_id}
+        }
+    }
+
+
+def release_url(table_name: str, tenant_id: str, url: str, bookmark_id: str) -> Dict[str, Any]:
+    return {
+        "Delete": {
+            "TableName": table_name,
+            "Key": url_key(tenant_id, url),
+            "ConditionExpression": "target_id = :bookmark",
+            "ExpressionAttributeValues": {":bookmark": bookmark_id}
+        }
+    }
@@ -7,6 +7,7 @@ from aws_cdk import (
     aws_apigatewayv2 as apigw,
     aws_iam as iam,
     aws_logs as logs,
+    aws_secretsmanager as secretsmanager,
     aws_ssm as ssm
 )
 from constructs import Construct
@@ -25,82 +26,40 @@ class SimpleApiStack(Stack):
             removal_policy=RemovalPolicy.DESTROY
         )
 
+        # Sparse public feed: only public settings carry `public_feed`
+        settings_table.add_global_secondary_index(
+            index_name="public-settings-index",
+            partition_key=dynamodb.Attribute(name="public_feed", type=dynamodb.AttributeType.STRING),
+            sort_key=dynamodb.Attribute(name="updated_at", type=dynamodb.AttributeType.NUMBER),
+            projection_type=dynamodb.ProjectionType.ALL
+        )
+
+        # Signing key for the feed's page tokens, read by the function at cold start
+        page_token_secret = secretsmanager.Secret(
+            self, "PageTokenSecret",
+            description="HMAC key for Sync Hub pagination tokens",
+            generate_secret_string=secretsmanager.SecretStringGenerator(
+                exclude_punctuation=True,
+                password_length=48
+            )
+        )
+
         # Lambda function
         api_function = _lambda.Function(
             self, "ApiFunction",
             runtime=_lambda.Runtime.PYTHON_3_12,
-            handler="index.handler",
-            code=_lambda.Code.from_inline("""
-import json
-import uuid
-import time
-import boto3
-import os
-
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['SETTINGS_TABLE'])
-
-def handler(event, context):
-    try:
-        method = event.get("requestContext", {}).get("http", {}).get("method")
-        path = event.get("requestContext", {}).get("http", {}).get("path")
-        
-        if path == "/_health":
-            return {
-                "statusCode": 200,
-                "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"ok": True, "message": "Sync Hub API is running!"})
-            }
-        
-        if path == "/settings/public":
-            response = table.scan(
-                FilterExpression="is_public = :public",
-                ExpressionAttributeValues={":public": True}
-            )
-            return {
-                "statusCode": 200,
-                "headers": {"Content-Type": "application/json"},
-                "body": json.dumps({"settings": response.get("Items", [])})
-            }
-        
-        if path == "/settings" and method == "POST":
-            body = json.loads(event.get("body", "{}"))
-            setting = {
-                "tenant_id": "default",
-                "setting_id": str(uuid.uuid4()),
-                "name": body.get("name", "Sample Setting"),
-                "value": body.get("value", "Sample Value"),
-                "is_public": body.get("is_public", True),
-                "created_at": int(time.time())
-            }
-            table.put_item(Item=setting)
-            return {
-                "statusCode": 201,
-                "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(setting)
-            }
-        
-        return {
-            "statusCode": 404,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Not found"})
-        }
-        
-    except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": str(e)})
-        }
-"""),
+            handler="simple.handler",
+            code=_lambda.Code.from_asset("services/api"),
             environment={
-                "SETTINGS_TABLE": settings_table.table_name
+                "SETTINGS_TABLE": settings_table.table_name,
+                "PAGE_TOKEN_SECRET_ARN": page_token_secret.secret_arn
             },
             timeout=Duration.seconds(30)
         )
 
         # Grant DynamoDB permissions
         settings_table.grant_read_write_data(api_function)
+        page_token_secret.grant_read(api_function)
 
         # HTTP API
         api = apigw.HttpApi(
@@ -0,0 +1,48 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The Lambda code imports its modules top-level, with Powertools from the layer
+sys.path[:0] = [os.path.join(ROOT, "services", "api"), os.path.join(ROOT, "layers", "powertools", "python")]
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("POWERTOOLS_SERVICE_NAME", "sync-hub")
+os.environ.setdefault("POWERTOOLS_METRICS_NAMESPACE", "SyncHub")
+os.environ.setdefault("POWERTOOLS_TRACE_DISABLED", "1")
+for table_env in ("SETTINGS_TABLE", "BOOKMARKS_TABLE", "GROUPS_TABLE", "GROUP_MEMBERS_TABLE", "SESSIONS_TABLE"):
+    os.environ.setdefault(table_env, f"test-{table_env.lower()}")
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def token_secret(monkeypatch):
+    # Stands in for the key fetched from Secrets Manager at cold start
+    import pagination
+    monkeypatch.setattr(pagination, "_token_secret", b"test-signing-key")
+
+
+@pytest.fixture
+def tables(monkeypatch):
+    """Stub tables for every table env var, served through ``db.table`` and the ``db`` clients."""
+    import db
+    from stubs import StubClient, StubRawClient, StubTable
+    
+    changes = {"changes-index": ("tenant_id", "updated_at")}
+    client = StubClient()
+    stubs = {
+        "SETTINGS_TABLE": StubTable(os.environ["SETTINGS_TABLE"], "tenant_id", "setting_id", client=client,
+                                    indexes=dict(changes, **{"public-settings-index": ("public_feed", "updated_at")})),
+        "BOOKMARKS_TABLE": StubTable(os.environ["BOOKMARKS_TABLE"], "tenant_id", "bookmark_id", client=client,
+                                     indexes=changes),
+        "GROUPS_TABLE": StubTable(os.environ["GROUPS_TABLE"], "tenant_id", "group_id", client=client, indexes=changes),
+        "GROUP_MEMBERS_TABLE": StubTable(os.environ["GROUP_MEMBERS_TABLE"], "tenant_id", "group_id#user_id",
+                                         client=client, indexes={"member-groups-index": ("user_id", "group_id")}),
+        "SESSIONS_TABLE": StubTable(os.environ["SESSIONS_TABLE"], "tenant_id", "session_id", client=client)
+    }
+    monkeypatch.setattr(db, "table", lambda env_name: stubs[env_name])
+    monkeypatch.setattr(db, "client", lambda: client)
+    raw_client = StubRawClient(client)
+    monkeypatch.setattr(db, "raw_client", lambda: raw_client)
+    return stubs
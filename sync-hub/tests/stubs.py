@@ -0,0 +1,388 @@
+import re
+from decimal import Decimal
+from types import SimpleNamespace
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+# In-memory stand-in for the boto3 Table resource: enough of DynamoDB's expression
+# language (comparisons, BETWEEN, begins_with, attribute_(not_)exists, AND/OR/NOT,
+# SET/ADD/REMOVE) to run the handlers' conditional writes and queries without AWS.
+
+
+class ConditionalCheckFailedException(ClientError):
+    def __init__(self, operation="UpdateItem"):
+        super().__init__({"Error": {"Code": "ConditionalCheckFailedException", "Message": "The conditional request failed"}},
+                         operation)
+
+
+class TransactionCanceledException(ClientError):
+    def __init__(self, reasons):
+        super().__init__({"Error": {"Code": "TransactionCanceledException", "Message": "Transaction cancelled"},
+                          "CancellationReasons": reasons}, "TransactWriteItems")
+
+
+_TOKEN = re.compile(r"\s*(<>|<=|>=|[=<>(),+]|[#:]?[A-Za-z_][\w#.-]*)")
+
+
+def _tokens(expression):
+    tokens, position = [], 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if not match:
+            raise ValueError(f"Cannot parse expression at: {expression[position:]!r}")
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+class _Expression:
+    def __init__(self, expression, names, values):
+        self.tokens = _tokens(expression)
+        self.position = 0
+        self.names = names or {}
+        self.values = values or {}
+    
+    def peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+    
+    def take(self, expected=None):
+        token = self.peek()
+        if expected is not None and (token or "").upper() != expected:
+            raise ValueError(f"Expected {expected}, got {token!r}")
+        self.position += 1
+        return token
+    
+    def name(self, token):
+        return self.names.get(token, token)
+
+
+def _operand(expr, item):
+    token = expr.take()
+    if token.startswith(":"):
+        return expr.values[token]
+    if token == "if_not_exists":
+        expr.take("(")
+        name = expr.name(expr.take())
+        expr.take(",")
+        default = _operand(expr, item)
+        expr.take(")")
+        value = item.get(name, default)
+    else:
+        value = item.get(expr.name(token))
+    if expr.peek() == "+":
+        expr.take()
+        value = value + _operand(expr, item)
+    return value
+
+
+def _compare(left, operator, right):
+    if left is None or right is None:
+        return operator == "<>" and left != right
+    return {"=": left == right, "<>": left != right, "<": left < right, "<=": left <= right,
+            ">": left > right, ">=": left >= right}[operator]
+
+
+def _condition(expr, item):
+    result = _conjunction(expr, item)
+    while (expr.peek() or "").upper() == "OR":
+        expr.take()
+        result = _conjunction(expr, item) or result
+    return result
+
+
+def _conjunction(expr, item):
+    result = _predicate(expr, item)
+    while (expr.peek() or "").upper() == "AND":
+        expr.take()
+        result = _predicate(expr, item) and result
+    return result
+
+
+def _predicate(expr, item):
+    token = expr.peek()
+    if token.upper() == "NOT":
+        expr.take()
+        return not _predicate(expr, item)
+    if token == "(":
+        expr.take()
+        result = _condition(expr, item)
+        expr.take(")")
+        return result
+    if token in ("attribute_exists", "attribute_not_exists", "begins_with", "contains") and expr.peek(1) == "(":
+        expr.take()
+        expr.take("(")
+        name = expr.name(expr.take())
+        argument = None
+        if expr.peek() == ",":
+            expr.take()
+            argument = _operand(expr, item)
+        expr.take(")")
+        value = item.get(name)
+        if token == "attribute_exists":
+            return name in item
+        if token == "attribute_not_exists":
+            return name not in item
+        if token == "begins_with":
+            return isinstance(value, str) and value.startswith(argument)
+        return value is not None and argument in value
+    left = _operand(expr, item)
+    operator = expr.take()
+    if operator.upper() == "BETWEEN":
+        low = _operand(expr, item)
+        expr.take("AND")
+        high = _operand(expr, item)
+        return left is not None and low <= left <= high
+    return _compare(left, operator, _operand(expr, item))
+
+
+def evaluate(expression, item, names=None, values=None):
+    expr = _Expression(expression, names, values)
+    result = _condition(expr, item)
+    if expr.peek() is not None:
+        raise ValueError(f"Unexpected {expr.peek()!r} in {expression!r}")
+    return result
+
+
+def apply_update(expression, item, names=None, values=None):
+    expr = _Expression(expression, names, values)
+    updated = dict(item)
+    while expr.peek() is not None:
+        clause = expr.take().upper()
+        while True:
+            name = expr.name(expr.take())
+            if clause == "SET":
+                expr.take("=")
+                updated[name] = _operand(expr, item)
+            elif clause == "ADD":
+                value = _operand(expr, item)
+                if isinstance(value, (set, frozenset)):
+                    updated[name] = set(item.get(name, set())) | value
+                else:
+                    updated[name] = item.get(name, 0) + value
+            elif clause == "REMOVE":
+                updated.pop(name, None)
+            elif clause == "DELETE":
+                remaining = set(item.get(name, set())) - _operand(expr, item)
+                if remaining:
+                    updated[name] = remaining
+                else:
+                    updated.pop(name, None)
+            else:
+                raise ValueError(f"Unknown update clause {clause!r}")
+            if expr.peek() != ",":
+                break
+            expr.take()
+    return updated
+
+
+def _numbers(value):
+    # DynamoDB hands numbers back as Decimal
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {key: _numbers(inner) for key, inner in value.items()}
+    if isinstance(value, list):
+        return [_numbers(inner) for inner in value]
+    if isinstance(value, (set, frozenset)):
+        return {_numbers(inner) for inner in value}
+    return value
+
+
+class StubClient:
+    """The parts of ``table.meta.client`` the service code reaches for."""
+    
+    exceptions = SimpleNamespace(ConditionalCheckFailedException=ConditionalCheckFailedException,
+                                 TransactionCanceledException=TransactionCanceledException)
+    
+    def __init__(self):
+        self.tables = {}
+        self.calls = []
+    
+    def transact_write_items(self, TransactItems):
+        self.calls.append(("transact_write_items", TransactItems))
+        staged, reasons = [], []
+        for entry in TransactItems:
+            (action, request), = entry.items()
+            table = self.tables[request["TableName"]]
+            key = table.key_of(request.get("Key") or request["Item"])
+            current = table.items.get(key, {})
+            if "ConditionExpression" in request and not evaluate(
+                    request["ConditionExpression"], current, request.get("ExpressionAttributeNames"),
+                    _numbers(request.get("ExpressionAttributeValues"))):
+                reasons.append({"Code": "ConditionalCheckFailed"})
+                continue
+            reasons.append({"Code": "None"})
+            if action == "Put":
+                staged.append((table, key, _numbers(request["Item"])))
+            elif action == "Update":
+                staged.append((table, key, apply_update(
+                    request["UpdateExpression"], dict(current, **request["Key"]),
+                    request.get("ExpressionAttributeNames"), _numbers(request.get("ExpressionAttributeValues")))))
+            elif action == "Delete":
+                staged.append((table, key, None))
+        if any(reason["Code"] != "None" for reason in reasons):
+            raise TransactionCanceledException(reasons)
+        for table, key, item in staged:
+            if item is None:
+                table.items.pop(key, None)
+            else:
+                table.items[key] = item
+        return {}
+    
+    def batch_write_item(self, RequestItems):
+        self.calls.append(("batch_write_item", RequestItems))
+        for table_name, requests in RequestItems.items():
+            table = self.tables[table_name]
+            for request in requests:
+                if "PutRequest" in request:
+                    table.put(request["PutRequest"]["Item"])
+                else:
+                    table.items.pop(table.key_of(request["DeleteRequest"]["Key"]), None)
+        return {"UnprocessedItems": {}}
+    
+    def batch_get_item(self, RequestItems):
+        self.calls.append(("batch_get_item", RequestItems))
+        responses = {}
+        for table_name, request in RequestItems.items():
+            table = self.tables[table_name]
+            responses[table_name] = [dict(table.items[table.key_of(key)]) for key in request["Keys"]
+                                     if table.key_of(key) in table.items]
+        return {"Responses": responses, "UnprocessedKeys": {}}
+
+
+class StubTable:
+    def __init__(self, name, hash_key, range_key=None, indexes=None, client=None):
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        # index name -> (hash key, range key)
+        self.indexes = indexes or {}
+        self.items = {}
+        self.calls = []
+        self.meta = SimpleNamespace(client=client or StubClient())
+        self.meta.client.tables[name] = self
+    
+    def key_of(self, item, keys=None):
+        hash_key, range_key = keys or (self.hash_key, self.range_key)
+        return (item[hash_key], item[range_key]) if range_key else (item[hash_key],)
+    
+    def put(self, *items):
+        for item in items:
+            self.items[self.key_of(item)] = _numbers(dict(item))
+    
+    def get(self, **key):
+        return self.items.get(self.key_of(key))
+    
+    def _check(self, kwargs, current, operation):
+        condition = kwargs.get("ConditionExpression")
+        if condition is None:
+            return
+        names, values = kwargs.get("ExpressionAttributeNames"), _numbers(kwargs.get("ExpressionAttributeValues"))
+        if isinstance(condition, ConditionBase):
+            built = ConditionExpressionBuilder().build_expression(condition)
+            condition = built.condition_expression
+            names = dict(names or {}, **built.attribute_name_placeholders)
+            values = dict(values or {}, **_numbers(built.attribute_value_placeholders))
+        if not evaluate(condition, current, names, values):
+            raise ConditionalCheckFailedException(operation)
+    
+    def get_item(self, Key, **kwargs):
+        self.calls.append(("get_item", dict(Key=Key, **kwargs)))
+        item = self.items.get(self.key_of(Key))
+        return {"Item": dict(item)} if item is not None else {}
+    
+    def put_item(self, Item, **kwargs):
+        self.calls.append(("put_item", dict(Item=Item, **kwargs)))
+        key = self.key_of(Item)
+        self._check(kwargs, self.items.get(key, {}), "PutItem")
+        self.items[key] = _numbers(dict(Item))
+        return {}
+    
+    def update_item(self, Key, **kwargs):
+        self.calls.append(("update_item", dict(Key=Key, **kwargs)))
+        key = self.key_of(Key)
+        current = self.items.get(key, {})
+        self._check(kwargs, current, "UpdateItem")
+        updated = apply_update(kwargs["UpdateExpression"], dict(current, **Key),
+                               kwargs.get("ExpressionAttributeNames"), _numbers(kwargs.get("ExpressionAttributeValues")))
+        self.items[key] = updated
+        if kwargs.get("ReturnValues") == "ALL_NEW":
+            return {"Attributes": dict(updated)}
+        if kwargs.get("ReturnValues") == "ALL_OLD":
+            return {"Attributes": dict(current)} if current else {}
+        return {}
+    
+    def delete_item(self, Key, **kwargs):
+        self.calls.append(("delete_item", dict(Key=Key, **kwargs)))
+        key = self.key_of(Key)
+        current = self.items.get(key, {})
+        self._check(kwargs, current, "DeleteItem")
+        self.items.pop(key, None)
+        return {"Attributes": dict(current)} if kwargs.get("ReturnValues") == "ALL_OLD" and current else {}
+    
+    def query(self, **kwargs):
+        self.calls.append(("query", kwargs))
+        keys = self.indexes[kwargs["IndexName"]] if "IndexName" in kwargs else (self.hash_key, self.range_key)
+        names, values = kwargs.get("ExpressionAttributeNames"), _numbers(kwargs.get("ExpressionAttributeValues"))
+        builder = ConditionExpressionBuilder()
+        key_condition = kwargs["KeyConditionExpression"]
+        if isinstance(key_condition, ConditionBase):
+            built = builder.build_expression(key_condition, is_key_condition=True)
+            key_condition = built.condition_expression
+            names = dict(names or {}, **built.attribute_name_placeholders)
+            values = dict(values or {}, **_numbers(built.attribute_value_placeholders))
+        filter_expression = kwargs.get("FilterExpression")
+        if isinstance(filter_expression, ConditionBase):
+            built = builder.build_expression(filter_expression)
+            filter_expression = built.condition_expression
+            names = dict(names or {}, **built.attribute_name_placeholders)
+            values = dict(values or {}, **_numbers(built.attribute_value_placeholders))
+        
+        matches = [item for item in self.items.values()
+                   if all(key in item for key in keys if key) and evaluate(key_condition, item, names, values)]
+        matches.sort(key=lambda item: tuple(item[key] for key in keys if key),
+                     reverse=not kwargs.get("ScanIndexForward", True))
+        start = kwargs.get("ExclusiveStartKey")
+        if start is not None:
+            position = next(i for i, item in enumerate(matches) if self.key_of(item) == self.key_of(start))
+            matches = matches[position + 1:]
+        limit = kwargs.get("Limit")
+        page = matches[:limit] if limit else matches
+        response = {"Items": [dict(item) for item in page
+                              if filter_expression is None or evaluate(filter_expression, item, names, values)]}
+        if limit and len(matches) > limit:
+            last = page[-1]
+            response["LastEvaluatedKey"] = {key: last[key] for key in set(keys) | {self.hash_key, self.range_key} if key}
+        return response
+
+
+class StubRawClient:
+    """``db.raw_client()``: the same tables, in DynamoDB's wire format."""
+    
+    def __init__(self, client):
+        self.client = client
+        self._serialize = TypeSerializer().serialize
+        self._deserialize = TypeDeserializer().deserialize
+    
+    def _wire(self, item):
+        return {name: self._serialize(value) for name, value in item.items()}
+    
+    def _plain(self, item):
+        return {name: self._deserialize(value) for name, value in item.items()}
+    
+    def query(self, TableName, **params):
+        params["ExpressionAttributeValues"] = self._plain(params.get("ExpressionAttributeValues", {}))
+        if "ExclusiveStartKey" in params:
+            params["ExclusiveStartKey"] = self._plain(params["ExclusiveStartKey"])
+        table = self.client.tables[TableName]
+        response = table.query(**params)
+        result = {"Items": [self._wire(item) for item in response["Items"]]}
+        if "LastEvaluatedKey" in response:
+            result["LastEvaluatedKey"] = self._wire(response["LastEvaluatedKey"])
+        return result
@@ -0,0 +1,112 @@
+import pytest
+
+import cache
+from cache import StampedCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def stamps():
+    return {}
+
+
+def make_cache(stamps, max_entries=10, ttl_seconds=60, stamp_refresh_seconds=0):
+    return StampedCache("Test", lambda tenant_id: stamps.get(tenant_id, 0), max_entries, ttl_seconds,
+                        stamp_refresh_seconds)
+
+
+def loader(value, calls):
+    def load():
+        calls.append(value)
+        return value
+    return load
+
+
+def test_hit_skips_the_loader(clock, stamps):
+    store, calls = make_cache(stamps), []
+    assert store.get("t1", "k", loader("a", calls)) == "a"
+    assert store.get("t1", "k", loader("b", calls)) == "a"
+    assert calls == ["a"]
+
+
+def test_entries_are_per_tenant(clock, stamps):
+    store, calls = make_cache(stamps), []
+    store.get("t1", "k", loader("a", calls))
+    assert store.get("t2", "k", loader("b", calls)) == "b"
+
+
+def test_stamp_change_evicts(clock, stamps):
+    store, calls = make_cache(stamps), []
+    store.get("t1", "k", loader("a", calls))
+    stamps["t1"] = 1
+    assert store.get("t1", "k", loader("b", calls)) == "b"
+    assert store.get("t1", "k", loader("c", calls)) == "b"
+
+
+def test_stamp_is_reread_only_after_refresh(clock, stamps):
+    store, calls = make_cache(stamps, stamp_refresh_seconds=5), []
+    store.get("t1", "k", loader("a", calls))
+    stamps["t1"] = 1
+    assert store.get("t1", "k", loader("b", calls)) == "a"
+    clock.now += 5
+    assert store.get("t1", "k", loader("b", calls)) == "b"
+
+
+def test_invalidate_bumps_the_generation(clock, stamps):
+    store, calls = make_cache(stamps, stamp_refresh_seconds=5), []
+    store.get("t1", "k", loader("a", calls))
+    store.get("t2", "k", loader("x", calls))
+    store.invalidate("t1")
+    assert store.get("t1", "k", loader("b", calls)) == "b"
+    assert store.get("t2", "k", loader("y", calls)) == "x"
+
+
+def test_invalidate_during_a_load_is_not_cached(clock, stamps):
+    store, calls = make_cache(stamps), []
+
+    def racing_load():
+        store.invalidate("t1")
+        return "stale"
+
+    assert store.get("t1", "k", racing_load) == "stale"
+    assert store.get("t1", "k", loader("fresh", calls)) == "fresh"
+
+
+def test_entries_expire_after_ttl(clock, stamps):
+    store, calls = make_cache(stamps, ttl_seconds=60), []
+    store.get("t1", "k", loader("a", calls))
+    clock.now += 59
+    assert store.get("t1", "k", loader("b", calls)) == "a"
+    clock.now += 1
+    assert store.get("t1", "k", loader("b", calls)) == "b"
+
+
+def test_least_recently_used_entry_is_dropped(clock, stamps):
+    store, calls = make_cache(stamps, max_entries=2), []
+    store.get("t1", "a", loader("a", calls))
+    store.get("t1", "b", loader("b", calls))
+    store.get("t1", "a", loader("a2", calls))
+    store.get("t1", "c", loader("c", calls))
+    assert store.get("t1", "a", loader("a3", calls)) == "a"
+    assert store.get("t1", "b", loader("b2", calls)) == "b2"
+
+
+def test_clear_drops_everything(clock, stamps):
+    store, calls = make_cache(stamps), []
+    store.get("t1", "k", loader("a", calls))
+    store.clear()
+    assert store.get("t1", "k", loader("b", calls)) == "b"
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+import feedback
+from feedback import (HOURLY_RETENTION, OTHER_EMOJI, bucket_id, bucket_start, counts, feedback_partition,
+                      is_emoji, record_feedback)
+from handlers.sessions import SessionsHandler
+
+NOW = 1640995200 + 5400
+
+
+@pytest.fixture
+def sessions(tables, monkeypatch):
+    monkeypatch.setattr(feedback.time, "time", lambda: NOW)
+    table = tables["SESSIONS_TABLE"]
+    table.put({"tenant_id": "t1", "session_id": "s1"})
+    return table
+
+
+@pytest.mark.parametrize("text", [
+    "👍", "❤️", "👍🏽", "👨‍👩‍👧‍👦", "🇫🇷", "1️⃣", "#⃣", "🏴\U000e0067\U000e0062\U000e0073\U000e0063\U000e0074\U000e007f"
+])
+def test_single_emoji_are_accepted(text):
+    assert is_emoji(text)
+
+
+@pytest.mark.parametrize("text", [
+    "", "abc", "a", "👍👍", "👍 ", "‍👍", "👍‍", "️", "🏽", "🇫", "🇫🇷🇩🇪", "1", "1⃣x",
+    "👍" * 17, None, 128077, ["👍"]
+])
+def test_everything_else_is_rejected(text):
+    assert not is_emoji(text)
+
+
+def test_bucket_ids_sort_by_time():
+    assert bucket_start("hour", NOW) == 1640998800 and bucket_start("day", NOW) == 1640995200
+    assert bucket_id("hour", 999) < bucket_id("hour", 1000) < bucket_id("hour", 10 ** 10)
+
+
+def _rollup(table, period):
+    return table.get(tenant_id=feedback_partition("t1"), session_id=bucket_id(period, bucket_start(period, NOW)))
+
+
+def test_reaction_counts_on_the_session_and_both_rollups(sessions):
+    assert record_feedback(sessions, "t1", "s1", "👍")
+    assert record_feedback(sessions, "t1", "s1", "👍")
+    assert record_feedback(sessions, "t1", "s1", "🎉")
+    session = sessions.get(tenant_id="t1", session_id="s1")
+    assert counts(session) == {"👍": 2, "🎉": 1}
+    assert session["feedback_count"] == 3 and session["emoji_kinds"] == 2 and session["emoji_feedback"] == "🎉"
+    for period in ("hour", "day"):
+        assert counts(_rollup(sessions, period)) == {"👍": 2, "🎉": 1} and _rollup(sessions, period)["total"] == 3
+    assert _rollup(sessions, "hour")["ttl"] == bucket_start("hour", NOW) + HOURLY_RETENTION
+    assert "ttl" not in _rollup(sessions, "day")
+
+
+def test_missing_session_counts_nothing(sessions):
+    assert not record_feedback(sessions, "t1", "missing", "👍")
+    assert set(sessions.items) == {("t1", "s1")}
+
+
+def test_emoji_past_the_cap_count_as_other(sessions, monkeypatch):
+    monkeypatch.setattr(feedback, "MAX_EMOJI_KINDS", 3)
+    for emoji in ("😀", "😂", "😍", "😎", "🤔", "😀"):
+        assert record_feedback(sessions, "t1", "s1", emoji)
+    session = sessions.get(tenant_id="t1", session_id="s1")
+    # Known counters keep counting after the cap; only new kinds fold into other
+    assert counts(session) == {"😀": 2, "😂": 1, "😍": 1, OTHER_EMOJI: 2}
+    assert session["emoji_kinds"] == 3 and session["feedback_count"] == 6
+    assert counts(_rollup(sessions, "day")) == counts(session)
+
+
+def _event(body):
+    return {"body": json.dumps(body)}
+
+
+@pytest.mark.parametrize("body", [{}, {"emoji": "ok"}, {"emoji": "👍👎"}])
+def test_handler_rejects_anything_but_one_emoji(sessions, body):
+    assert SessionsHandler()._add_emoji_feedback(_event(body), "s1", "t1")["statusCode"] == 400
+
+
+def test_handler_reports_a_missing_session(sessions):
+    assert SessionsHandler()._add_emoji_feedback(_event({"emoji": "👍"}), "missing", "t1")["statusCode"] == 404
+
+
+def test_handler_summaries_read_the_rollups(sessions):
+    handler = SessionsHandler()
+    for emoji in ("👍", "👍", "🎉"):
+        assert handler._add_emoji_feedback(_event({"emoji": emoji}), "s1", "t1")["statusCode"] == 200
+    
+    session = json.loads(handler._get_session_feedback({}, "s1", "t1")["body"])
+    assert session["total"] == 3 and session["counts"] == {"👍": 2, "🎉": 1} and session["last_emoji"] == "🎉"
+    
+    summary = json.loads(handler._get_daily_feedback({"queryStringParameters": {"from": "1640908800", "to": str(NOW)}},
+                                                     "t1")["body"])
+    assert summary["total"] == 3 and summary["counts"] == {"👍": 2, "🎉": 1} and len(summary["buckets"]) == 1
@@ -0,0 +1,102 @@
+from decimal import Decimal
+
+import pytest
+
+import pagination
+from pagination import InvalidPageRequest, decode_token, encode_token, page_params, query_page
+
+
+class StubTable:
+    """Serves ``items`` in pages of ``Limit``, keyed by position like a sort key."""
+    
+    def __init__(self, items):
+        self.items = items
+        self.queries = []
+    
+    def query(self, **kwargs):
+        self.queries.append(kwargs)
+        start = kwargs.get("ExclusiveStartKey", {}).get("position", -1) + 1
+        page = self.items[start:start + kwargs["Limit"]]
+        response = {"Items": page}
+        if start + len(page) < len(self.items):
+            response["LastEvaluatedKey"] = {"tenant_id": "t1", "position": Decimal(start + len(page) - 1)}
+        return response
+
+
+def _event(**params):
+    return {"queryStringParameters": params or None}
+
+
+def test_token_round_trip():
+    key = {"tenant_id": "t1", "setting_id": "s1", "updated_at": Decimal(1640995200)}
+    token = encode_token(key, "settings:t1")
+    assert decode_token(token, "settings:t1") == {"tenant_id": "t1", "setting_id": "s1", "updated_at": 1640995200}
+
+
+def test_tampered_payload_is_rejected():
+    token = encode_token({"tenant_id": "t1", "setting_id": "s1"}, "settings:t1")
+    forged = pagination._b64encode(b'{"setting_id":"s1","tenant_id":"t2"}')
+    with pytest.raises(InvalidPageRequest):
+        decode_token(f"{forged}.{token.split('.', 1)[1]}", "settings:t1")
+
+
+def test_token_of_another_route_or_tenant_is_rejected():
+    token = encode_token({"tenant_id": "t1", "setting_id": "s1"}, "settings:t1")
+    with pytest.raises(InvalidPageRequest):
+        decode_token(token, "bookmarks:t1")
+    with pytest.raises(InvalidPageRequest):
+        decode_token(token, "settings:t2")
+
+
+@pytest.mark.parametrize("token", ["", "no-dot", "a.b.c", "!!!.???"])
+def test_malformed_token_is_rejected(token):
+    with pytest.raises(InvalidPageRequest):
+        decode_token(token, "settings:t1")
+
+
+def test_token_from_another_key_is_rejected(monkeypatch):
+    token = encode_token({"tenant_id": "t1"}, "settings:t1")
+    monkeypatch.setattr(pagination, "_token_secret", b"another-key")
+    with pytest.raises(InvalidPageRequest):
+        decode_token(token, "settings:t1")
+
+
+def test_missing_secret_fails_fast(monkeypatch):
+    monkeypatch.setattr(pagination, "_token_secret", None)
+    monkeypatch.delenv("PAGE_TOKEN_SECRET_ARN", raising=False)
+    with pytest.raises(RuntimeError):
+        encode_token({"tenant_id": "t1"}, "settings:t1")
+
+
+def test_page_params_defaults_and_caps():
+    assert page_params(_event()) == (pagination.DEFAULT_PAGE_SIZE, None)
+    assert page_params(_event(limit="10", next_token="abc")) == (10, "abc")
+    assert page_params(_event(limit=str(pagination.MAX_PAGE_SIZE + 1)))[0] == pagination.MAX_PAGE_SIZE
+
+
+@pytest.mark.parametrize("limit", ["x", "1.5", "0", "-3"])
+def test_page_params_rejects_bad_limits(limit):
+    with pytest.raises(InvalidPageRequest):
+        page_params(_event(limit=limit))
+
+
+def test_query_page_walks_all_pages():
+    table = StubTable([{"n": n} for n in range(5)])
+    seen, token = [], None
+    while True:
+        params = {"limit": "2"}
+        if token:
+            params["next_token"] = token
+        items, token = query_page(table, _event(**params), "list:t1", KeyConditionExpression="k")
+        seen.extend(item["n"] for item in items)
+        if token is None:
+            break
+    assert seen == [0, 1, 2, 3, 4]
+    assert all(query["KeyConditionExpression"] == "k" for query in table.queries)
+
+
+def test_query_page_rejects_token_of_another_scope():
+    table = StubTable([{"n": n} for n in range(5)])
+    _, token = query_page(table, _event(limit="2"), "list:t1")
+    with pytest.raises(InvalidPageRequest):
+        query_page(table, _event(limit="2", next_token=token), "list:t2")
@@ -0,0 +1,80 @@
+import pytest
+
+from routing import Router
+
+
+def _router():
+    return Router([
+        ("GET", "/settings", "list"),
+        ("GET", "/settings/public", "public"),
+        ("GET", "/settings/{setting_id}", "get"),
+        ("PUT", "/settings/{setting_id}", "update"),
+        ("GET", "/settings/{setting_id}/history", "history"),
+        ("GET", "/groups/{group_id}/members", "members"),
+        ("PUT", "/groups/{group_id}/members/{user_id}", "set_role"),
+        ("GET", "/groups/{group_id}/settings", "group_settings"),
+    ])
+
+
+def test_static_route_wins_over_parameter():
+    assert _router().match("GET", "/settings/public") == ("public", {})
+
+
+def test_parameter_route_captures_value():
+    assert _router().match("GET", "/settings/abc") == ("get", {"setting_id": "abc"})
+    assert _router().match("GET", "/settings/abc/history") == ("history", {"setting_id": "abc"})
+
+
+def test_static_segment_below_parameter_falls_back():
+    # "public" takes the static branch, which has no /history route; the parameter branch does
+    assert _router().match("GET", "/settings/public/history") == ("history", {"setting_id": "public"})
+
+
+def test_several_parameters():
+    assert _router().match("PUT", "/groups/g1/members/u1") == ("set_role", {"group_id": "g1", "user_id": "u1"})
+
+
+def test_trailing_slash_is_ignored():
+    assert _router().match("GET", "/settings/") == ("list", {})
+    assert _router().match("GET", "/settings/abc/") == ("get", {"setting_id": "abc"})
+
+
+@pytest.mark.parametrize("method, path", [
+    ("DELETE", "/settings/abc"),
+    ("GET", "/settings/abc/unknown"),
+    ("GET", "/groups/g1"),
+    ("GET", "/settings//history"),
+])
+def test_no_match(method, path):
+    assert _router().match(method, path) is None
+
+
+def test_duplicate_routes_are_rejected():
+    with pytest.raises(ValueError):
+        Router([("GET", "/settings", "a"), ("GET", "/settings", "b")])
+    with pytest.raises(ValueError):
+        Router([("GET", "/settings/{id}", "a"), ("GET", "/settings/{id}", "b")])
+
+
+def test_conflicting_parameter_names_are_rejected():
+    with pytest.raises(ValueError):
+        Router([("GET", "/settings/{id}", "a"), ("PUT", "/settings/{setting_id}", "b")])
+
+
+def test_api_routes_compile_and_resolve():
+    # main.py builds one table from every handler's ROUTES; each must name a method
+    from handlers.auth import AuthHandler
+    from handlers.bookmarks import BookmarksHandler
+    from handlers.exports import ExportsHandler
+    from handlers.groups import GroupsHandler
+    from handlers.sessions import SessionsHandler
+    from handlers.settings import SettingsHandler
+    from handlers.sync import SyncHandler
+    
+    handlers = (AuthHandler, SettingsHandler, BookmarksHandler, GroupsHandler, SessionsHandler, SyncHandler, ExportsHandler)
+    routes = [(method, pattern, (handler, name)) for handler in handlers for method, pattern, name in handler.ROUTES]
+    router = Router(routes)
+    for method, pattern, (handler, name) in routes:
+        assert callable(getattr(handler, name))
+        path = "/".join("x" if segment.startswith("{") else segment for segment in pattern.split("/"))
+        assert router.match(method, path)[0] == (handler, name)
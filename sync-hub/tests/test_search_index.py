@@ -0,0 +1,98 @@
+import pytest
+
+import search_index
+from changes import tombstone
+from search_index import _TenantIndex, query_terms, search, search_doc, search_partition
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes():
+    search_index.clear()
+    yield
+    search_index.clear()
+
+
+def _index(*docs):
+    index = _TenantIndex("t1")
+    for bookmark_id, title, url in docs:
+        index.upsert(bookmark_id, title, url)
+    return index
+
+
+def test_query_terms_are_casefolded_and_distinct():
+    assert query_terms("Python  PYTHON tips!") == ["python", "tips"]
+    assert query_terms("ﬁle") == ["file"]
+
+
+@pytest.mark.parametrize("query", ["", "?!", " ".join(str(i) for i in range(9)), "x" * 201])
+def test_unusable_queries_are_rejected(query):
+    with pytest.raises(ValueError):
+        query_terms(query)
+
+
+def test_whole_word_beats_prefix_beats_substring():
+    index = _index(("whole", "the cat", ""), ("inside", "bobcat", ""), ("prefix", "catalog", ""))
+    assert index.search(["cat"], 10) == (["whole", "prefix", "inside"], 3)
+
+
+def test_title_hits_rank_above_url_only_hits():
+    index = _index(("title", "python", "https://a.example"), ("url", "notes", "https://python.org"))
+    assert index.search(["python"], 10) == (["title", "url"], 2)
+
+
+def test_ties_go_to_the_most_recently_indexed():
+    index = _index(("old", "python", ""), ("new", "python", ""), ("url-old", "", "python.org"), ("url-new", "", "python.org"))
+    assert index.search(["python"], 10) == (["new", "old", "url-new", "url-old"], 4)
+
+
+def test_scores_add_up_across_terms():
+    index = _index(("one", "python web", ""), ("both", "python tips", ""), ("none", "tips", "python.org"))
+    assert index.search(["python", "tips"], 10) == (["both", "none"], 2)
+
+
+def test_every_term_must_match():
+    index = _index(("a", "python tips", ""), ("b", "python", ""))
+    assert index.search(["python", "rust"], 10) == ([], 0)
+
+
+def test_limit_keeps_the_full_match_count():
+    index = _index(*((f"b{i}", "python", "") for i in range(5)))
+    assert index.search(["python"], 2) == (["b4", "b3"], 5)
+
+
+def test_short_terms_match_word_prefixes_only():
+    index = _index(("start", "go lang", ""), ("middle", "ago", ""))
+    assert index.search(["go"], 10) == (["start"], 1)
+
+
+def test_replaced_and_removed_documents_drop_out():
+    index = _index(("a", "python", ""), ("b", "python", ""))
+    index.upsert("a", "rust", "")
+    index.remove("b")
+    assert index.search(["python"], 10) == ([], 0)
+    assert index.search(["rust"], 10) == (["a"], 1)
+
+
+def test_compaction_keeps_results(monkeypatch):
+    monkeypatch.setattr(search_index, "COMPACT_MIN_DEAD", 2)
+    index = _index(("a", "python", ""), ("b", "python", ""), ("c", "python", ""))
+    index.remove("a")
+    index.remove("b")
+    index.compact()
+    assert index.dead == set() and len(index.docs) == 1
+    assert index.search(["python"], 10) == (["c"], 1)
+
+
+def _doc(bookmark_id, title, url=""):
+    return search_doc({"tenant_id": "t1", "bookmark_id": bookmark_id, "title": title, "url": url})
+
+
+def test_search_loads_and_follows_the_tenant_partition(tables, monkeypatch):
+    bookmarks = tables["BOOKMARKS_TABLE"]
+    bookmarks.put(_doc("b1", "Python Tips"), _doc("b2", "Rust"))
+    bookmarks.put(search_doc({"tenant_id": "t2", "bookmark_id": "b9", "title": "Python"}))
+    assert search("t1", ["python"], 10) == (["b1"], 1)
+    
+    monkeypatch.setattr(search_index, "SEARCH_REFRESH_SECONDS", 0)
+    bookmarks.put(_doc("b3", "python"), tombstone({"tenant_id": search_partition("t1"), "bookmark_id": "b1"}))
+    assert search("t1", ["python"], 10) == (["b3"], 1)
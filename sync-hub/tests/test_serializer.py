@@ -0,0 +1,37 @@
+import json
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import Binary
+
+import serializer
+
+
+def test_integral_decimals_become_ints():
+    assert serializer.dumps({"version": Decimal("3"), "updated_at": Decimal("1640995200")}) == \
+        '{"version":3,"updated_at":1640995200}'
+
+
+def test_fractional_decimals_become_floats():
+    assert json.loads(serializer.dumps({"value": Decimal("1.5")})) == {"value": 1.5}
+    assert json.loads(serializer.dumps({"value": Decimal("-0.25")})) == {"value": -0.25}
+
+
+def test_sets_become_lists():
+    assert sorted(json.loads(serializer.dumps({"tags": {"a", "b"}}))["tags"]) == ["a", "b"]
+    assert json.loads(serializer.dumps({"numbers": frozenset({Decimal(2)})})) == {"numbers": [2]}
+
+
+def test_binary_becomes_base64():
+    assert serializer.dumps({"blob": Binary(b"\x00\xff")}) == '{"blob":"AP8="}'
+    assert serializer.dumps({"blob": b"hi"}) == '{"blob":"aGk="}'
+
+
+def test_output_is_compact_ascii():
+    assert serializer.dumps({"a": [1, 2], "emoji": "👍"}) == '{"a":[1,2],"emoji":"\\ud83d\\udc4d"}'
+    assert serializer.dumpb({"emoji": "👍"}) == serializer.dumps({"emoji": "👍"}).encode("ascii")
+
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(TypeError):
+        serializer.dumps({"when": object()})
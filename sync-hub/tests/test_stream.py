@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+
+import pytest
+
+import stream
+from history import history_key
+from stamps import add_counts, counters_key, read_counters, stamp_key
+
+
+@pytest.fixture
+def settings(tables):
+    return tables["SETTINGS_TABLE"]
+
+
+def _setting(version, **fields):
+    return dict({"tenant_id": "t1", "setting_id": "s1", "name": "theme", "value": "dark",
+                 "version": version, "updated_at": 1000 + version}, **fields)
+
+
+def _record(event_id, old_image=None, new_image=None, tenant_id="t1"):
+    return SimpleNamespace(event_id=event_id, dynamodb=SimpleNamespace(
+        keys={"tenant_id": tenant_id, "setting_id": "s1"}, old_image=old_image, new_image=new_image))
+
+
+def _history_versions(table):
+    return sorted(int(item["version"]) for key, item in table.items.items()
+                  if key == ("t1#history", history_key("t1", "s1", item["version"])["setting_id"]))
+
+
+def test_version_bump_files_the_replaced_version(settings):
+    stream._record_history(settings, _setting(3), _setting(4, value="light"))
+    item = settings.get(**history_key("t1", "s1", 3))
+    assert item["value"] == "dark" and item["version"] == 3
+
+
+@pytest.mark.parametrize("old_image, new_image", [
+    (_setting(3), _setting(3, name="renamed")),
+    (_setting(3, deleted=True), _setting(4)),
+    (_setting(3), _setting(4, deleted=True)),
+    (None, _setting(1))
+])
+def test_history_needs_a_version_bump_between_live_images(settings, old_image, new_image):
+    stream._record_history(settings, old_image, new_image)
+    assert _history_versions(settings) == []
+
+
+def test_history_never_reaches_the_public_feed(settings):
+    stream._record_history(settings, _setting(3, public_feed="public"), _setting(4, public_feed="public"))
+    assert "public_feed" not in settings.get(**history_key("t1", "s1", 3))
+
+
+def test_retention_cutoff_drops_every_version_at_or_below_it(settings):
+    settings.put(*(dict(_setting(version), **history_key("t1", "s1", version)) for version in range(1, 8)))
+    # Retention lowered to 3: versions 8, 7 and 6 stay, the older ones all go at once
+    stream._record_history(settings, _setting(8), _setting(9, history_retention=3))
+    assert _history_versions(settings) == [6, 7, 8]
+
+
+def test_retention_cutoff_spares_settings_whose_id_extends_this_one(settings):
+    # History keys of "s1#v0000000000" sort inside the range of s1's old versions
+    look_alike = "s1#v0000000000"
+    settings.put(*(dict(_setting(version, setting_id=look_alike), **history_key("t1", look_alike, version))
+                   for version in range(1, 4)))
+    settings.put(dict(_setting(1), **history_key("t1", "s1", 1)))
+    stream._record_history(settings, _setting(3), _setting(4, history_retention=1))
+    assert _history_versions(settings) == [3]
+    assert len([key for key in settings.items if key[1].startswith(look_alike + "#v")]) == 3
+
+
+def test_unprocessed_history_deletes_fail_the_record(settings, monkeypatch):
+    settings.put(dict(_setting(1), **history_key("t1", "s1", 1)))
+    monkeypatch.setattr(stream, "batch_write", lambda table_name, requests: requests)
+    with pytest.raises(RuntimeError):
+        stream._record_history(settings, _setting(2), _setting(3, history_retention=1))
+
+
+def test_public_setting_joins_the_feed(settings):
+    settings.put(_setting(1, is_public=True))
+    stream._sync_public_feed(settings, _setting(1, is_public=True))
+    assert settings.get(tenant_id="t1", setting_id="s1")["public_feed"] == "public"
+
+
+def test_private_setting_leaves_the_feed(settings):
+    settings.put(_setting(2, is_public=False, public_feed="public"))
+    stream._sync_public_feed(settings, _setting(2, is_public=False, public_feed="public"))
+    assert "public_feed" not in settings.get(tenant_id="t1", setting_id="s1")
+
+
+@pytest.mark.parametrize("current", [_setting(2, is_public=False), _setting(2, is_public=True, deleted=True)])
+def test_stale_public_record_does_not_republish(settings, current):
+    # The record says public, but the item has since been made private or deleted
+    settings.put(current)
+    stream._sync_public_feed(settings, _setting(1, is_public=True))
+    assert "public_feed" not in settings.get(tenant_id="t1", setting_id="s1")
+
+
+def test_stale_private_record_does_not_unpublish(settings):
+    settings.put(_setting(2, is_public=True, public_feed="public"))
+    stream._sync_public_feed(settings, _setting(1, is_public=False, public_feed="public"))
+    assert settings.get(tenant_id="t1", setting_id="s1")["public_feed"] == "public"
+
+
+def test_counters_apply_once_per_record(settings):
+    assert add_counts(settings, "t1", "event-1", {"settings": 1, "public_settings": 1})
+    assert not add_counts(settings, "t1", "event-1", {"settings": 1, "public_settings": 1})
+    assert add_counts(settings, "t1", "event-2", {"settings": -1})
+    assert read_counters(settings, "t1") == {"settings": 0, "public_settings": 1}
+
+
+def test_redelivered_batch_counts_and_stamps_consistently(settings):
+    records = [_record("event-1", None, _setting(1, is_public=True)),
+               _record("event-2", _setting(1, is_public=True), _setting(2, is_public=False))]
+    for record in records + records:
+        stream.record_handler(record)
+    assert read_counters(settings, "t1") == {"settings": 1, "public_settings": 0}
+    assert settings.get(**counters_key("t1"))["settings"] == 1
+    # The stamp is bumped on every delivery; it only needs to move, not to count
+    assert settings.get(**stamp_key("t1"))["stamp"] == 4
+
+
+def test_meta_and_history_records_are_ignored(settings):
+    stream.record_handler(_record("event-1", None, _setting(1), tenant_id="t1#history"))
+    stream.record_handler(_record("event-2", None, _setting(1), tenant_id="t1#meta"))
+    assert settings.items == {}
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from handlers.bookmarks import BookmarksHandler
+from tag_index import index_writes, match_tags, normalize_tags, tag_partition
+
+
+@pytest.fixture
+def bookmarks(tables):
+    return tables["BOOKMARKS_TABLE"]
+
+
+def _tag(table, tag, *bookmark_ids):
+    table.put(*({"tenant_id": tag_partition("t1", tag), "bookmark_id": bookmark_id} for bookmark_id in bookmark_ids))
+
+
+def _reads(table):
+    return [call for call in table.calls if call[0] == "query"]
+
+
+def test_normalize_tags_drops_duplicates_in_order():
+    assert normalize_tags(["b", "a", "b"]) == ["b", "a"]
+
+
+@pytest.mark.parametrize("value", ["a,b", [""], [1], ["x" * 101], [str(i) for i in range(21)]])
+def test_normalize_tags_rejects_invalid_tags(value):
+    with pytest.raises(ValueError):
+        normalize_tags(value)
+
+
+def test_index_writes_move_keys_only_items():
+    writes = index_writes("bookmarks", "t1", "b1", ["new"], ["old"])
+    assert writes == [
+        {"Put": {"TableName": "bookmarks", "Item": {"tenant_id": "t1#tag#new", "bookmark_id": "b1"}}},
+        {"Delete": {"TableName": "bookmarks", "Key": {"tenant_id": "t1#tag#old", "bookmark_id": "b1"}}}
+    ]
+
+
+def test_all_is_the_intersection_in_id_order(bookmarks):
+    _tag(bookmarks, "a", "b1", "b2", "b4", "b6", "b8")
+    _tag(bookmarks, "b", "b2", "b3", "b6", "b7", "b8")
+    _tag(bookmarks, "c", "b0", "b2", "b5", "b8", "b9")
+    assert match_tags("t1", ["a", "b", "c"], True, None, 10) == (["b2", "b8"], False)
+
+
+def test_any_is_the_union_in_id_order(bookmarks):
+    _tag(bookmarks, "a", "b1", "b3")
+    _tag(bookmarks, "b", "b2", "b3", "b5")
+    assert match_tags("t1", ["a", "b"], False, None, 10) == (["b1", "b2", "b3", "b5"], False)
+
+
+@pytest.mark.parametrize("match_all, expected", [(True, ["b3", "b5"]), (False, ["b2", "b3", "b4", "b5"])])
+def test_pages_resume_after_the_last_id(bookmarks, match_all, expected):
+    _tag(bookmarks, "a", "b1", "b3", "b5")
+    _tag(bookmarks, "b", "b1", "b2", "b3", "b4", "b5")
+    first, more = match_tags("t1", ["a", "b"], match_all, None, 1)
+    assert first == ["b1"] and more
+    assert match_tags("t1", ["a", "b"], match_all, first[-1], 10) == (expected, False)
+
+
+def test_missing_tag_matches_nothing_for_all(bookmarks):
+    _tag(bookmarks, "a", "b1", "b2")
+    assert match_tags("t1", ["a", "missing"], True, None, 10) == ([], False)
+
+
+def test_leapfrog_seeks_past_the_common_tag(bookmarks):
+    # The rare tag's ids let the join skip the common tag's partition instead of reading it all
+    common = [f"b{i:04d}" for i in range(1000)]
+    _tag(bookmarks, "common", *common)
+    _tag(bookmarks, "rare", "b0100", "b0500", "b0900")
+    assert match_tags("t1", ["common", "rare"], True, None, 10) == (["b0100", "b0500", "b0900"], False)
+    # A full scan of the common tag would take 100 pages of 10
+    assert len(_reads(bookmarks)) < 15
+
+
+def test_tags_of_other_tenants_never_match(bookmarks):
+    bookmarks.put({"tenant_id": tag_partition("t2", "a"), "bookmark_id": "b1"})
+    assert match_tags("t1", ["a"], False, None, 10) == ([], False)
+
+
+def _event(body=None, **params):
+    return {"body": json.dumps(body) if body is not None else None, "queryStringParameters": params or None,
+            "headers": {}}
+
+
+def test_tag_filter_lists_bookmarks_created_through_the_handler(bookmarks):
+    handler = BookmarksHandler()
+    created = {}
+    for title, tags in (("one", ["a"]), ("two", ["a", "b"]), ("three", ["b"])):
+        response = handler._create_bookmark(_event({"title": title, "tags": tags}), "t1")
+        assert response["statusCode"] == 201, response["body"]
+        created[title] = json.loads(response["body"])["bookmark_id"]
+    
+    response = handler._list_bookmarks(_event(tag="a,b"), "t1")
+    assert [bookmark["title"] for bookmark in json.loads(response["body"])["bookmarks"]] == ["two"]
+    response = handler._list_bookmarks(_event(tag="a,b", match="any"), "t1")
+    assert sorted(bookmark["title"] for bookmark in json.loads(response["body"])["bookmarks"]) == ["one", "three", "two"]
+
+
+def test_tag_filter_rejects_an_unknown_match_mode(bookmarks):
+    response = BookmarksHandler()._list_bookmarks(_event(tag="a", match="some"), "t1")
+    assert response["statusCode"] == 400
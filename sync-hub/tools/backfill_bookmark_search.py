@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import time
+import unicodedata
+
+import boto3
+from botocore.exceptions import ClientError
+
+def get_ssm_parameter(name):
+    ssm = boto3.client('ssm', region_name='us-east-1')
+    try:
+        response = ssm.get_parameter(Name=name)
+        return response['Parameter']['Value']
+    except ClientError:
+        return None
+
+def normalize(text):
+    # Must match search_index.normalize
+    return unicodedata.normalize("NFKC", text).casefold() if isinstance(text, str) else ""
+
+def backfill_bookmark_search():
+    print("🔎 Backfilling bookmark search documents...")
+
+    bookmarks_table_name = get_ssm_parameter('/sync-hub/data/bookmarks-table')
+    if not bookmarks_table_name:
+        print("❌ Could not retrieve table name from SSM. Make sure stacks are deployed.")
+        return
+
+    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+    bookmarks_table = dynamodb.Table(bookmarks_table_name)
+
+    # One-off full scan; afterwards the bookmarks stream keeps the documents in step
+    scan_kwargs = {
+        "FilterExpression": "attribute_not_exists(deleted)",
+        "ProjectionExpression": "tenant_id, bookmark_id, title, #url",
+        "ExpressionAttributeNames": {"#url": "url"}
+    }
+    documents = 0
+    with bookmarks_table.batch_writer() as batch:
+        while True:
+            response = bookmarks_table.scan(**scan_kwargs)
+
+            for item in response["Items"]:
+                # Search, tag index and other derived partitions carry a '#'
+                if "#" in item["tenant_id"]:
+                    continue
+
+                batch.put_item(Item={
+                    "tenant_id": f"{item['tenant_id']}#search",
+                    "bookmark_id": item["bookmark_id"],
+                    "title": normalize(item.get("title")),
+                    "url": normalize(item.get("url")),
+                    "updated_at": int(time.time())
+                })
+                documents += 1
+
+            if "LastEvaluatedKey" not in response:
+                break
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    print(f"✅ Wrote {documents} search documents")
+
+if __name__ == "__main__":
+    backfill_bookmark_search()
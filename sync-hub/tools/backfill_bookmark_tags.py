@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import boto3
+from botocore.exceptions import ClientError
+
+def get_ssm_parameter(name):
+    ssm = boto3.client('ssm', region_name='us-east-1')
+    try:
+        response = ssm.get_parameter(Name=name)
+        return response['Parameter']['Value']
+    except ClientError:
+        return None
+
+def backfill_bookmark_tags():
+    print("🏷️ Backfilling bookmark tag index...")
+
+    bookmarks_table_name = get_ssm_parameter('/sync-hub/data/bookmarks-table')
+    if not bookmarks_table_name:
+        print("❌ Could not retrieve table name from SSM. Make sure stacks are deployed.")
+        return
+
+    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+    bookmarks_table = dynamodb.Table(bookmarks_table_name)
+
+    # One-off full scan; afterwards bookmark writes keep the index in step
+    scan_kwargs = {
+        "FilterExpression": "size(tags) > :zero AND attribute_not_exists(deleted)",
+        "ExpressionAttributeValues": {":zero": 0}
+    }
+    bookmarks = 0
+    index_items = 0
+    with bookmarks_table.batch_writer() as batch:
+        while True:
+            response = bookmarks_table.scan(**scan_kwargs)
+
+            for item in response["Items"]:
+                # Index and other derived partitions carry a '#'
+                if "#" in item["tenant_id"]:
+                    continue
+
+                for tag in set(item["tags"]):
+                    batch.put_item(Item={
+                        "tenant_id": f"{item['tenant_id']}#tag#{tag}",
+                        "bookmark_id": item["bookmark_id"]
+                    })
+                    index_items += 1
+                bookmarks += 1
+
+            if "LastEvaluatedKey" not in response:
+                break
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    print(f"✅ Indexed {bookmarks} bookmarks ({index_items} tag entries)")
+
+if __name__ == "__main__":
+    backfill_bookmark_tags()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+import os
+import sys
+
+import boto3
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "api"))
+
+from url_index import normalize_url, url_item
+
+def get_ssm_parameter(name):
+    ssm = boto3.client('ssm', region_name='us-east-1')
+    try:
+        response = ssm.get_parameter(Name=name)
+        return response['Parameter']['Value']
+    except ClientError:
+        return None
+
+def backfill_bookmark_urls():
+    print("🔗 Backfilling bookmark URL lookups...")
+
+    bookmarks_table_name = get_ssm_parameter('/sync-hub/data/bookmarks-table')
+    if not bookmarks_table_name:
+        print("❌ Could not retrieve table name from SSM. Make sure stacks are deployed.")
+        return
+
+    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+    bookmarks_table = dynamodb.Table(bookmarks_table_name)
+
+    # Existing duplicates stay as they are; the oldest bookmark of each URL gets the lookup
+    scan_kwargs = {
+        "FilterExpression": "attribute_not_exists(deleted)",
+        "ProjectionExpression": "tenant_id, bookmark_id, #url, created_at",
+        "ExpressionAttributeNames": {"#url": "url"}
+    }
+    oldest = {}
+    duplicates = 0
+    while True:
+        response = bookmarks_table.scan(**scan_kwargs)
+
+        for item in response["Items"]:
+            # Lookups and other derived partitions carry a '#'
+            url = normalize_url(item.get("url"))
+            if "#" in item["tenant_id"] or url is None:
+                continue
+
+            key = (item["tenant_id"], url)
+            candidate = (item.get("created_at", 0), item["bookmark_id"])
+            if key in oldest:
+                duplicates += 1
+                candidate = min(candidate, oldest[key])
+            oldest[key] = candidate
+
+        if "LastEvaluatedKey" not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    # Conditional: a lookup claimed by the API since the deploy is left alone
+    written = 0
+    for (tenant_id, url), (_, bookmark_id) in oldest.items():
+        try:
+            bookmarks_table.put_item(
+                Item=url_item(tenant_id, url, bookmark_id),
+                ConditionExpression="attribute_not_exists(bookmark_id)"
+            )
+            written += 1
+        except bookmarks_table.meta.client.exceptions.ConditionalCheckFailedException:
+            pass
+
+    print(f"✅ Wrote {written} URL lookups ({duplicates} duplicate bookmarks left in place)")
+
+if __name__ == "__main__":
+    backfill_bookmark_urls()
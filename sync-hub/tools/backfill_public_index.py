@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+import boto3
+from botocore.exceptions import ClientError
+
+def get_ssm_parameter(name):
+    ssm = boto3.client('ssm', region_name='us-east-1')
+    try:
+        response = ssm.get_parameter(Name=name)
+        return response['Parameter']['Value']
+    except ClientError:
+        return None
+
+def backfill_public_index():
+    print("🔎 Backfilling public settings index...")
+
+    settings_table_name = get_ssm_parameter('/sync-hub/data/settings-table')
+    if not settings_table_name:
+        print("❌ Could not retrieve table name from SSM. Make sure stacks are deployed.")
+        return
+
+    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+    settings_table = dynamodb.Table(settings_table_name)
+
+    # One-off full scan so that the API never has to scan again
+    scan_kwargs = {
+        "FilterExpression": "is_public = :public AND attribute_not_exists(public_feed)",
+        "ExpressionAttributeValues": {":public": True}
+    }
+    updated = 0
+    while True:
+        response = settings_table.scan(**scan_kwargs)
+
+        for item in response["Items"]:
+            # History rows must stay out of the public feed
+            if "#v" in item["setting_id"]:
+                continue
+
+            settings_table.update_item(
+                Key={"tenant_id": item["tenant_id"], "setting_id": item["setting_id"]},
+                UpdateExpression="SET public_feed = :feed, updated_at = if_not_exists(updated_at, :created)",
+                ExpressionAttributeValues={":feed": "public", ":created": item.get("created_at", 0)}
+            )
+            updated += 1
+
+        if "LastEvaluatedKey" not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    print(f"✅ Indexed {updated} public settings")
+
+if __name__ == "__main__":
+    backfill_public_index()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import os
+import time
+
+import boto3
+from botocore.exceptions import ClientError
+
+# Must match SESSION_TTL_DAYS of the API function
+SESSION_TTL = int(os.environ.get("SESSION_TTL_DAYS", "30")) * 86400
+
+def get_ssm_parameter(name):
+    ssm = boto3.client('ssm', region_name='us-east-1')
+    try:
+        response = ssm.get_parameter(Name=name)
+        return response['Parameter']['Value']
+    except ClientError:
+        return None
+
+def backfill_session_ttl():
+    print("⏳ Extending the ttl of confirmed sessions...")
+
+    sessions_table_name = get_ssm_parameter('/sync-hub/data/sessions-table')
+    if not sessions_table_name:
+        print("❌ Could not retrieve table name from SSM. Make sure stacks are deployed.")
+        return
+
+    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+    sessions_table = dynamodb.Table(sessions_table_name)
+
+    # Confirmed sessions kept the 10 minute ttl of their device flow. Run this before TTL is
+    # enabled on the table, or TTL deletes every one of them along with its feedback counters
+    expires = int(time.time()) + SESSION_TTL
+    scan_kwargs = {
+        "FilterExpression": "#status = :confirmed AND #ttl < :expires",
+        "ProjectionExpression": "tenant_id, session_id",
+        "ExpressionAttributeNames": {"#status": "status", "#ttl": "ttl"},
+        "ExpressionAttributeValues": {":confirmed": "confirmed", ":expires": expires}
+    }
+    updated = 0
+    while True:
+        response = sessions_table.scan(**scan_kwargs)
+
+        for item in response["Items"]:
+            # Conditional, so a ttl set by a newer confirm is never shortened
+            try:
+                sessions_table.update_item(
+                    Key={"tenant_id": item["tenant_id"], "session_id": item["session_id"]},
+                    UpdateExpression="SET #ttl = :expires",
+                    ConditionExpression="#status = :confirmed AND #ttl < :expires",
+                    ExpressionAttributeNames={"#status": "status", "#ttl": "ttl"},
+                    ExpressionAttributeValues={":confirmed": "confirmed", ":expires": expires}
+                )
+                updated += 1
+            except sessions_table.meta.client.exceptions.ConditionalCheckFailedException:
+                pass
+
+        if "LastEvaluatedKey" not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    print(f"✅ Extended the ttl of {updated} confirmed sessions")
+
+if __name__ == "__main__":
+    backfill_session_ttl()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+API_DIR = os.path.join(ROOT, "services", "api")
+LAYER_DIR = os.path.join(ROOT, "layers", "powertools", "python")
+
+TABLE_VARS = ["SETTINGS_TABLE", "BOOKMARKS_TABLE", "GROUPS_TABLE", "GROUP_MEMBERS_TABLE", "SESSIONS_TABLE"]
+
+# Old layout: every handler built its own resource at import time
+EAGER_SNIPPET = """
+import os, time
+import boto3
+t0 = time.perf_counter()
+for name in {table_vars!r}:
+    boto3.resource('dynamodb').Table(os.environ[name])
+print((time.perf_counter() - t0) * 1000)
+""".format(table_vars=TABLE_VARS)
+
+# New layout: import the ApiFunction package, then touch one table
+LAZY_IMPORT_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import main
+print((time.perf_counter() - t0) * 1000)
+"""
+
+LAZY_FIRST_TABLE_SNIPPET = """
+import time
+import db
+t0 = time.perf_counter()
+db.table('SETTINGS_TABLE')
+print((time.perf_counter() - t0) * 1000)
+"""
+
+def run_snippet(snippet, runs):
+    env = dict(os.environ)
+    env.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    env.setdefault("POWERTOOLS_TRACE_DISABLED", "1")
+    env["PYTHONPATH"] = os.pathsep.join([API_DIR, LAYER_DIR, env.get("PYTHONPATH", "")])
+    for name in TABLE_VARS:
+        env.setdefault(name, f"bench-{name.lower()}")
+
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", snippet], env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+def report(runs=5):
+    print(f"⏱️  ApiFunction cold-start report (median of {runs} fresh interpreters)")
+
+    eager = run_snippet(EAGER_SNIPPET, runs)
+    print(f"  5 x boto3.resource('dynamodb') + Table:  {eager:8.1f} ms")
+
+    try:
+        lazy_import = run_snippet(LAZY_IMPORT_SNIPPET, runs)
+        print(f"  import main (no DynamoDB resources):     {lazy_import:8.1f} ms")
+    except RuntimeError as e:
+        print(f"  import main failed: {e}")
+
+    lazy_table = run_snippet(LAZY_FIRST_TABLE_SNIPPET, runs)
+    print(f"  first db.table() (one shared resource):  {lazy_table:8.1f} ms")
+    print(f"  saved on the first request:              {eager - lazy_table:8.1f} ms")
+
+if __name__ == "__main__":
+    report()
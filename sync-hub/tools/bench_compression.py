@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+import base64
+import gzip
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "api"))
+
+from http_responses import COMPRESSION_MIN_BYTES
+
+LEVELS = [1, 5, 6, 9]
+
+def build_settings_page(count):
+    now = int(time.time())
+    return {
+        "settings": [
+            {
+                "tenant_id": "bench-tenant",
+                "setting_id": str(uuid.uuid4()),
+                "name": f"editor.setting{i}",
+                "value": {"fontSize": 14, "theme": "Dark+ (default dark)", "rulers": [80, 120], "wordWrap": "on"},
+                "is_public": i % 5 == 0,
+                "version": i % 7 + 1,
+                "created_at": now - i,
+                "updated_at": now
+            }
+            for i in range(count)
+        ],
+        "next_token": None
+    }
+
+def time_per_call(fn, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat * 1000
+
+def run_benchmark():
+    print(f"🗜️  gzip response compression (CPU ms per response, threshold {COMPRESSION_MIN_BYTES} B)")
+    print(f"{'items':>6} {'raw KB':>8} {'level':>6} {'wire KB':>8} {'saved':>7} {'cpu ms':>8} {'KB saved/ms':>12}")
+
+    for count in (10, 100, 1000, 5000):
+        raw = json.dumps(build_settings_page(count)).encode()
+        repeat = max(3, 2000 // count)
+        for level in LEVELS:
+            # Wire size includes the base64 step API Gateway needs for binary bodies
+            encode = lambda: base64.b64encode(gzip.compress(raw, compresslevel=level, mtime=0))
+            wire = len(encode())
+            cpu_ms = time_per_call(encode, repeat)
+            saved = len(raw) - wire
+            print(f"{count:>6} {len(raw) / 1024:>8.1f} {level:>6} {wire / 1024:>8.1f} "
+                  f"{saved / len(raw):>6.0%} {cpu_ms:>8.2f} {saved / 1024 / max(cpu_ms, 1e-3):>12.0f}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "api"))
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+import serializer
+from entities import BOOKMARKS, SETTINGS
+
+def wire_items(kind, count):
+    # What DynamoDB sends back for a list page, before any deserialization
+    now = int(time.time())
+    marshal = TypeSerializer().serialize
+    items = []
+    for i in range(count):
+        if kind == "settings":
+            item = {
+                "tenant_id": "bench-tenant", "setting_id": str(uuid.uuid4()),
+                "name": f"editor.setting{i}", "value": {"fontSize": 14, "theme": "Dark+"},
+                "is_public": i % 5 == 0, "version": i % 7 + 1,
+                "created_at": now - i, "updated_at": now
+            }
+        else:
+            item = {
+                "tenant_id": "bench-tenant", "bookmark_id": str(uuid.uuid4()),
+                "title": f"Bookmark {i}", "url": f"https://example.com/{i}",
+                "tags": ["aws", "docs", f"tag{i % 10}"], "version": i % 7 + 1,
+                "created_at": now - i, "updated_at": now
+            }
+        items.append({name: marshal(value) for name, value in item.items()})
+    return items
+
+def resource_path(items):
+    # What boto3.resource does: generic TypeDeserializer on every attribute, then Decimal-aware JSON
+    deserialize = TypeDeserializer().deserialize
+    decoded = [{name: deserialize(value) for name, value in item.items()} for item in items]
+    return serializer.dumpb({"items": decoded})
+
+def entity_path(entity):
+    def run(items):
+        return serializer.dumpb({"items": [entity.decode(item) for item in items]})
+    return run
+
+def measure(fn, items, repeat):
+    fn(items)
+    start = time.process_time()
+    for _ in range(repeat):
+        fn(items)
+    return (time.process_time() - start) / repeat * 1000
+
+def run_benchmark():
+    print("📦 List-page decode + serialize CPU (ms per page)")
+    print(f"{'table':<10} {'items':>6} {'resource':>10} {'codec':>8} {'speedup':>8}")
+
+    for kind, entity in (("settings", SETTINGS), ("bookmarks", BOOKMARKS)):
+        for count in (100, 1000, 5000):
+            items = wire_items(kind, count)
+            repeat = max(5, 10000 // count)
+            generic = measure(resource_path, items, repeat)
+            codec = measure(entity_path(entity), items, repeat)
+            print(f"{kind:<10} {count:>6} {generic:>10.2f} {codec:>8.2f} {generic / codec:>7.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
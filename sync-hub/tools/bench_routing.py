@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "api"))
+
+from routing import Router
+
+METHODS = ["GET", "POST", "PUT", "DELETE"]
+
+def build_routes(resource_count):
+    routes = []
+    for i in range(resource_count):
+        base = f"/resource{i}"
+        routes.append(("GET", base, f"list{i}"))
+        routes.append(("POST", base, f"create{i}"))
+        routes.append(("GET", base + "/{item_id}", f"get{i}"))
+        routes.append(("PUT", base + "/{item_id}", f"update{i}"))
+        routes.append(("GET", base + "/{item_id}/history", f"history{i}"))
+    return routes
+
+def linear_match(routes, method, path):
+    # Reference: the old first-match-wins chain of prefix checks
+    segments = path.strip("/").split("/")
+    for route_method, pattern, target in routes:
+        if route_method != method:
+            continue
+        parts = pattern.strip("/").split("/")
+        if len(parts) != len(segments):
+            continue
+        if all(p.startswith("{") or p == s for p, s in zip(parts, segments)):
+            return target
+    return None
+
+def run_benchmark():
+    print("🏁 Route dispatch micro-benchmark (worst case: last registered resource)")
+    print(f"{'routes':>8} {'trie ns/op':>12} {'linear ns/op':>14}")
+
+    for resource_count in (5, 50, 500):
+        routes = build_routes(resource_count)
+        router = Router(routes)
+        last = resource_count - 1
+        requests = [
+            ("GET", f"/resource{last}"),
+            ("GET", f"/resource{last}/abc-123"),
+            ("GET", f"/resource{last}/abc-123/history"),
+            ("PUT", f"/resource{last}/abc-123"),
+        ]
+
+        number = 20000
+        trie_time = timeit.timeit(
+            lambda: [router.match(m, p) for m, p in requests], number=number
+        )
+        linear_number = max(number // resource_count, 20)
+        linear_time = timeit.timeit(
+            lambda: [linear_match(routes, m, p) for m, p in requests], number=linear_number
+        )
+
+        trie_ns = trie_time / (number * len(requests)) * 1e9
+        linear_ns = linear_time / (linear_number * len(requests)) * 1e9
+        print(f"{len(routes):>8} {trie_ns:>12.0f} {linear_ns:>14.0f}")
+
+if __name__ == "__main__":
+    run_benchmark()
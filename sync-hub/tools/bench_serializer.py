@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+import json
+import os
+import sys
+import time
+import uuid
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "api"))
+
+import serializer
+
+def build_items(count):
+    # Shaped like boto3.resource output: every number is a Decimal
+    now = Decimal(int(time.time()))
+    return [
+        {
+            "tenant_id": "bench-tenant",
+            "bookmark_id": str(uuid.uuid4()),
+            "title": f"Bookmark {i}",
+            "url": f"https://example.com/docs/{i}",
+            "tags": {"aws", "docs", f"tag{i % 10}"},
+            "score": Decimal("0.75"),
+            "version": Decimal(i % 7 + 1),
+            "created_at": now - i,
+            "updated_at": now
+        }
+        for i in range(count)
+    ]
+
+def replace_decimals(value):
+    # Typical stdlib workaround: copy the whole tree before json.dumps
+    if isinstance(value, list):
+        return [replace_decimals(v) for v in value]
+    if isinstance(value, dict):
+        return {k: replace_decimals(v) for k, v in value.items()}
+    if isinstance(value, set):
+        return [replace_decimals(v) for v in value]
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+def stdlib_copy(payload):
+    return json.dumps(replace_decimals(payload)).encode()
+
+def stdlib_default(payload):
+    return json.dumps(payload, default=serializer._default).encode()
+
+def shared(payload):
+    return serializer.dumpb(payload)
+
+def measure(fn, payload, repeat):
+    fn(payload)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = fn(payload)
+    return (time.perf_counter() - start) / repeat * 1000, len(body)
+
+def run_benchmark():
+    print("🧾 JSON serialization of DynamoDB items (ms per page, bytes on the wire)")
+    print(f"{'items':>6} {'variant':<34} {'ms':>8} {'bytes':>9}")
+
+    for count in (100, 1000, 5000):
+        payload = {"bookmarks": build_items(count), "next_token": None}
+        repeat = max(5, 20000 // count)
+        for name, fn in (
+            ("stdlib: replace_decimals + dumps", stdlib_copy),
+            ("stdlib: dumps(default=...)", stdlib_default),
+            ("serializer.dumpb", shared),
+        ):
+            ms, size = measure(fn, payload, repeat)
+            print(f"{count:>6} {name:<34} {ms:>8.2f} {size:>9}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+import boto3
+from botocore.exceptions import ClientError
+
+def get_ssm_parameter(name):
+    ssm = boto3.client('ssm', region_name='us-east-1')
+    try:
+        response = ssm.get_parameter(Name=name)
+        return response['Parameter']['Value']
+    except ClientError:
+        return None
+
+def migrate_group_invitations():
+    print("✉️  Turning unaccepted group memberships into invitations...")
+
+    members_table_name = get_ssm_parameter('/sync-hub/data/group-members-table')
+    if not members_table_name:
+        print("❌ Could not retrieve table name from SSM. Make sure stacks are deployed.")
+        return
+
+    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+    members_table = dynamodb.Table(members_table_name)
+
+    # Invites used to add members outright. Those rows have joined_at but no invited_at;
+    # every one but the group owner's own row goes back to pending until its user accepts
+    scan_kwargs = {
+        "FilterExpression": "attribute_exists(joined_at) AND attribute_not_exists(invited_at)",
+        "ProjectionExpression": "tenant_id, #member_key, user_id, joined_at",
+        "ExpressionAttributeNames": {"#member_key": "group_id#user_id"}
+    }
+    migrated = 0
+    while True:
+        response = members_table.scan(**scan_kwargs)
+
+        for item in response["Items"]:
+            if item["user_id"] == item["tenant_id"]:
+                continue
+            try:
+                members_table.update_item(
+                    Key={"tenant_id": item["tenant_id"], "group_id#user_id": item["group_id#user_id"]},
+                    UpdateExpression="SET invited_at = joined_at, #role = :member REMOVE joined_at",
+                    ConditionExpression="attribute_exists(joined_at) AND attribute_not_exists(invited_at)",
+                    ExpressionAttributeNames={"#role": "role"},
+                    ExpressionAttributeValues={":member": "member"}
+                )
+                migrated += 1
+            except members_table.meta.client.exceptions.ConditionalCheckFailedException:
+                pass
+
+        if "LastEvaluatedKey" not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    print(f"✅ Migrated {migrated} memberships to invitations")
+
+if __name__ == "__main__":
+    migrate_group_invitations()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import boto3
+from botocore.exceptions import ClientError
+
+def get_ssm_parameter(name):
+    ssm = boto3.client('ssm', region_name='us-east-1')
+    try:
+        response = ssm.get_parameter(Name=name)
+        return response['Parameter']['Value']
+    except ClientError:
+        return None
+
+def migrate_settings_history():
+    print("🗂️  Moving settings history out of the live partitions...")
+
+    settings_table_name = get_ssm_parameter('/sync-hub/data/settings-table')
+    if not settings_table_name:
+        print("❌ Could not retrieve table name from SSM. Make sure stacks are deployed.")
+        return
+
+    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+    settings_table = dynamodb.Table(settings_table_name)
+
+    # Legacy rows: same partition as the live setting, sort key "<setting_id>#v<version>"
+    scan_kwargs = {
+        "FilterExpression": "contains(setting_id, :marker) AND NOT contains(tenant_id, :history)",
+        "ExpressionAttributeValues": {":marker": "#v", ":history": "#history"}
+    }
+    moved = 0
+    while True:
+        response = settings_table.scan(**scan_kwargs)
+
+        with settings_table.batch_writer() as batch:
+            for item in response["Items"]:
+                setting_id, _, version = item["setting_id"].rpartition("#v")
+                if not version.isdigit():
+                    continue
+
+                history_item = dict(item)
+                history_item["tenant_id"] = f"{item['tenant_id']}#history"
+                history_item["setting_id"] = f"{setting_id}#v{int(version):010d}"
+                history_item.pop("public_feed", None)
+
+                batch.put_item(Item=history_item)
+                batch.delete_item(Key={"tenant_id": item["tenant_id"], "setting_id": item["setting_id"]})
+                moved += 1
+
+        if "LastEvaluatedKey" not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    print(f"✅ Moved {moved} history versions")
+
+if __name__ == "__main__":
+    migrate_settings_history()
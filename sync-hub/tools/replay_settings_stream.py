@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Replay recorded settings-table stream events through the stream consumer.
+
+Runs the same handler the Lambda runs, against whatever DynamoDB boto3 points at.
+For DynamoDB Local, export AWS_ENDPOINT_URL_DYNAMODB=http://localhost:8000 and
+SETTINGS_TABLE=<table> first.
+
+    python tools/replay_settings_stream.py [tools/events/settings_stream.json]
+"""
+import json
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "services", "api"))
+sys.path.insert(0, os.path.join(ROOT, "layers", "powertools", "python"))
+
+import boto3
+from botocore.exceptions import ClientError
+
+DEFAULT_EVENTS = os.path.join(os.path.dirname(__file__), "events", "settings_stream.json")
+
+def get_ssm_parameter(name):
+    ssm = boto3.client('ssm', region_name='us-east-1')
+    try:
+        response = ssm.get_parameter(Name=name)
+        return response['Parameter']['Value']
+    except ClientError:
+        return None
+
+class ReplayContext:
+    function_name = "replay-settings-stream"
+    memory_limit_in_mb = 256
+    invoked_function_arn = "arn:aws:lambda:us-east-1:000000000000:function:replay-settings-stream"
+    aws_request_id = "replay"
+
+    def get_remaining_time_in_millis(self):
+        return 60000
+
+def replay(path):
+    print(f"🔁 Replaying {path}...")
+
+    if not os.environ.get("SETTINGS_TABLE"):
+        table_name = get_ssm_parameter('/sync-hub/data/settings-table')
+        if not table_name:
+            print("❌ Set SETTINGS_TABLE or deploy the stacks so it can be read from SSM.")
+            return
+        os.environ["SETTINGS_TABLE"] = table_name
+    os.environ.setdefault("POWERTOOLS_TRACE_DISABLED", "1")
+    os.environ.setdefault("POWERTOOLS_SERVICE_NAME", "sync-hub")
+
+    import db
+    import stream
+    from stamps import is_tenant_partition, read_counters
+
+    with open(path) as f:
+        event = json.load(f)
+
+    result = stream.handler(event, ReplayContext())
+    failures = [failure["itemIdentifier"] for failure in result["batchItemFailures"]]
+    print(f"📦 {len(event['Records'])} records, {len(failures)} failed")
+    for sequence_number in failures:
+        print(f"   ⚠️ retry from {sequence_number}")
+
+    # Derived views for every tenant in the batch
+    tenants = {record["dynamodb"]["Keys"]["tenant_id"]["S"] for record in event["Records"]}
+    for tenant_id in sorted(filter(is_tenant_partition, tenants)):
+        print(f"👤 {tenant_id}: {read_counters(db.table('SETTINGS_TABLE'), tenant_id)}")
+
+    print("✅ Replay complete")
+
+if __name__ == "__main__":
+    replay(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_EVENTS)